@@ -0,0 +1,273 @@
+"""
+Static asset pipeline: build-time CSS, self-hosted fonts, fingerprinted and
+precompressed files.
+
+Visitors used to download the Tailwind Play CDN, which compiles CSS in the
+browser on every page load, plus two Google Fonts round trips. Instead:
+
+- `python assets.py fonts` downloads the web fonts into static/fonts and
+  writes static/css/fonts.css; commit both;
+- `python assets.py build TARGET_DIR` compiles a purged, minified
+  css/app.css with the Tailwind v3 standalone CLI (TAILWIND_BIN, default
+  `tailwindcss`), copies static/ next to it, adds content-hashed copies of
+  every file, gzip and brotli variants of the text files, and a
+  manifest.json mapping each path to its hashed copy;
+- with STATIC_BUILD_DIR=TARGET_DIR, AssetFiles serves that directory, with
+  immutable caching for hashed files and the precompressed variants, and
+  the static_url() template helper returns the hashed URLs.
+
+Without STATIC_BUILD_DIR the pages fall back to the Play CDN, for development.
+"""
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import urllib.request
+from mimetypes import guess_type
+from typing import Dict, Optional, Tuple
+
+import jinja2
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip variants are built
+    brotli = None
+
+STATIC_DIR = "static"
+TAILWIND_CONFIG = "assets/tailwind.config.js"
+MANIFEST_NAME = "manifest.json"
+HASH_LENGTH = 12
+# Only text compresses; woff2 and images already are
+COMPRESSIBLE = {".css", ".js", ".json", ".svg", ".txt", ".map"}
+# Content-hashed names never change content, so browsers need not revalidate
+IMMUTABLE = "public, max-age=31536000, immutable"
+FINGERPRINTED = re.compile(rf"\.[0-9a-f]{{{HASH_LENGTH}}}\.[A-Za-z0-9]+$")
+CSS_URL = re.compile(r"url\(\s*(['\"]?)([^'\")]+)\1\s*\)")
+
+GOOGLE_FONTS_CSS = (
+    "https://fonts.googleapis.com/css2?family=Bricolage+Grotesque:wght@500;700"
+    "&family=Manrope:wght@400;500;700&display=swap"
+)
+# Google Fonts only sends woff2 to browsers it recognises
+WOFF2_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+
+def fingerprinted_name(path: str, data: bytes) -> str:
+    """css/app.css -> css/app.<first 12 hex digits of its SHA-256>.css"""
+    root, ext = posixpath.splitext(path)
+    return f"{root}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def rewrite_css_urls(css: str, css_path: str, manifest: Dict[str, str]) -> str:
+    """Point url()s in the stylesheet at css_path to the hashed copies of their targets."""
+    base = posixpath.dirname(css_path)
+
+    def replace(match) -> str:
+        url = match.group(2)
+        if "://" in url or url.startswith(("data:", "/", "#")):
+            return match.group(0)
+        target = manifest.get(posixpath.normpath(posixpath.join(base, url)))
+        if target is None:
+            return match.group(0)
+        return f"url({posixpath.relpath(target, base)})"
+
+    return CSS_URL.sub(replace, css)
+
+
+def tailwind_play_config(config_path: str = TAILWIND_CONFIG) -> str:
+    """The Tailwind config as a JavaScript object literal, for the Play CDN fallback."""
+    with open(config_path, encoding="utf-8") as handle:
+        source = handle.read()
+    return source.split("\nmodule.exports =", 1)[1].strip().rstrip(";")
+
+
+def compile_css(tailwind_bin: str, static_dir: str = STATIC_DIR) -> bytes:
+    """Purged, minified CSS: fonts.css, Tailwind's layers with the used classes only, style.css."""
+    parts = []
+    fonts = os.path.join(static_dir, "css", "fonts.css")
+    if os.path.exists(fonts):
+        with open(fonts, encoding="utf-8") as handle:
+            parts.append(handle.read())
+    else:
+        print("No static/css/fonts.css: the fallback fonts will be used (see `python assets.py fonts`)")
+    parts.append("@tailwind base;\n@tailwind components;\n@tailwind utilities;\n")
+    with open(os.path.join(static_dir, "css", "style.css"), encoding="utf-8") as handle:
+        parts.append(handle.read())
+
+    with tempfile.TemporaryDirectory() as work:
+        source, output = os.path.join(work, "app.css"), os.path.join(work, "app.min.css")
+        with open(source, "w", encoding="utf-8") as handle:
+            handle.write("\n".join(parts))
+        try:
+            subprocess.run(
+                [tailwind_bin, "-c", TAILWIND_CONFIG, "-i", source, "-o", output, "--minify"],
+                check=True,
+            )
+        except FileNotFoundError:
+            raise SystemExit(f"Tailwind CLI not found: {tailwind_bin}. Install the v3 standalone "
+                             "binary and set TAILWIND_BIN, or put tailwindcss on PATH.")
+        with open(output, "rb") as handle:
+            return handle.read()
+
+
+def precompressed(data: bytes) -> Dict[str, bytes]:
+    """.gz and, with the brotli module, .br variants of data, where they are smaller."""
+    variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    return {suffix: compressed for suffix, compressed in variants.items() if len(compressed) < len(data)}
+
+
+def build(target: str, tailwind_bin: str, static_dir: str = STATIC_DIR) -> Dict[str, str]:
+    """
+    Build the served static directory into target (replacing it).
+
+    Returns:
+        The manifest: every path under target mapped to its hashed copy
+    """
+    files: Dict[str, bytes] = {}
+    for root, _, names in os.walk(static_dir):
+        for name in names:
+            full_path = os.path.join(root, name)
+            with open(full_path, "rb") as handle:
+                files[os.path.relpath(full_path, static_dir).replace(os.sep, "/")] = handle.read()
+    files["css/app.css"] = compile_css(tailwind_bin, static_dir)
+
+    # Stylesheets last, so their url()s can name the hashed fonts and images
+    manifest: Dict[str, str] = {}
+    for path in sorted(files, key=lambda path: (path.endswith(".css"), path)):
+        if path.endswith(".css"):
+            files[path] = rewrite_css_urls(files[path].decode("utf-8"), path, manifest).encode("utf-8")
+        manifest[path] = fingerprinted_name(path, files[path])
+
+    shutil.rmtree(target, ignore_errors=True)
+    for path, data in files.items():
+        variants = {"": data}
+        if posixpath.splitext(path)[1] in COMPRESSIBLE:
+            variants.update(precompressed(data))
+        for name in (path, manifest[path]):
+            full_path = os.path.join(target, name)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            for suffix, content in variants.items():
+                with open(full_path + suffix, "wb") as handle:
+                    handle.write(content)
+
+    with open(os.path.join(target, MANIFEST_NAME), "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    return manifest
+
+
+def download_fonts(static_dir: str = STATIC_DIR, css_url: str = GOOGLE_FONTS_CSS) -> None:
+    """Self-host the Google Fonts: woff2 files in static/fonts, @font-face rules in static/css/fonts.css."""
+    def fetch(url: str) -> bytes:
+        request = urllib.request.Request(url, headers={"User-Agent": WOFF2_USER_AGENT})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.read()
+
+    css = fetch(css_url).decode("utf-8")
+    fonts_dir = os.path.join(static_dir, "fonts")
+    os.makedirs(fonts_dir, exist_ok=True)
+
+    rules = []
+    # Each rule is preceded by its subset: /* latin */ @font-face { ... }
+    for subset, rule in re.findall(r"/\*\s*([\w-]+)\s*\*/\s*(@font-face\s*{[^}]*})", css):
+        family = re.search(r"font-family:\s*'([^']+)'", rule).group(1)
+        weight = re.search(r"font-weight:\s*(\d+)", rule).group(1)
+        url = CSS_URL.search(rule).group(2)
+        name = f"{family.lower().replace(' ', '-')}-{weight}-{subset}.woff2"
+        with open(os.path.join(fonts_dir, name), "wb") as handle:
+            handle.write(fetch(url))
+        rules.append(f"/* {subset} */\n" + rule.replace(url, f"../fonts/{name}"))
+
+    with open(os.path.join(static_dir, "css", "fonts.css"), "w", encoding="utf-8") as handle:
+        handle.write("/* Generated by `python assets.py fonts` */\n" + "\n".join(rules) + "\n")
+    print(f"Saved {len(rules)} font files to {fonts_dir}")
+
+
+class AssetFiles(StaticFiles):
+    """
+    StaticFiles for a directory built by `python assets.py build`.
+
+    Content-hashed files are cached for a year without revalidation; other
+    files must be revalidated (ETag / Last-Modified). A request accepting
+    br or gzip gets the prebuilt .br or .gz variant when there is one, so
+    nothing is compressed per request.
+    """
+
+    def __init__(self, directory: str, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self.manifest: Dict[str, str] = {}
+        manifest_path = os.path.join(directory, MANIFEST_NAME)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as handle:
+                self.manifest = json.load(handle)
+
+    @property
+    def built(self) -> bool:
+        return bool(self.manifest)
+
+    def resolve(self, path: str) -> str:
+        """The hashed copy of path, or path itself if it has none."""
+        return self.manifest.get(path, path)
+
+    @staticmethod
+    def _variant(full_path: str, accept_encoding: str) -> Tuple[Optional[str], str]:
+        """(Content-Encoding, file to send) for the best precompressed variant present."""
+        accepted = {token.split(";")[0].strip() for token in accept_encoding.split(",")}
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if encoding in accepted and os.path.exists(full_path + suffix):
+                return encoding, full_path + suffix
+        return None, full_path
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        encoding, send_path = self._variant(full_path, request_headers.get("accept-encoding", ""))
+
+        response = FileResponse(
+            send_path,
+            status_code=status_code,
+            stat_result=os.stat(send_path) if encoding else stat_result,
+            media_type=guess_type(full_path)[0] or "text/plain",
+        )
+        response.headers["Cache-Control"] = IMMUTABLE if FINGERPRINTED.search(full_path) else "no-cache"
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if posixpath.splitext(full_path)[1] in COMPRESSIBLE:
+            response.headers["Vary"] = "Accept-Encoding"
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def install_template_helpers(env: jinja2.Environment, files: AssetFiles) -> None:
+    """Add static_url(path), assets_built and tailwind_config to the templates' globals."""
+
+    @jinja2.pass_context
+    def static_url(context, path: str):
+        # Same result as request.url_for('static', path=...), hashed when built
+        return context["request"].url_for("static", path=files.resolve(path))
+
+    env.globals["static_url"] = static_url
+    env.globals["assets_built"] = files.built
+    if not files.built:
+        env.globals["tailwind_config"] = tailwind_play_config()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2 and sys.argv[1] == "fonts":
+        download_fonts()
+    elif len(sys.argv) == 3 and sys.argv[1] == "build":
+        manifest = build(sys.argv[2], os.environ.get("TAILWIND_BIN", "tailwindcss"))
+        print(f"Built {len(manifest)} assets into {sys.argv[2]}" + ("" if brotli else " (gzip only: brotli is not installed)"))
+    else:
+        sys.exit("usage: python assets.py fonts | python assets.py build TARGET_DIR")
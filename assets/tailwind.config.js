@@ -0,0 +1,28 @@
+// Tailwind CSS v3 configuration, used by `python assets.py build` and, as
+// the Play CDN config, by unbuilt development setups. Keep it a plain object
+// literal: the development fallback inlines everything after "module.exports =".
+module.exports = {
+  content: ["./templates/**/*.html", "./static/js/**/*.js"],
+  theme: {
+    extend: {
+      colors: {
+        brand: {
+          50: '#ecfeff',
+          100: '#cffafe',
+          500: '#0ea5a4',
+          600: '#0f766e',
+          700: '#115e59',
+        },
+        accent: {
+          400: '#fb7185',
+          500: '#f43f5e',
+          600: '#e11d48',
+        }
+      },
+      fontFamily: {
+        sans: ['Manrope', 'ui-sans-serif', 'system-ui'],
+        display: ['Bricolage Grotesque', 'ui-sans-serif', 'system-ui']
+      }
+    }
+  }
+};
@@ -0,0 +1,142 @@
+"""
+Check that the hot read queries are served by indexes, not table scans.
+
+Runs the main read paths against a fresh database, captures every SELECT they
+issue and EXPLAINs it. Any full scan of `events` or `dishes` fails the check
+(exit status 1). `dish_categories` is a small lookup table read in full by
+design, so scans of it are allowed.
+
+On Postgres the planner prefers sequential scans on tiny tables whatever
+indexes exist, so the check runs with enable_seqscan off: a sequential scan
+that remains means no index can serve the query. DATABASE_URL should point
+at a scratch database; its tables are dropped first.
+
+Usage:
+    python benchmarks/check_query_plans.py
+    DATABASE_URL=postgresql://localhost/scratch python benchmarks/check_query_plans.py --backend postgres
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCANNED_TABLES = ("events", "dishes")
+
+
+def seed(db) -> dict:
+    """Create one event with a dish plus enough events to page through."""
+    category_id = db.get_dish_categories()[0]["id"]
+    event = db.add_event("Plan Dinner", "2099-01-01 18:00", "Kitchen", "")
+    dish = db.add_dish(event["id"], "Stew", category_id, "Cook", "", 4)
+    for i in range(30):
+        db.add_event(f"Filler {i}", f"20{10 + i}-06-01 18:00", "Kitchen", "")
+    return {"event_id": event["id"], "dish_id": dish["id"]}
+
+
+def exercise(db, ids: dict) -> None:
+    """Call each hot read path once."""
+    db.get_upcoming_events(limit=2)
+    db.get_events_page(True, limit=5)
+    page = db.get_events_page(False, limit=5)
+    page = db.get_events_page(False, limit=5, after=page["next_cursor"])
+    db.get_events_page(False, limit=5, before=page["prev_cursor"])
+    db.get_event_by_id(ids["event_id"])
+    db.get_dishes_for_event(ids["event_id"])
+    db.get_dish_by_id(ids["dish_id"])
+    db.get_events_with_dishes([ids["event_id"]])
+    db.get_event_bundle(ids["event_id"])
+
+
+def sqlite_plans():
+    from database.sqlite_db import SQLiteDatabase
+
+    db = SQLiteDatabase(os.path.join(tempfile.mkdtemp(), "plans.db"))
+    db.initialize()
+    ids = seed(db)
+    conn = db._get_connection()
+    statements = []
+    # The callback receives statements with their parameters bound
+    conn.set_trace_callback(statements.append)
+    exercise(db, ids)
+    conn.set_trace_callback(None)
+
+    for statement in dict.fromkeys(statements):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            continue
+        rows = conn.execute("EXPLAIN QUERY PLAN " + statement).fetchall()
+        plan = [row[3] for row in rows]
+        # "SCAN d" / "SCAN dishes AS d" without USING ... INDEX reads every row
+        scans = [
+            line for line in plan
+            if line.startswith("SCAN ") and "INDEX" not in line
+            and re.match(r"SCAN (\w+)", line).group(1) in SCANNED_TABLES + ("e", "d")
+        ]
+        yield statement, plan, scans
+
+
+def postgres_plans():
+    import psycopg
+
+    from database.postgres_db import PostgresDatabase
+
+    class RecordingCursor(psycopg.ClientCursor):
+        """Cursor that keeps each SELECT with its parameters bound client-side."""
+
+        def execute(self, query, params=None, **kwargs):
+            statements.append(self.mogrify(query, params))
+            return super().execute(query, params, **kwargs)
+
+    url = os.environ["DATABASE_URL"]
+    with psycopg.connect(url, autocommit=True) as conn:
+        conn.execute("DROP TABLE IF EXISTS dishes, events, dish_categories, schema_meta CASCADE")
+
+    statements = []
+    db = PostgresDatabase(url, min_size=1, max_size=1)
+    db.initialize()
+    ids = seed(db)
+    with db._connect() as conn:
+        conn.cursor_factory = RecordingCursor
+    exercise(db, ids)
+    db.close()
+
+    with psycopg.connect(url) as conn:
+        conn.execute("SET enable_seqscan = off")
+        for statement in dict.fromkeys(statements):
+            if not statement.lstrip().upper().startswith("SELECT"):
+                continue
+            plan = [row[0] for row in conn.execute("EXPLAIN " + statement)]
+            scans = [
+                line.strip() for line in plan
+                if re.search(r"Seq Scan on (%s)\b" % "|".join(SCANNED_TABLES), line)
+            ]
+            yield statement, plan, scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", choices=["sqlite", "postgres"], default="sqlite")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    plans = sqlite_plans() if args.backend == "sqlite" else postgres_plans()
+    failures = 0
+    for statement, plan, scans in plans:
+        if scans or args.verbose:
+            print(" ".join(statement.split()))
+            for line in plan:
+                print("    " + line)
+        if scans:
+            failures += 1
+            print("  FULL SCAN: " + "; ".join(scans) + "\n")
+
+    if failures:
+        print(f"{failures} queries scan events or dishes")
+        sys.exit(1)
+    print("all hot queries use indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+HTTP load test of main:app under uvicorn, per backend, with JSON results.
+
+For each backend the database is seeded with --events events of
+--dishes-per-event dishes each (half of the events in the past), the app is
+started with uvicorn, and --concurrency client threads send a weighted mix
+of page views and dish writes over keep-alive connections for --seconds
+(after --warmup seconds that are not counted). Reports requests, errors,
+throughput and p50/p95/p99 latency per endpoint as JSON, tagged with the
+git commit, so runs can be compared across commits.
+
+The SQLite database is a temporary file. For postgres and redis, DATABASE_URL
+and REDIS_URL (or --database-url / --redis-url) must point at scratch
+databases: their tables or keys are deleted first.
+
+Usage:
+    python benchmarks/http_load.py --backend sqlite --events 1000 --dishes-per-event 10
+    python benchmarks/http_load.py --backend sqlite postgres redis --output bench.json
+    python benchmarks/http_load.py --mix home=1,event_detail=1 --concurrency 32
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_MIX = "home=30,events=20,event_detail=30,dish_add=10,dish_edit=10"
+# Status each endpoint answers with when it works; anything else is an error
+EXPECTED_STATUS = {"home": 200, "events": 200, "event_detail": 200, "dish_add": 303, "dish_edit": 303}
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in EXPECTED_STATUS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r}; choose from {', '.join(EXPECTED_STATUS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def reset_database(backend: str, url: str) -> None:
+    """Empty a scratch Postgres database or Redis keyspace."""
+    if backend == "postgres":
+        import psycopg
+
+        with psycopg.connect(url, autocommit=True) as conn:
+            conn.execute("DROP TABLE IF EXISTS dishes, events, dish_categories, schema_meta CASCADE")
+    elif backend == "redis":
+        import redis
+
+        redis.Redis.from_url(url).flushdb()
+
+
+def seed(url: str, events: int, dishes_per_event: int) -> Dict[str, int]:
+    """Bulk-load the events and dishes, with known IDs: events 1..N, dishes after them."""
+    from database.db_factory import DatabaseFactory
+    from database.db_interface import BULK_BATCH_SIZE
+
+    os.environ["SEED_SAMPLE_DATA"] = "false"
+    db = DatabaseFactory.create_from_url(url)
+    db.initialize()
+    category_ids = [category["id"] for category in db.get_dish_categories()]
+    start = datetime.now() - timedelta(days=events // 2)
+
+    batch = []
+    for event_id in range(1, events + 1):
+        date = (start + timedelta(days=event_id - 1)).strftime("%Y-%m-%d 18:00")
+        batch.append({"id": event_id, "title": f"Dinner {event_id}", "date": date,
+                      "location": "Kitchen", "description": "Benchmark event"})
+        if len(batch) == BULK_BATCH_SIZE:
+            db.bulk_add_events(batch)
+            batch = []
+    if batch:
+        db.bulk_add_events(batch)
+
+    batch = []
+    dish_id = events
+    for event_id in range(1, events + 1):
+        for i in range(dishes_per_event):
+            dish_id += 1
+            batch.append({"id": dish_id, "event_id": event_id, "name": f"Dish {i}",
+                          "category_id": category_ids[i % len(category_ids)],
+                          "person_name": "Bench", "description": "", "serves": 4})
+            if len(batch) == BULK_BATCH_SIZE:
+                db.bulk_add_dishes(batch)
+                batch = []
+    if batch:
+        db.bulk_add_dishes(batch)
+    db.close()
+    return {"events": events, "first_dish_id": events + 1, "last_dish_id": dish_id,
+            "category_ids": category_ids}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(env: Dict[str, str], port: int, workers: int) -> subprocess.Popen:
+    """Start uvicorn and wait until /health answers."""
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return server
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("uvicorn did not answer /health within 60 s")
+
+
+def make_request(endpoint: str, rng: random.Random, ids: Dict[str, int]):
+    """Method, path and form body for one request to an endpoint."""
+    event_id = rng.randint(1, ids["events"])
+    if endpoint == "home":
+        return "GET", "/", None
+    if endpoint == "events":
+        return "GET", "/events", None
+    if endpoint == "event_detail":
+        return "GET", f"/events/id/{event_id}", None
+    form = {"name": "Bench dish", "category_id": rng.choice(ids["category_ids"]),
+            "person_name": "Bench", "description": "", "serves": rng.randint(1, 12)}
+    if endpoint == "dish_add":
+        return "POST", f"/events/id/{event_id}/dishes/add", urlencode(form)
+    dish_id = rng.randint(ids["first_dish_id"], ids["last_dish_id"])
+    return "POST", f"/dishes/{dish_id}/edit", urlencode(form)
+
+
+def drive(port: int, mix: Dict[str, float], ids: Dict[str, int], concurrency: int,
+          warmup: float, seconds: float, seed_value: int) -> Dict[str, Dict[str, list]]:
+    """Run the client threads; returns latencies (s) and error counts per endpoint."""
+    endpoints, weights = list(mix), list(mix.values())
+    if "dish_edit" in mix and ids["last_dish_id"] < ids["first_dish_id"]:
+        # No seeded dishes to edit
+        weights[endpoints.index("dish_edit")] = 0
+    results = {endpoint: {"latencies": [], "errors": 0} for endpoint in endpoints}
+    lock = threading.Lock()
+    started = time.monotonic()
+    measure_from, stop_at = started + warmup, started + warmup + seconds
+
+    def client(index: int):
+        rng = random.Random(seed_value + index)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local = {endpoint: {"latencies": [], "errors": 0} for endpoint in endpoints}
+        while True:
+            now = time.monotonic()
+            if now >= stop_at:
+                break
+            endpoint = rng.choices(endpoints, weights)[0]
+            method, path, body = make_request(endpoint, rng, ids)
+            headers = {"Content-Type": "application/x-www-form-urlencoded"} if body else {}
+            request_started = time.perf_counter()
+            try:
+                conn.request(method, path, body, headers)
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == EXPECTED_STATUS[endpoint]
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                ok = False
+            elapsed = time.perf_counter() - request_started
+            if now >= measure_from:
+                if ok:
+                    local[endpoint]["latencies"].append(elapsed)
+                else:
+                    local[endpoint]["errors"] += 1
+        conn.close()
+        with lock:
+            for endpoint, result in local.items():
+                results[endpoint]["latencies"].extend(result["latencies"])
+                results[endpoint]["errors"] += result["errors"]
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def summarize(latencies: List[float], errors: int, seconds: float) -> Dict[str, float]:
+    summary = {"requests": len(latencies), "errors": errors,
+               "throughput_rps": round(len(latencies) / seconds, 1)}
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        summary.update({
+            "mean_ms": round(statistics.mean(latencies) * 1000, 3),
+            "p50_ms": round(cuts[49] * 1000, 3),
+            "p95_ms": round(cuts[94] * 1000, 3),
+            "p99_ms": round(cuts[98] * 1000, 3),
+        })
+    return summary
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_backend(backend: str, args) -> Dict:
+    env = dict(os.environ, SECRET_KEY="benchmark", SEED_SAMPLE_DATA="false", DB_BACKEND=backend)
+    directory = None
+    if backend == "sqlite":
+        directory = tempfile.TemporaryDirectory()
+        url = os.path.join(directory.name, "bench.db")
+        env["DATABASE_PATH"] = url
+    elif backend == "postgres":
+        url = env["DATABASE_URL"] = args.database_url
+    else:
+        url = env["REDIS_URL"] = args.redis_url
+    if not url:
+        raise SystemExit(f"--backend {backend} needs a scratch database URL")
+
+    try:
+        reset_database(backend, url)
+        seeding_started = time.perf_counter()
+        ids = seed(url, args.events, args.dishes_per_event)
+        seed_seconds = time.perf_counter() - seeding_started
+
+        port = free_port()
+        server = start_server(env, port, args.workers)
+        try:
+            results = drive(port, args.mix, ids, args.concurrency, args.warmup, args.seconds, args.seed)
+        finally:
+            server.terminate()
+            server.wait()
+    finally:
+        if directory is not None:
+            directory.cleanup()
+
+    endpoints = {endpoint: summarize(result["latencies"], result["errors"], args.seconds)
+                 for endpoint, result in results.items()}
+    all_latencies = [latency for result in results.values() for latency in result["latencies"]]
+    total = summarize(all_latencies, sum(result["errors"] for result in results.values()), args.seconds)
+    return {"backend": backend, "seed_seconds": round(seed_seconds, 2), "endpoints": endpoints, "total": total}
+
+
+def print_table(result: Dict) -> None:
+    print(f"\n{result['backend']} (seeded in {result['seed_seconds']} s)", file=sys.stderr)
+    print(f"{'endpoint':<14}{'req/s':>9}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}", file=sys.stderr)
+    for name, row in [*result["endpoints"].items(), ("total", result["total"])]:
+        print(f"{name:<14}{row['throughput_rps']:>9.1f}{row['errors']:>8}"
+              f"{row.get('p50_ms', 0):>9.2f}{row.get('p95_ms', 0):>9.2f}{row.get('p99_ms', 0):>9.2f}",
+              file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", nargs="+", choices=["sqlite", "postgres", "redis"], default=["sqlite"])
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--dishes-per-event", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=16, help="client threads")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds of traffic not measured")
+    parser.add_argument("--seconds", type=float, default=10.0, help="seconds of measured traffic")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"endpoint weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=1, help="random seed of the client threads")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", ""))
+    parser.add_argument("--redis-url", default=os.environ.get("REDIS_URL", ""))
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    report = {
+        "commit": git_commit(),
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "config": {key: getattr(args, key) for key in
+                   ("events", "dishes_per_event", "concurrency", "workers", "warmup", "seconds", "mix", "seed")},
+        "results": [],
+    }
+    for backend in args.backend:
+        result = run_backend(backend, args)
+        print_table(result)
+        report["results"].append(result)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Where the app's cold start goes: module imports and startup steps.
+
+Imports main in a fresh interpreter under `python -X importtime`, runs its
+lifespan startup (database initialization, template warmup) and reports:
+
+- the slowest modules by cumulative import time;
+- import time grouped by top-level package;
+- the duration of each startup step, from main.startup_timings.
+
+The backend is whatever the environment selects (DB_BACKEND etc.).
+
+Usage:
+    python benchmarks/profile_startup.py [--top 20]
+    DB_BACKEND=postgres DATABASE_URL=... python benchmarks/profile_startup.py
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import asyncio, json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def start():
+    async with main.lifespan(main.app):
+        pass
+
+asyncio.run(start())
+print(json.dumps({"import_main": (imported - started) * 1000, "steps": main.startup_timings}))
+"""
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=20, help="number of modules to list")
+    args = parser.parse_args()
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    modules = []
+    by_package = defaultdict(float)
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules.append((int(cumulative_us) / 1000, int(self_us) / 1000, len(indent) // 2, name))
+        # Self time summed per package never double counts nested imports
+        by_package[name.split(".")[0]] += int(self_us) / 1000
+
+    print(f"import main: {report['import_main']:.1f} ms")
+    print(f"\nslowest modules (cumulative ms, self ms):")
+    for cumulative, own, depth, name in sorted(modules, reverse=True)[:args.top]:
+        print(f"  {cumulative:9.1f} {own:8.1f}  {name}")
+
+    print(f"\nimport time by package (ms):")
+    for package, total in sorted(by_package.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {total:9.1f}  {package}")
+
+    print(f"\nstartup steps (ms):")
+    for step, duration in report["steps"].items():
+        print(f"  {duration:9.1f}  {step}")
+
+    loaded = {name.split(".")[0] for _, _, _, name in modules}
+    drivers = [driver for driver in ("psycopg", "psycopg_pool", "redis") if driver in loaded]
+    print(f"\ndatabase drivers imported: {', '.join(drivers) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
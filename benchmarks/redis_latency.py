@@ -0,0 +1,62 @@
+"""
+Latency of the Redis backend versus the number of dishes per event.
+
+Seeds one event per dish count into a local redis-server (flushing the
+selected database first) and reports the median latency of the main read
+and write paths.
+
+Usage:
+    REDIS_URL=redis://localhost:6379/15 python benchmarks/redis_latency.py [--dishes 1 10 100 1000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.kv_db import KVDatabase  # noqa: E402
+
+
+def median_ms(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dishes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    db = KVDatabase()
+    db.redis.flushdb()
+    db.initialize()
+    category_id = db.get_dish_categories()[0]["id"]
+
+    print(f"median latency in ms over {args.repeat} runs")
+    print(f"{'dishes':>8}{'dishes_for_event':>18}{'dish_categories':>17}{'add_dish':>10}{'delete_event':>14}")
+    for count in args.dishes:
+        event = db.add_event("Bench Dinner", "2099-01-01 18:00", "Kitchen", "")
+        for i in range(count):
+            db.add_dish(event["id"], f"Dish {i}", category_id, "Bench", "", 2)
+
+        read = median_ms(lambda: db.get_dishes_for_event(event["id"]), args.repeat)
+        categories = median_ms(db.get_dish_categories, args.repeat)
+        write = median_ms(lambda: db.add_dish(event["id"], "Extra", category_id, "Bench", "", 2), args.repeat)
+        start = time.perf_counter()
+        db.delete_event(event["id"])
+        delete = (time.perf_counter() - start) * 1000
+
+        print(f"{count:>8}{read:>18.2f}{categories:>17.2f}{write:>10.2f}{delete:>14.2f}")
+
+    db.redis.flushdb()
+
+
+if __name__ == "__main__":
+    main()
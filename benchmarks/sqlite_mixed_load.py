@@ -0,0 +1,91 @@
+"""
+Mixed read/write load benchmark for the SQLite backend.
+
+Runs reader and writer threads against a fresh database file, once in the
+default mode and once in production mode (WAL, tuned PRAGMAs and the single
+writer thread), and prints read and write throughput for each.
+
+Usage:
+    python benchmarks/sqlite_mixed_load.py [--readers 8] [--writers 4] [--seconds 5]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.sqlite_db import SQLiteDatabase  # noqa: E402
+
+
+def run(production: bool, readers: int, writers: int, seconds: float):
+    with tempfile.TemporaryDirectory() as directory:
+        db = SQLiteDatabase(os.path.join(directory, "bench.db"), production=production)
+        db.initialize()
+        event = db.add_event("Bench Dinner", "2099-01-01 18:00", "Kitchen", "")
+        category_id = db.get_dish_categories()[0]["id"]
+
+        stop = threading.Event()
+        counts = {"reads": 0, "writes": 0, "locked": 0}
+        lock = threading.Lock()
+
+        def reader():
+            done = 0
+            while not stop.is_set():
+                db.get_event_by_id(event["id"])
+                db.get_dishes_for_event(event["id"])
+                done += 1
+            with lock:
+                counts["reads"] += done
+
+        def writer():
+            done = locked = 0
+            while not stop.is_set():
+                try:
+                    db.add_dish(event["id"], "Casserole", category_id, "Bench", "", 4)
+                    done += 1
+                except sqlite3.OperationalError:
+                    locked += 1
+            with lock:
+                counts["writes"] += done
+                counts["locked"] += locked
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads += [threading.Thread(target=writer) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        db.close()
+
+    return {
+        "reads_per_sec": counts["reads"] / seconds,
+        "writes_per_sec": counts["writes"] / seconds,
+        "locked_errors": counts["locked"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:g}s per mode")
+    print(f"{'mode':<12}{'reads/s':>12}{'writes/s':>12}{'locked':>10}")
+    for label, production in (("default", False), ("production", True)):
+        result = run(production, args.readers, args.writers, args.seconds)
+        print(
+            f"{label:<12}{result['reads_per_sec']:>12.0f}"
+            f"{result['writes_per_sec']:>12.0f}{result['locked_errors']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
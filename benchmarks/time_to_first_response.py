@@ -0,0 +1,99 @@
+"""
+Time to first response for every page route, each in a fresh process.
+
+For each route a new interpreter imports the app and runs its startup
+(lifespan), then times the first and the second GET of that route. The
+first request pays for anything done lazily, such as compiling a template;
+the second shows the steady state. Uses a throwaway SQLite database.
+
+Usage:
+    python benchmarks/time_to_first_response.py [--runs 5]
+    TEMPLATE_CACHE_DIR=/tmp/jinja python benchmarks/time_to_first_response.py
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ROUTES = [
+    "/",
+    "/events",
+    "/events/id/1",
+    "/events/add",
+    "/events/id/1/edit",
+    "/events/id/1/delete",
+    "/events/id/1/dishes/add",
+    "/dishes/1/edit",
+    "/dishes/1/delete",
+]
+
+
+def child(route: str) -> None:
+    """Runs in the fresh process: start the app, time two requests."""
+    started = time.perf_counter()
+    from fastapi.testclient import TestClient
+
+    import main
+
+    with TestClient(main.app) as client:
+        ready = time.perf_counter()
+        client.get(route)
+        first = time.perf_counter()
+        client.get(route)
+        second = time.perf_counter()
+    print(json.dumps({
+        "startup_ms": (ready - started) * 1000,
+        "first_ms": (first - ready) * 1000,
+        "second_ms": (second - first) * 1000,
+    }))
+
+
+def seed_database(path: str) -> None:
+    from database.sqlite_db import SQLiteDatabase
+
+    db = SQLiteDatabase(path)
+    db.initialize()
+    category_id = db.get_dish_categories()[0]["id"]
+    db.add_dish(1, "Stew", category_id, "Cook", "", 4)
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per route")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return
+
+    db_path = os.path.join(tempfile.mkdtemp(), "ttfr.db")
+    seed_database(db_path)
+    env = dict(os.environ, DB_BACKEND="sqlite", DATABASE_PATH=db_path, SECRET_KEY="benchmark", PAGE_CACHE_SIZE="0")
+
+    print(f"median over {args.runs} fresh processes, ms")
+    print(f"{'route':<26}{'startup':>10}{'first':>9}{'second':>9}")
+    firsts = []
+    for route in ROUTES:
+        samples = []
+        for _ in range(args.runs):
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", route],
+                cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+            )
+            samples.append(json.loads(result.stdout.strip().splitlines()[-1]))
+        medians = {key: statistics.median(sample[key] for sample in samples) for key in samples[0]}
+        firsts.append(medians["first_ms"])
+        print(f"{route:<26}{medians['startup_ms']:>10.1f}{medians['first_ms']:>9.2f}{medians['second_ms']:>9.2f}")
+    print(f"{'mean first request':<26}{'':>10}{statistics.mean(firsts):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+"""
+Streaming bulk import and export of events and dishes, as NDJSON or CSV.
+
+Exports page through get_events_after() / get_dishes_after() and imports go
+through bulk_add_events() / bulk_add_dishes(), BULK_BATCH_SIZE rows at a
+time, so memory use stays flat however many rows are moved. Exported rows
+carry their IDs and importing them keeps those IDs, so an export from one
+backend can be imported into another as is (events before dishes).
+
+Used by the /export and /import endpoints in main.py, and as a CLI:
+
+    python bulk_io.py export events > events.ndjson
+    python bulk_io.py export dishes --format csv --output dishes.csv
+    DB_BACKEND=postgres python bulk_io.py import events events.ndjson
+"""
+import argparse
+import codecs
+import contextlib
+import csv
+import io
+import json
+import sys
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, TextIO
+
+from database.db_interface import BULK_BATCH_SIZE
+
+FIELDS = {
+    "events": ("id", "title", "date", "location", "description"),
+    "dishes": ("id", "event_id", "name", "category_id", "person_name", "description", "serves", "created_at"),
+}
+REQUIRED_FIELDS = {
+    "events": ("title", "date", "location"),
+    "dishes": ("event_id", "name", "category_id", "person_name"),
+}
+INTEGER_FIELDS = {"id", "event_id", "category_id", "serves"}
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+CHUNK_SIZE = 64 * 1024
+
+
+class BulkImportError(ValueError):
+    """An import stopped at a bad record or batch; `imported` rows were added before it."""
+
+    def __init__(self, message: str, imported: int):
+        super().__init__(message)
+        self.imported = imported
+
+
+def format_rows(kind: str, fmt: str, rows: List[Dict[str, Any]], header: bool = False) -> str:
+    """Serialize rows of one kind as NDJSON lines or CSV records."""
+    fields = FIELDS[kind]
+    if fmt == "ndjson":
+        return "".join(json.dumps({field: row.get(field) for field in fields}) + "\n" for row in rows)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore", lineterminator="\n")
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def export_batches(db, kind: str, batch_size: int = BULK_BATCH_SIZE,
+                   after_id: int = 0) -> Iterator[List[Dict[str, Any]]]:
+    """Yield every row of a kind with an ID above after_id from a synchronous database, a batch at a time."""
+    fetch = getattr(db, f"get_{kind}_after")
+    while True:
+        rows = fetch(after_id, batch_size)
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1]["id"]
+
+
+async def aexport_chunks(db, kind: str, fmt: str, batch_size: int = BULK_BATCH_SIZE) -> AsyncIterator[str]:
+    """Yield a whole export from an AsyncDatabaseInterface, one chunk of text per batch."""
+    fetch = getattr(db, f"get_{kind}_after")
+    if fmt == "csv":
+        yield format_rows(kind, fmt, [], header=True)
+    after_id = 0
+    while True:
+        rows = await fetch(after_id, batch_size)
+        if not rows:
+            return
+        yield format_rows(kind, fmt, rows)
+        after_id = rows[-1]["id"]
+
+
+def normalize_record(kind: str, record: Dict[str, Any], line_number: int) -> Dict[str, Any]:
+    """
+    Validate a parsed record and convert it to bulk_add_* arguments.
+
+    Unknown keys are dropped and empty optional fields left to the backend's
+    defaults.
+
+    Raises:
+        ValueError: If a required field is missing or a value is malformed
+    """
+    if not isinstance(record, dict):
+        raise ValueError(f"line {line_number}: expected an object")
+    result = {}
+    for field in FIELDS[kind]:
+        value = record.get(field)
+        if value is None or value == "":
+            if field in REQUIRED_FIELDS[kind]:
+                raise ValueError(f"line {line_number}: missing '{field}'")
+            continue
+        if field in INTEGER_FIELDS:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"line {line_number}: '{field}' must be an integer") from None
+        else:
+            value = str(value)
+        result[field] = value
+
+    if kind == "events":
+        # Same form as the event form posts, e.g. '2024-12-24 18:00'
+        date = result["date"].replace("T", " ")[:16]
+        try:
+            datetime.strptime(date, "%Y-%m-%d %H:%M")
+        except ValueError:
+            raise ValueError(f"line {line_number}: 'date' must look like YYYY-MM-DD HH:MM") from None
+        result["date"] = date
+    return result
+
+
+class RecordParser:
+    """
+    Incremental NDJSON / CSV parser: feed text as it arrives, get whole records.
+
+    CSV input needs a header row; quoted fields may span lines.
+    """
+
+    def __init__(self, kind: str, fmt: str):
+        self.kind = kind
+        self.fmt = fmt
+        self.line_number = 0
+        self._partial_line = ""
+        self._csv_lines: List[str] = []
+        self._csv_header = None
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """Parse every line completed by text."""
+        lines = (self._partial_line + text).split("\n")
+        self._partial_line = lines.pop()
+        return [record for record in map(self._parse_line, lines) if record is not None]
+
+    def close(self) -> List[Dict[str, Any]]:
+        """Parse whatever is left after the last newline."""
+        records = self.feed("\n") if self._partial_line else []
+        if self._csv_lines:
+            raise ValueError(f"line {self.line_number}: unterminated quoted field")
+        return records
+
+    def _parse_line(self, line: str):
+        self.line_number += 1
+        if self.fmt == "ndjson":
+            line = line.rstrip("\r")
+            if not line.strip():
+                return None
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"line {self.line_number}: invalid JSON ({exc.msg})") from None
+            return normalize_record(self.kind, record, self.line_number)
+
+        self._csv_lines.append(line)
+        text = "\n".join(self._csv_lines)
+        if text.count('"') % 2:
+            # Inside a quoted field that continues on the next line
+            return None
+        self._csv_lines = []
+        # Only the record's own line ending: a \r inside quotes is data
+        text = text.rstrip("\r")
+        if not text.strip():
+            return None
+        values = next(csv.reader([text]))
+        if self._csv_header is None:
+            self._csv_header = values
+            return None
+        return normalize_record(self.kind, dict(zip(self._csv_header, values)), self.line_number)
+
+
+class BatchImporter:
+    """Parses incoming text into records and cuts them into bulk_add_* batches."""
+
+    def __init__(self, kind: str, fmt: str, batch_size: int = BULK_BATCH_SIZE):
+        self.parser = RecordParser(kind, fmt)
+        self.batch_size = batch_size
+        self.imported = 0
+        self._pending: List[Dict[str, Any]] = []
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def feed(self, data) -> List[List[Dict[str, Any]]]:
+        """Parse a chunk of text (or UTF-8 bytes); returns the batches now full."""
+        try:
+            text = self._decoder.decode(data) if isinstance(data, bytes) else data
+            self._pending.extend(self.parser.feed(text))
+        except ValueError as exc:
+            raise self.failed(exc) from exc
+        batches = []
+        while len(self._pending) >= self.batch_size:
+            batches.append(self._pending[:self.batch_size])
+            del self._pending[:self.batch_size]
+        return batches
+
+    def close(self) -> List[List[Dict[str, Any]]]:
+        """Parse the end of the input; returns the last, partial batch if any."""
+        try:
+            self._pending.extend(self.parser.feed(self._decoder.decode(b"", final=True)))
+            self._pending.extend(self.parser.close())
+        except ValueError as exc:
+            raise self.failed(exc) from exc
+        batches = [self._pending] if self._pending else []
+        self._pending = []
+        return batches
+
+    def failed(self, exc: ValueError) -> BulkImportError:
+        return BulkImportError(f"{exc} ({self.imported} rows imported before it)", self.imported)
+
+
+def import_text(db, kind: str, fmt: str, stream: TextIO, batch_size: int = BULK_BATCH_SIZE) -> int:
+    """
+    Import NDJSON or CSV from a text stream into a synchronous database.
+
+    Returns:
+        The number of rows imported
+
+    Raises:
+        BulkImportError: On a malformed record or a rejected batch; the
+            batches before it stay imported
+    """
+    add_batch = getattr(db, f"bulk_add_{kind}")
+    importer = BatchImporter(kind, fmt, batch_size)
+
+    def add(batches):
+        for batch in batches:
+            try:
+                importer.imported += add_batch(batch)
+            except ValueError as exc:
+                raise importer.failed(exc) from exc
+
+    for chunk in iter(lambda: stream.read(CHUNK_SIZE), ""):
+        add(importer.feed(chunk))
+    add(importer.close())
+    return importer.imported
+
+
+async def aimport_stream(db, kind: str, fmt: str, chunks: AsyncIterator[bytes],
+                         batch_size: int = BULK_BATCH_SIZE) -> int:
+    """import_text() for an AsyncDatabaseInterface, reading UTF-8 chunks such as a request body."""
+    add_batch = getattr(db, f"bulk_add_{kind}")
+    importer = BatchImporter(kind, fmt, batch_size)
+
+    async def add(batches):
+        for batch in batches:
+            try:
+                importer.imported += await add_batch(batch)
+            except ValueError as exc:
+                raise importer.failed(exc) from exc
+
+    async for chunk in chunks:
+        await add(importer.feed(chunk))
+    await add(importer.close())
+    return importer.imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import and export of events and dishes.")
+    parser.add_argument("action", choices=("export", "import"))
+    parser.add_argument("kind", choices=tuple(FIELDS))
+    parser.add_argument("path", nargs="?", default="-", help="file to import (default: stdin)")
+    parser.add_argument("--format", choices=tuple(MEDIA_TYPES),
+                        help="ndjson or csv (default: from the file extension, else ndjson)")
+    parser.add_argument("--output", default="-", help="file to export to (default: stdout)")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE)
+    args = parser.parse_args()
+
+    target = args.output if args.action == "export" else args.path
+    fmt = args.format or ("csv" if target.endswith(".csv") else "ndjson")
+
+    from database import get_db
+
+    # The factory reports the backend it picked on stdout, which may be the export
+    with contextlib.redirect_stdout(sys.stderr):
+        db = get_db()
+        db.initialize()
+    started = time.perf_counter()
+    try:
+        if args.action == "export":
+            out = sys.stdout if target == "-" else open(target, "w", encoding="utf-8", newline="")
+            count = 0
+            try:
+                if fmt == "csv":
+                    out.write(format_rows(args.kind, fmt, [], header=True))
+                for rows in export_batches(db, args.kind, args.batch_size):
+                    out.write(format_rows(args.kind, fmt, rows))
+                    count += len(rows)
+            finally:
+                if out is not sys.stdout:
+                    out.close()
+        else:
+            source = sys.stdin if target == "-" else open(target, encoding="utf-8", newline="")
+            try:
+                count = import_text(db, args.kind, fmt, source, args.batch_size)
+            except BulkImportError as exc:
+                sys.exit(f"Import failed: {exc}")
+            finally:
+                if source is not sys.stdin:
+                    source.close()
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"{args.action}ed {count} {args.kind} in {elapsed:.1f} s ({count / max(elapsed, 1e-9):.0f} rows/s)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
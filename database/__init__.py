@@ -1,5 +1,9 @@
 from .db_factory import DatabaseFactory
 
 # Convenience function to get the database instance
-def get_db():
-    return DatabaseFactory.get_database() 
+def get_db(**kwargs):
+    return DatabaseFactory.get_database(**kwargs)
+
+# Convenience function to get the (uninitialized) async database instance
+def get_async_db(**kwargs):
+    return DatabaseFactory.get_async_database(**kwargs)
@@ -0,0 +1,112 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List, Dict, Any, Optional
+from .async_db_interface import AsyncDatabaseInterface
+from .db_interface import BULK_BATCH_SIZE, EVENTS_PAGE_SIZE, DatabaseInterface
+
+class AsyncDatabaseAdapter(AsyncDatabaseInterface):
+    """
+    Async wrapper around a synchronous DatabaseInterface implementation.
+
+    Calls are offloaded to a dedicated, bounded thread pool rather than
+    Starlette's shared threadpool, so database work cannot starve other
+    blocking tasks. Used for SQLite, which has no native async driver here;
+    with SQLiteDatabase each pool thread keeps its own long-lived connection.
+    """
+
+    def __init__(self, database: DatabaseInterface, max_workers: int = 8):
+        """
+        Wrap a synchronous database.
+
+        Args:
+            database: The synchronous implementation to delegate to
+            max_workers: Number of threads available for database calls
+        """
+        self.database = database
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+
+    async def _run(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(method, *args, **kwargs))
+
+    async def initialize(self) -> None:
+        await self._run(self.database.initialize)
+
+    async def close(self) -> None:
+        await self._run(self.database.close)
+        self._executor.shutdown(wait=False)
+
+    def change_source(self):
+        return self.database.change_source()
+
+    async def get_events(self) -> List[Dict[str, Any]]:
+        return await self._run(self.database.get_events)
+
+    async def get_upcoming_events(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return await self._run(self.database.get_upcoming_events, limit=limit)
+
+    async def get_events_page(self, upcoming: bool, limit: int = EVENTS_PAGE_SIZE,
+                              after: Optional[str] = None,
+                              before: Optional[str] = None) -> Dict[str, Any]:
+        return await self._run(self.database.get_events_page, upcoming, limit, after, before)
+
+    async def count_events(self) -> Dict[str, int]:
+        return await self._run(self.database.count_events)
+
+    async def get_event_by_id(self, event_id: int) -> Optional[Dict[str, Any]]:
+        return await self._run(self.database.get_event_by_id, event_id)
+
+    async def add_event(self, title: str, date: str, location: str, description: str) -> Dict[str, Any]:
+        return await self._run(self.database.add_event, title, date, location, description)
+
+    async def update_event(self, event_id: int, title: str, date: str, location: str, description: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self.database.update_event, event_id, title, date, location, description)
+
+    async def delete_event(self, event_id: int) -> bool:
+        return await self._run(self.database.delete_event, event_id)
+
+    async def get_events_with_dishes(self, event_ids: List[int]) -> List[Dict[str, Any]]:
+        return await self._run(self.database.get_events_with_dishes, event_ids)
+
+    async def get_event_bundle(self, event_id: int) -> Optional[Dict[str, Any]]:
+        return await self._run(self.database.get_event_bundle, event_id)
+
+    async def get_dish_categories(self) -> List[Dict[str, Any]]:
+        return await self._run(self.database.get_dish_categories)
+
+    async def get_dishes_for_event(self, event_id: int) -> List[Dict[str, Any]]:
+        return await self._run(self.database.get_dishes_for_event, event_id)
+
+    async def get_dish_by_id(self, dish_id: int) -> Optional[Dict[str, Any]]:
+        return await self._run(self.database.get_dish_by_id, dish_id)
+
+    async def add_dish(self, event_id: int, name: str, category_id: int,
+                       person_name: str, description: str = "",
+                       serves: int = 0) -> Dict[str, Any]:
+        return await self._run(self.database.add_dish, event_id, name, category_id,
+                               person_name, description, serves)
+
+    async def update_dish(self, dish_id: int, name: str, category_id: int,
+                          person_name: str, description: str = "",
+                          serves: int = 0) -> Optional[Dict[str, Any]]:
+        return await self._run(self.database.update_dish, dish_id, name, category_id,
+                               person_name, description, serves)
+
+    async def delete_dish(self, dish_id: int) -> bool:
+        return await self._run(self.database.delete_dish, dish_id)
+
+    async def get_events_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        return await self._run(self.database.get_events_after, after_id, limit)
+
+    async def get_dishes_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        return await self._run(self.database.get_dishes_after, after_id, limit)
+
+    async def bulk_add_events(self, events: List[Dict[str, Any]]) -> int:
+        return await self._run(self.database.bulk_add_events, events)
+
+    async def bulk_add_dishes(self, dishes: List[Dict[str, Any]]) -> int:
+        return await self._run(self.database.bulk_add_dishes, dishes)
+
+    async def get_data_version(self) -> int:
+        return await self._run(self.database.get_data_version)
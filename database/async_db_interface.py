@@ -0,0 +1,134 @@
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional
+from .db_interface import BULK_BATCH_SIZE, EVENTS_PAGE_SIZE
+
+class AsyncDatabaseInterface(ABC):
+    """
+    Asynchronous counterpart of DatabaseInterface.
+
+    Every method has the same arguments, return values and error behaviour as
+    the synchronous method of the same name, but is a coroutine so request
+    handlers can await database I/O without tying up a worker thread.
+    """
+
+    @abstractmethod
+    async def initialize(self) -> None:
+        """Initialize the database, creating tables or structures as needed."""
+        pass
+
+    async def close(self) -> None:
+        """Release connections and other resources held by the backend."""
+        pass
+
+    @abstractmethod
+    async def get_events(self) -> List[Dict[str, Any]]:
+        """Get all events, ordered by date."""
+        pass
+
+    @abstractmethod
+    async def get_upcoming_events(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get upcoming events, optionally limited to the first `limit`."""
+        pass
+
+    @abstractmethod
+    async def get_events_page(self, upcoming: bool, limit: int = EVENTS_PAGE_SIZE,
+                              after: Optional[str] = None,
+                              before: Optional[str] = None) -> Dict[str, Any]:
+        """Get one keyset-paginated page of upcoming (soonest first) or past (newest first) events."""
+        pass
+
+    @abstractmethod
+    async def count_events(self) -> Dict[str, int]:
+        """Count upcoming and past events: {'upcoming': n, 'past': m}."""
+        pass
+
+    @abstractmethod
+    async def get_event_by_id(self, event_id: int) -> Optional[Dict[str, Any]]:
+        """Get a specific event by ID, or None if not found."""
+        pass
+
+    @abstractmethod
+    async def add_event(self, title: str, date: str, location: str, description: str) -> Dict[str, Any]:
+        """Add a new event and return it."""
+        pass
+
+    @abstractmethod
+    async def update_event(self, event_id: int, title: str, date: str, location: str, description: str) -> Optional[Dict[str, Any]]:
+        """Update an event and return it, or None if not found."""
+        pass
+
+    @abstractmethod
+    async def delete_event(self, event_id: int) -> bool:
+        """Delete an event and its dishes; True if it existed."""
+        pass
+
+    @abstractmethod
+    async def get_events_with_dishes(self, event_ids: List[int]) -> List[Dict[str, Any]]:
+        """Get several events with 'dishes' and 'category_counts' (by category name)."""
+        pass
+
+    @abstractmethod
+    async def get_event_bundle(self, event_id: int) -> Optional[Dict[str, Any]]:
+        """Get the event, its dishes, all categories and counts by category ID, or None."""
+        pass
+
+    # Methods for dish sign-ups
+
+    @abstractmethod
+    async def get_dish_categories(self) -> List[Dict[str, Any]]:
+        """Get all dish categories, ordered by name."""
+        pass
+
+    @abstractmethod
+    async def get_dishes_for_event(self, event_id: int) -> List[Dict[str, Any]]:
+        """Get all dishes for an event, including their category name."""
+        pass
+
+    @abstractmethod
+    async def get_dish_by_id(self, dish_id: int) -> Optional[Dict[str, Any]]:
+        """Get a specific dish by ID, or None if not found."""
+        pass
+
+    @abstractmethod
+    async def add_dish(self, event_id: int, name: str, category_id: int,
+                       person_name: str, description: str = "",
+                       serves: int = 0) -> Dict[str, Any]:
+        """Add a dish to an event; raises ValueError for unknown event or category."""
+        pass
+
+    @abstractmethod
+    async def update_dish(self, dish_id: int, name: str, category_id: int,
+                          person_name: str, description: str = "",
+                          serves: int = 0) -> Optional[Dict[str, Any]]:
+        """Update a dish and return it, or None if not found; raises ValueError for unknown category."""
+        pass
+
+    @abstractmethod
+    async def delete_dish(self, dish_id: int) -> bool:
+        """Delete a dish; True if it existed."""
+        pass
+
+    @abstractmethod
+    async def get_events_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """Get up to `limit` events with an ID above after_id, in ID order."""
+        pass
+
+    @abstractmethod
+    async def get_dishes_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """Get up to `limit` dishes with an ID above after_id, in ID order."""
+        pass
+
+    @abstractmethod
+    async def bulk_add_events(self, events: List[Dict[str, Any]]) -> int:
+        """Add a batch of events, keeping any given 'id'; returns how many were added."""
+        pass
+
+    @abstractmethod
+    async def bulk_add_dishes(self, dishes: List[Dict[str, Any]]) -> int:
+        """Add a batch of dishes; raises ValueError (adding none) for unknown events or categories."""
+        pass
+
+    @abstractmethod
+    async def get_data_version(self) -> int:
+        """Get the data version shared by every process using the database."""
+        pass
@@ -0,0 +1,304 @@
+import asyncio
+import json
+import os
+import redis.asyncio as redis
+from typing import AsyncIterator, List, Dict, Any, Optional
+from datetime import datetime
+from .async_db_interface import AsyncDatabaseInterface
+from .changes import DISH_CHANGES_CHANNEL, ChangeSource, DishChange
+from .db_interface import (
+    BULK_BATCH_SIZE, EVENTS_PAGE_SIZE, build_events_page, should_seed_sample_data
+)
+from .kv_db import SAMPLE_EVENTS, KVKeyspace, get_redis_url
+
+class RedisChangeSource(ChangeSource):
+    """Dish changes the write scripts PUBLISH, so writes by every process are seen."""
+    
+    def __init__(self, client: redis.Redis, retry_seconds: float = 1.0):
+        self.client = client
+        self.retry_seconds = retry_seconds
+    
+    async def listen(self) -> AsyncIterator[Optional[DishChange]]:
+        while True:
+            # A subscribed pubsub holds its own connection from the client's pool
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(DISH_CHANGES_CHANNEL)
+                yield None
+                async for message in pubsub.listen():
+                    yield DishChange.from_json(message['data'])
+            except redis.ConnectionError as e:
+                print(f"Lost the dish change subscription: {e}; reconnecting")
+                await asyncio.sleep(self.retry_seconds)
+            finally:
+                await pubsub.aclose()
+
+
+class AsyncKVDatabase(KVKeyspace, AsyncDatabaseInterface):
+    """Redis implementation of the async database interface, on redis.asyncio."""
+    
+    def __init__(self):
+        """Initialize the Redis database connection."""
+        # Initialize Redis client from the REDIS_URL environment variable
+        self.redis = redis.Redis.from_url(get_redis_url())
+        self._register_write_scripts()
+    
+    async def close(self) -> None:
+        """Close the Redis connection pool."""
+        await self.redis.aclose()
+    
+    def change_source(self) -> RedisChangeSource:
+        """Dish changes, from the channel the write scripts publish on."""
+        return RedisChangeSource(self.redis)
+    
+    async def initialize(self) -> None:
+        """
+        Initialize the database, creating necessary keys if they don't exist.
+        
+        Once the keyspace is at SCHEMA_VERSION this is a single GET. Otherwise
+        one worker takes the schema lock (SET NX) and bootstraps, while any
+        others poll until the new version appears.
+        """
+        if self._schema_is_current(await self.redis.get(self.SCHEMA_VERSION_KEY)):
+            return
+        
+        token = os.urandom(16).hex()
+        while not await self.redis.set(self.SCHEMA_LOCK_KEY, token, nx=True, ex=self.SCHEMA_LOCK_TIMEOUT):
+            await asyncio.sleep(0.1)
+            if self._schema_is_current(await self.redis.get(self.SCHEMA_VERSION_KEY)):
+                return
+        try:
+            await self._bootstrap()
+            await self.redis.set(self.SCHEMA_VERSION_KEY, self.SCHEMA_VERSION)
+        finally:
+            await self.redis.eval(self.RELEASE_LOCK_SCRIPT, 1, self.SCHEMA_LOCK_KEY, token)
+    
+    async def _bootstrap(self) -> None:
+        """Seed and index the keyspace; safe to repeat."""
+        # Create the counter and check what needs seeding in one round trip
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_seed_check(pipe)
+        _, has_categories, event_count = await pipe.execute()
+        
+        # Older keyspaces have no date index, or one with unpadded members
+        if event_count:
+            await self.rebuild_date_index()
+        
+        seed_events = not event_count and should_seed_sample_data()
+        if has_categories and not seed_events:
+            return
+        
+        pipe = self.redis.pipeline(transaction=True)
+        if not has_categories:
+            self._queue_seed_categories(pipe)
+        if seed_events:
+            # Reserve one ID per sample event up front
+            last_id = await self.redis.incrby(self.COUNTER_KEY, len(SAMPLE_EVENTS))
+            first_id = last_id - len(SAMPLE_EVENTS) + 1
+            for event_id, event in enumerate(SAMPLE_EVENTS, first_id):
+                self._queue_store_event(pipe, self._build_event(
+                    event_id,
+                    event['title'],
+                    event['date'],
+                    event['location'],
+                    event['description']
+                ))
+        await pipe.execute()
+    
+    async def get_events(self) -> List[Dict[str, Any]]:
+        """Get all events from the database."""
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_events(pipe)
+        values, = await pipe.execute()
+        return self._sort_events(self._load_documents(values))
+    
+    async def rebuild_date_index(self) -> None:
+        """Rebuild the date index from the stored events (migration for older keyspaces)."""
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_events(pipe)
+        values, = await pipe.execute()
+        
+        # MULTI, so readers never see the index emptied
+        pipe = self.redis.pipeline(transaction=True)
+        self._queue_date_index_rebuild(pipe, values)
+        await pipe.execute()
+    
+    async def get_upcoming_events(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get upcoming events (events with dates in the future)."""
+        # Range query on the date index, then fetch just those documents
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_upcoming_event_ids(pipe, limit)
+        event_ids, = await pipe.execute()
+        if not event_ids:
+            return []
+        
+        return self._load_documents(await self.redis.mget(self._event_keys(event_ids)))
+    
+    async def get_events_page(self, upcoming: bool, limit: int = EVENTS_PAGE_SIZE,
+                        after: Optional[str] = None,
+                        before: Optional[str] = None) -> Dict[str, Any]:
+        """Get one page of upcoming or past events using keyset pagination."""
+        # Range queries on the date index, then fetch just that page's documents
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_events_page_ids(pipe, upcoming, limit, after, before)
+        event_ids = self._page_event_ids(await pipe.execute(), upcoming, limit, after, before)
+        if not event_ids:
+            return build_events_page([], limit, after, before)
+        
+        events = self._load_documents(await self.redis.mget(self._event_keys(event_ids)))
+        return build_events_page(events, limit, after, before)
+    
+    async def count_events(self) -> Dict[str, int]:
+        """Count upcoming and past events."""
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_count_events(pipe)
+        upcoming, past = await pipe.execute()
+        return {'upcoming': upcoming, 'past': past}
+    
+    async def get_event_by_id(self, event_id: int) -> Optional[Dict[str, Any]]:
+        """Get a specific event by ID."""
+        event_json = await self.redis.get(self._event_key(event_id))
+        
+        if event_json:
+            return json.loads(event_json)
+        return None
+    
+    async def add_event(self, title: str, date: str, location: str, description: str) -> Dict[str, Any]:
+        """Add a new event to the database."""
+        event = self._build_event(None, title, date, location, description)
+        
+        # Reserve the ID, store the event and index it in one atomic script
+        event['id'] = int(await self._add_event_script(**self._add_event_call(event)))
+        return event
+    
+    async def update_event(self, event_id: int, title: str, date: str, location: str, description: str) -> Optional[Dict[str, Any]]:
+        """Update an existing event."""
+        event = self._build_event(event_id, title, date, location, description)
+        
+        # SET ... XX only writes if the event exists, so no separate check
+        if not await self._update_event_script(**self._update_event_call(event)):
+            return None
+        return event
+    
+    async def delete_event(self, event_id: int) -> bool:
+        """Delete an event from the database."""
+        # Delete the event with all of its dishes, including any added meanwhile
+        return bool(await self._delete_event_script(**self._delete_event_call(event_id)))
+    
+    async def get_events_with_dishes(self, event_ids: List[int]) -> List[Dict[str, Any]]:
+        """Get several events together with their dishes in one pipeline."""
+        if not event_ids:
+            return []
+        
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_categories(pipe)
+        for event_id in event_ids:
+            self._queue_event_with_dishes(pipe, event_id)
+        return self._parse_events_with_dishes(await pipe.execute())
+    
+    async def get_event_bundle(self, event_id: int) -> Optional[Dict[str, Any]]:
+        """Get an event with its dishes, all categories and counts in one pipeline."""
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_categories(pipe)
+        self._queue_event_with_dishes(pipe, event_id)
+        return self._parse_event_bundle(await pipe.execute())
+    
+    # Methods for dish sign-ups - Phase 5
+    
+    async def get_dish_categories(self) -> List[Dict[str, Any]]:
+        """Get all dish categories."""
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_categories(pipe)
+        values, = await pipe.execute()
+        return self._sort_categories(self._load_documents(values))
+    
+    async def get_dishes_for_event(self, event_id: int) -> List[Dict[str, Any]]:
+        """Get all dishes signed up for a specific event."""
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_categories(pipe)
+        self._queue_dishes(pipe, event_id)
+        category_values, dish_values = await pipe.execute()
+        return self._attach_category_names(
+            self._load_documents(dish_values),
+            self._load_documents(category_values)
+        )
+    
+    async def get_dish_by_id(self, dish_id: int) -> Optional[Dict[str, Any]]:
+        """Get a specific dish by ID."""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(self._dish_key(dish_id))
+        self._queue_categories(pipe)
+        dish_json, category_values = await pipe.execute()
+        
+        if not dish_json:
+            return None
+        
+        return self._attach_category_names(
+            [json.loads(dish_json)],
+            self._load_documents(category_values)
+        )[0]
+    
+    async def add_dish(self, event_id: int, name: str, category_id: int, 
+                person_name: str, description: str = "", 
+                serves: int = 0) -> Dict[str, Any]:
+        """Add a new dish to an event."""
+        created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        dish = self._build_dish(None, event_id, name, category_id,
+                                person_name, description, serves, created_at)
+        
+        # Check the event and category, reserve an ID and store the dish atomically
+        result = await self._add_dish_script(**self._add_dish_call(dish))
+        return self._parse_added_dish(result, dish)
+    
+    async def update_dish(self, dish_id: int, name: str, category_id: int, 
+                   person_name: str, description: str = "", 
+                   serves: int = 0) -> Optional[Dict[str, Any]]:
+        """Update an existing dish."""
+        # Check the dish and category and rewrite the dish atomically, keeping
+        # its event_id and created_at
+        result = await self._update_dish_script(**self._update_dish_call(
+            dish_id, name, category_id, person_name, description, serves
+        ))
+        return self._parse_updated_dish(result, category_id)
+    
+    async def delete_dish(self, dish_id: int) -> bool:
+        """Delete a dish from the database."""
+        # The script finds the dish's event itself, so this is one round trip
+        return bool(await self._delete_dish_script(**self._delete_dish_call(dish_id)))
+    
+    async def get_events_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """Get the next batch of events in ID order."""
+        return await self._documents_after(self.EVENT_PREFIX, after_id, limit)
+    
+    async def get_dishes_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """Get the next batch of dishes in ID order."""
+        return await self._documents_after(self.DISH_PREFIX, after_id, limit)
+    
+    async def _documents_after(self, prefix: str, after_id: int, limit: int) -> List[Dict[str, Any]]:
+        """Fetch the documents under prefix with IDs above after_id, in ID order."""
+        last_id = int(await self.redis.get(self.COUNTER_KEY) or 0)
+        documents = []
+        for keys in self._document_windows(prefix, after_id, limit, last_id):
+            documents.extend(self._load_documents(await self.redis.mget(keys)))
+            if len(documents) >= limit:
+                break
+        return documents[:limit]
+    
+    async def bulk_add_events(self, events: List[Dict[str, Any]]) -> int:
+        """Add a batch of events with one script call."""
+        if not events:
+            return 0
+        return self._parse_bulk_added(await self._bulk_add_events_script(**self._bulk_add_events_call(events)),
+                                      'events')
+    
+    async def bulk_add_dishes(self, dishes: List[Dict[str, Any]]) -> int:
+        """Add a batch of dishes with one script call, checking their events and categories in it."""
+        if not dishes:
+            return 0
+        return self._parse_bulk_added(await self._bulk_add_dishes_script(**self._bulk_add_dishes_call(dishes)),
+                                      'dishes')
+    
+    async def get_data_version(self) -> int:
+        """Get the data version from its key."""
+        return int(await self.redis.get(self.DATA_VERSION_KEY) or 0)
+
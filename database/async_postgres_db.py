@@ -0,0 +1,360 @@
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+import psycopg
+from psycopg_pool import AsyncConnectionPool
+
+from .async_db_interface import AsyncDatabaseInterface
+from .changes import DISH_CHANGES_CHANNEL, ChangeSource, DishChange
+from .db_interface import BULK_BATCH_SIZE, EVENTS_PAGE_SIZE, build_events_page
+from .postgres_db import (
+    COUNT_EVENTS_SELECT,
+    DATA_VERSION_SELECT,
+    DEFAULT_CATEGORIES,
+    DISH_SELECT,
+    DISHES_FOR_EVENT_SELECT,
+    DISH_REFERENCES_SELECT,
+    EVENT_BUNDLE_SELECT,
+    EVENTS_WITH_DISHES_SELECT,
+    INSERT_DISH,
+    SAMPLE_EVENTS,
+    SCHEMA_LOCK_ID,
+    SCHEMA_META_TABLE,
+    SCHEMA_VERSION,
+    SCHEMA_VERSION_SELECT,
+    SYNC_ID_SEQUENCE,
+    SET_SCHEMA_VERSION,
+    UPCOMING_EVENTS_SELECT,
+    UPDATE_DISH,
+    bulk_copy_plan,
+    connection_kwargs,
+    event_bundle_from_row,
+    events_page_query,
+    events_with_dishes_from_rows,
+    missing_dish_reference,
+    pending_migrations,
+    pool_stats,
+    should_seed_sample_data,
+)
+from .read_routing import ReplicaRouter
+
+
+class PostgresChangeSource(ChangeSource):
+    """
+    Dish changes from LISTEN on a dedicated connection, fed by the
+    statement-level notify_dish_changes triggers, so writes by every
+    process are seen. A statement changing several dishes of an event
+    (COPY, migrations) arrives as one "reload" change for that event.
+    """
+
+    def __init__(self, database_url: str, retry_seconds: float = 1.0):
+        self.database_url = database_url
+        self.retry_seconds = retry_seconds
+
+    async def listen(self) -> AsyncIterator[Optional[DishChange]]:
+        while True:
+            try:
+                # Outside the pool: LISTEN holds its connection for good
+                async with await psycopg.AsyncConnection.connect(self.database_url, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {DISH_CHANGES_CHANNEL}")
+                    yield None
+                    async for notify in conn.notifies():
+                        yield DishChange.from_json(notify.payload)
+            except psycopg.OperationalError as e:
+                print(f"Lost the dish change listener: {e}; reconnecting")
+                await asyncio.sleep(self.retry_seconds)
+
+
+class AsyncPostgresDatabase(AsyncDatabaseInterface):
+    """PostgreSQL implementation of the async database interface, on psycopg's AsyncConnection."""
+
+    def __init__(
+        self,
+        database_url: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        max_idle: float = 600.0,
+        max_lifetime: float = 3600.0,
+        read_urls: Sequence[str] = (),
+    ):
+        if not database_url:
+            raise ValueError("DATABASE_URL is required for Postgres backend")
+        self.database_url = database_url
+
+        def new_pool(url: str, name: str) -> AsyncConnectionPool:
+            # The pool needs a running event loop, so it is opened in initialize()
+            return AsyncConnectionPool(
+                url,
+                min_size=min_size,
+                max_size=max_size,
+                timeout=timeout,
+                max_idle=max_idle,
+                max_lifetime=max_lifetime,
+                kwargs=connection_kwargs(),
+                check=AsyncConnectionPool.check_connection,
+                name=name,
+                open=False,
+            )
+
+        self.pool = new_pool(database_url, "dinner-planner-async")
+        self.router = ReplicaRouter(self.pool, [
+            new_pool(url, f"dinner-planner-async-replica-{i}") for i, url in enumerate(read_urls, 1)
+        ])
+
+    def _connect(self):
+        return self.pool.connection()
+
+    def _connect_read(self):
+        return self.router.for_read().connection()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Current pool size plus cumulative counters, such as wait time and failures."""
+        return pool_stats(self.router)
+
+    def change_source(self) -> PostgresChangeSource:
+        """Dish changes, listened for on the primary."""
+        return PostgresChangeSource(self.database_url)
+
+    async def close(self) -> None:
+        for pool in self.router.replicas:
+            await pool.close()
+        await self.pool.close()
+
+    async def initialize(self) -> None:
+        await self.pool.open(wait=True)
+        for pool in self.router.replicas:
+            await pool.open(wait=True)
+        async with self._connect() as conn, conn.cursor() as cur:
+            try:
+                await cur.execute(SCHEMA_VERSION_SELECT)
+                row = await cur.fetchone()
+            except psycopg.errors.UndefinedTable:
+                await conn.rollback()
+                row = None
+            if row and row["version"] >= SCHEMA_VERSION:
+                return
+
+            await cur.execute("SELECT pg_advisory_xact_lock(%s)", (SCHEMA_LOCK_ID,))
+            await cur.execute(SCHEMA_META_TABLE)
+            await cur.execute(SCHEMA_VERSION_SELECT)
+            row = await cur.fetchone()
+            migrations = pending_migrations(row["version"] if row else 0)
+            if not migrations:
+                return
+            for version, statements in migrations:
+                for statement in statements:
+                    await cur.execute(statement)
+                await cur.execute(SET_SCHEMA_VERSION, (version,))
+
+            await cur.execute("SELECT COUNT(*) AS count FROM dish_categories")
+            if (await cur.fetchone())["count"] == 0:
+                await cur.executemany("INSERT INTO dish_categories (name) VALUES (%s)", DEFAULT_CATEGORIES)
+
+            await cur.execute("SELECT COUNT(*) AS count FROM events")
+            if (await cur.fetchone())["count"] == 0 and should_seed_sample_data():
+                await cur.executemany(
+                    "INSERT INTO events (title, date, location, description) VALUES (%s, %s, %s, %s)",
+                    SAMPLE_EVENTS,
+                )
+            await conn.commit()
+
+    async def get_events(self) -> List[Dict[str, Any]]:
+        async with self._connect_read() as conn, conn.cursor() as cur:
+            await cur.execute("SELECT * FROM events ORDER BY date")
+            return await cur.fetchall()
+
+    async def get_upcoming_events(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        query = UPCOMING_EVENTS_SELECT
+        params: List[Any] = []
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+        async with self._connect_read() as conn, conn.cursor() as cur:
+            await cur.execute(query, params)
+            return await cur.fetchall()
+
+    async def get_events_page(
+        self,
+        upcoming: bool,
+        limit: int = EVENTS_PAGE_SIZE,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        query, params = events_page_query(upcoming, limit, after, before)
+        async with self._connect_read() as conn, conn.cursor() as cur:
+            await cur.execute(query, params)
+            events = await cur.fetchall()
+        return build_events_page(events, limit, after, before)
+
+    async def count_events(self) -> Dict[str, int]:
+        async with self._connect_read() as conn, conn.cursor() as cur:
+            await cur.execute(COUNT_EVENTS_SELECT)
+            return await cur.fetchone()
+
+    async def get_event_by_id(self, event_id: int) -> Optional[Dict[str, Any]]:
+        async with self._connect_read() as conn, conn.cursor() as cur:
+            await cur.execute("SELECT * FROM events WHERE id = %s", (event_id,))
+            return await cur.fetchone()
+
+    async def add_event(self, title: str, date: str, location: str, description: str) -> Dict[str, Any]:
+        async with self._connect() as conn, conn.cursor() as cur:
+            await cur.execute(
+                "INSERT INTO events (title, date, location, description) VALUES (%s, %s, %s, %s) RETURNING *",
+                (title, date, location, description),
+            )
+            event = await cur.fetchone()
+            await conn.commit()
+            return event
+
+    async def update_event(
+        self, event_id: int, title: str, date: str, location: str, description: str
+    ) -> Optional[Dict[str, Any]]:
+        async with self._connect() as conn, conn.cursor() as cur:
+            await cur.execute(
+                """
+                UPDATE events
+                SET title = %s, date = %s, location = %s, description = %s
+                WHERE id = %s
+                RETURNING *
+                """,
+                (title, date, location, description, event_id),
+            )
+            event = await cur.fetchone()
+            await conn.commit()
+            return event
+
+    async def delete_event(self, event_id: int) -> bool:
+        async with self._connect() as conn, conn.cursor() as cur:
+            await cur.execute("DELETE FROM events WHERE id = %s", (event_id,))
+            deleted = cur.rowcount > 0
+            await conn.commit()
+            return deleted
+
+    async def get_events_with_dishes(self, event_ids: List[int]) -> List[Dict[str, Any]]:
+        if not event_ids:
+            return []
+        async with self._connect_read() as conn, conn.cursor() as cur:
+            await cur.execute(EVENTS_WITH_DISHES_SELECT, (list(event_ids),))
+            return events_with_dishes_from_rows(await cur.fetchall(), event_ids)
+
+    async def get_event_bundle(self, event_id: int) -> Optional[Dict[str, Any]]:
+        async with self._connect_read() as conn, conn.cursor() as cur:
+            await cur.execute(EVENT_BUNDLE_SELECT, (event_id,))
+            return event_bundle_from_row(await cur.fetchone())
+
+    async def get_dish_categories(self) -> List[Dict[str, Any]]:
+        async with self._connect_read() as conn, conn.cursor() as cur:
+            await cur.execute("SELECT * FROM dish_categories ORDER BY name")
+            return await cur.fetchall()
+
+    async def get_dishes_for_event(self, event_id: int) -> List[Dict[str, Any]]:
+        async with self._connect_read() as conn, conn.cursor() as cur:
+            await cur.execute(DISHES_FOR_EVENT_SELECT, (event_id,))
+            return await cur.fetchall()
+
+    async def get_dish_by_id(self, dish_id: int) -> Optional[Dict[str, Any]]:
+        async with self._connect_read() as conn, conn.cursor() as cur:
+            await cur.execute(DISH_SELECT + " WHERE d.id = %s", (dish_id,))
+            return await cur.fetchone()
+
+    async def add_dish(
+        self,
+        event_id: int,
+        name: str,
+        category_id: int,
+        person_name: str,
+        description: str = "",
+        serves: int = 0,
+    ) -> Dict[str, Any]:
+        params = {
+            "event_id": event_id,
+            "name": name,
+            "category_id": category_id,
+            "person_name": person_name,
+            "description": description,
+            "serves": serves,
+        }
+        async with self._connect() as conn, conn.cursor() as cur:
+            try:
+                await cur.execute(INSERT_DISH, params)
+            except psycopg.errors.ForeignKeyViolation:
+                raise ValueError(f"Event with ID {event_id} does not exist") from None
+            dish = await cur.fetchone()
+            if dish is None:
+                await cur.execute(DISH_REFERENCES_SELECT, (event_id, category_id))
+                raise missing_dish_reference(event_id, category_id, await cur.fetchone())
+            await conn.commit()
+            return dish
+
+    async def update_dish(
+        self,
+        dish_id: int,
+        name: str,
+        category_id: int,
+        person_name: str,
+        description: str = "",
+        serves: int = 0,
+    ) -> Optional[Dict[str, Any]]:
+        params = {
+            "dish_id": dish_id,
+            "name": name,
+            "category_id": category_id,
+            "person_name": person_name,
+            "description": description,
+            "serves": serves,
+        }
+        async with self._connect() as conn, conn.cursor() as cur:
+            await cur.execute(UPDATE_DISH, params)
+            dish = await cur.fetchone()
+            if dish is None:
+                await cur.execute("SELECT 1 FROM dishes WHERE id = %s", (dish_id,))
+                if not await cur.fetchone():
+                    return None
+                raise ValueError(f"Category with ID {category_id} does not exist")
+            await conn.commit()
+            return dish
+
+    async def delete_dish(self, dish_id: int) -> bool:
+        async with self._connect() as conn, conn.cursor() as cur:
+            await cur.execute("DELETE FROM dishes WHERE id = %s", (dish_id,))
+            deleted = cur.rowcount > 0
+            await conn.commit()
+            return deleted
+
+    async def get_events_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        async with self._connect_read() as conn, conn.cursor() as cur:
+            await cur.execute("SELECT * FROM events WHERE id > %s ORDER BY id LIMIT %s", (after_id, limit))
+            return list(await cur.fetchall())
+
+    async def get_dishes_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        async with self._connect_read() as conn, conn.cursor() as cur:
+            await cur.execute("SELECT * FROM dishes WHERE id > %s ORDER BY id LIMIT %s", (after_id, limit))
+            return list(await cur.fetchall())
+
+    async def bulk_add_events(self, events: List[Dict[str, Any]]) -> int:
+        return await self._bulk_copy("events", events)
+
+    async def bulk_add_dishes(self, dishes: List[Dict[str, Any]]) -> int:
+        return await self._bulk_copy("dishes", dishes)
+
+    async def get_data_version(self) -> int:
+        # From the primary: a replica's version may lag the writes just made
+        async with self._connect() as conn, conn.cursor() as cur:
+            await cur.execute(DATA_VERSION_SELECT)
+            return (await cur.fetchone())["value"]
+
+    async def _bulk_copy(self, table: str, records: List[Dict[str, Any]]) -> int:
+        copies, keeps_ids = bulk_copy_plan(table, records)
+        try:
+            async with self._connect() as conn, conn.cursor() as cur:
+                for statement, rows in copies:
+                    async with cur.copy(statement) as copy:
+                        for row in rows:
+                            await copy.write_row(row)
+                if keeps_ids:
+                    await cur.execute(SYNC_ID_SEQUENCE[table])
+                await conn.commit()
+        except psycopg.IntegrityError as exc:
+            raise ValueError(f"Could not add {table}: {exc}") from exc
+        return len(records)
@@ -0,0 +1,178 @@
+import threading
+import time
+from typing import List, Dict, Any, Optional
+from .async_db_interface import AsyncDatabaseInterface
+from .db_interface import DatabaseInterface
+from .db_proxy import AsyncDatabaseProxy, DatabaseProxy
+
+class CategoryCache:
+    """
+    Process-wide, time-limited copy of the dish categories.
+
+    Categories are only seeded at initialization and almost never change, so
+    serving them from memory takes a query off nearly every request. Entries
+    expire after `ttl` seconds; invalidate() drops them immediately.
+    """
+
+    def __init__(self, ttl: float = 300.0):
+        """
+        Create an empty cache.
+
+        Args:
+            ttl: Seconds a loaded category list stays valid
+        """
+        self.ttl = ttl
+        self._categories: Optional[List[Dict[str, Any]]] = None
+        self._names: Dict[int, str] = {}
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[List[Dict[str, Any]]]:
+        """Return a copy of the cached categories, or None if missing or expired."""
+        with self._lock:
+            if self._categories is None or time.monotonic() >= self._expires_at:
+                return None
+            return [dict(category) for category in self._categories]
+
+    def set(self, categories: List[Dict[str, Any]]) -> None:
+        """Store a freshly loaded category list."""
+        with self._lock:
+            self._categories = [dict(category) for category in categories]
+            self._names = {category['id']: category['name'] for category in categories}
+            self._expires_at = time.monotonic() + self.ttl
+
+    def name_for(self, category_id: int) -> Optional[str]:
+        """Return the cached name of a category, or None if unknown or expired."""
+        with self._lock:
+            if self._categories is None or time.monotonic() >= self._expires_at:
+                return None
+            return self._names.get(category_id)
+
+    def invalidate(self) -> None:
+        """Drop the cached categories so the next read goes to the database."""
+        with self._lock:
+            self._categories = None
+            self._names = {}
+            self._expires_at = 0.0
+
+
+def _missing_category(category_id: int) -> ValueError:
+    return ValueError(f"Category with ID {category_id} does not exist")
+
+
+class CachedDatabase(DatabaseProxy):
+    """
+    Read-through category cache around any DatabaseInterface implementation.
+
+    get_dish_categories() is served from the cache, and add_dish/update_dish
+    reject unknown category IDs from it without a database round trip. The
+    wrapped backend still enforces the category as part of the write itself.
+    """
+
+    def __init__(self, database: DatabaseInterface, cache: Optional[CategoryCache] = None):
+        """
+        Wrap a database implementation.
+
+        Args:
+            database: The backend to cache categories for
+            cache: Cache to use; a new one with the default TTL if omitted
+        """
+        super().__init__(database)
+        self.category_cache = cache or CategoryCache()
+
+    def invalidate_categories(self) -> None:
+        """Forget the cached categories."""
+        self.category_cache.invalidate()
+
+    def get_dish_categories(self) -> List[Dict[str, Any]]:
+        categories = self.category_cache.get()
+        if categories is None:
+            categories = self.database.get_dish_categories()
+            self.category_cache.set(categories)
+        return categories
+
+    def get_category_name(self, category_id: int) -> Optional[str]:
+        """
+        Look up a category name from the cache.
+
+        Args:
+            category_id: The ID of the category
+
+        Returns:
+            The category name, or None if no such category exists
+        """
+        name = self.category_cache.name_for(category_id)
+        if name is None:
+            # Unknown or expired: reload once before giving up
+            self.category_cache.invalidate()
+            self.get_dish_categories()
+            name = self.category_cache.name_for(category_id)
+        return name
+
+    def add_dish(self, event_id: int, name: str, category_id: int,
+                 person_name: str, description: str = "",
+                 serves: int = 0) -> Dict[str, Any]:
+        if self.get_category_name(category_id) is None:
+            raise _missing_category(category_id)
+        return self.database.add_dish(event_id, name, category_id, person_name, description, serves)
+
+    def update_dish(self, dish_id: int, name: str, category_id: int,
+                    person_name: str, description: str = "",
+                    serves: int = 0) -> Optional[Dict[str, Any]]:
+        if self.get_category_name(category_id) is None:
+            raise _missing_category(category_id)
+        return self.database.update_dish(dish_id, name, category_id, person_name, description, serves)
+
+    def save_categories(self, categories: List[Dict[str, Any]]) -> int:
+        saved = self.database.save_categories(categories)
+        self.category_cache.invalidate()
+        return saved
+
+
+class AsyncCachedDatabase(AsyncDatabaseProxy):
+    """Read-through category cache around any AsyncDatabaseInterface implementation."""
+
+    def __init__(self, database: AsyncDatabaseInterface, cache: Optional[CategoryCache] = None):
+        """
+        Wrap an async database implementation.
+
+        Args:
+            database: The backend to cache categories for
+            cache: Cache to use; a new one with the default TTL if omitted
+        """
+        super().__init__(database)
+        self.category_cache = cache or CategoryCache()
+
+    def invalidate_categories(self) -> None:
+        """Forget the cached categories."""
+        self.category_cache.invalidate()
+
+    async def get_dish_categories(self) -> List[Dict[str, Any]]:
+        categories = self.category_cache.get()
+        if categories is None:
+            categories = await self.database.get_dish_categories()
+            self.category_cache.set(categories)
+        return categories
+
+    async def get_category_name(self, category_id: int) -> Optional[str]:
+        """Look up a category name from the cache, reloading once if unknown."""
+        name = self.category_cache.name_for(category_id)
+        if name is None:
+            self.category_cache.invalidate()
+            await self.get_dish_categories()
+            name = self.category_cache.name_for(category_id)
+        return name
+
+    async def add_dish(self, event_id: int, name: str, category_id: int,
+                       person_name: str, description: str = "",
+                       serves: int = 0) -> Dict[str, Any]:
+        if await self.get_category_name(category_id) is None:
+            raise _missing_category(category_id)
+        return await self.database.add_dish(event_id, name, category_id, person_name, description, serves)
+
+    async def update_dish(self, dish_id: int, name: str, category_id: int,
+                          person_name: str, description: str = "",
+                          serves: int = 0) -> Optional[Dict[str, Any]]:
+        if await self.get_category_name(category_id) is None:
+            raise _missing_category(category_id)
+        return await self.database.update_dish(dish_id, name, category_id, person_name, description, serves)
@@ -0,0 +1,76 @@
+import asyncio
+import json
+import threading
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+
+# Postgres NOTIFY channel and Redis pub/sub channel dish changes are sent on
+DISH_CHANGES_CHANNEL = "dish_changes"
+
+
+class DishChange(NamedTuple):
+    """
+    A dish was added, updated or deleted (op "add", "update" or "delete"),
+    or several dishes of an event changed at once (op "reload", no dish_id).
+    """
+
+    op: str
+    event_id: int
+    dish_id: Optional[int]
+    # The dish as get_dish_by_id() returns it, when the source already has it
+    dish: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_json(cls, payload) -> "DishChange":
+        """Parse a notification payload: {"op": ..., "event_id": ..., "dish_id": ...}."""
+        data = json.loads(payload)
+        dish_id = data.get("dish_id")
+        return cls(data["op"], int(data["event_id"]), None if dish_id is None else int(dish_id))
+
+
+class ChangeSource:
+    """
+    A backend's stream of dish changes, including those made by other
+    processes where the backend can tell.
+
+    Backends hand theirs out from change_source().
+    """
+
+    def listen(self) -> AsyncIterator[Optional[DishChange]]:
+        """
+        Yield changes as they happen, forever.
+
+        None is yielded whenever listening (re)starts: changes made before it
+        may have been missed, so anything kept up to date must be reloaded.
+        """
+        raise NotImplementedError
+
+
+class LocalChangeSource(ChangeSource):
+    """
+    Changes made through one database object in this process, for backends
+    without a notification mechanism (SQLite). Writes made by other
+    processes are not seen.
+    """
+
+    def __init__(self):
+        self._listeners: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._lock = threading.Lock()
+
+    def notify(self, change: DishChange) -> None:
+        """Pass a committed change to every listener; safe from any thread."""
+        with self._lock:
+            listeners = list(self._listeners)
+        for loop, queue in listeners:
+            loop.call_soon_threadsafe(queue.put_nowait, change)
+
+    async def listen(self) -> AsyncIterator[Optional[DishChange]]:
+        listener = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._listeners.append(listener)
+        try:
+            yield None
+            while True:
+                yield await listener[1].get()
+        finally:
+            with self._lock:
+                self._listeners.remove(listener)
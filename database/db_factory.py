@@ -1,31 +1,109 @@
 import os
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, Sequence
 from .db_interface import DatabaseInterface
-from .sqlite_db import SQLiteDatabase
+from .async_db_interface import AsyncDatabaseInterface
+from .cached_db import AsyncCachedDatabase, CachedDatabase, CategoryCache
+from .read_routing import get_read_urls
+from .timed_db import AsyncTimedDatabase, CallRecorder, TimedDatabase
 
-try:
-    from .postgres_db import PostgresDatabase
-    POSTGRES_AVAILABLE = True
-except ImportError:
-    POSTGRES_AVAILABLE = False
-
-# Try to import the KV database, but don't fail if it's not available
-try:
-    from .kv_db import KVDatabase
-    REDIS_AVAILABLE = True
-except ImportError:
-    REDIS_AVAILABLE = False
+# Backend modules (and their drivers: psycopg, redis) are imported only when
+# that backend is selected, so a SQLite deployment never pays for the others.
+if TYPE_CHECKING:
+    from .async_adapter import AsyncDatabaseAdapter
+    from .sqlite_db import SQLiteDatabase
 
 class DatabaseFactory:
     """Factory class to create the appropriate database implementation."""
     
     _instance: Optional[DatabaseInterface] = None
+    _async_instance: Optional[AsyncDatabaseInterface] = None
+    
+    @staticmethod
+    def _postgres_settings() -> dict:
+        """Connection URL and pool settings for the Postgres backends."""
+        return {
+            "database_url": os.environ.get("DATABASE_URL", ""),
+            "min_size": int(os.environ.get("PG_POOL_MIN_SIZE", "1")),
+            "max_size": int(os.environ.get("PG_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.environ.get("PG_POOL_TIMEOUT", "30")),
+            "max_idle": float(os.environ.get("PG_POOL_MAX_IDLE", "600")),
+            "max_lifetime": float(os.environ.get("PG_POOL_MAX_LIFETIME", "3600")),
+            "read_urls": get_read_urls(),
+        }
+    
+    @staticmethod
+    def _category_cache() -> Optional[CategoryCache]:
+        """Category cache configured by CATEGORY_CACHE_TTL (seconds, 0 disables)."""
+        ttl = float(os.environ.get("CATEGORY_CACHE_TTL", "300"))
+        return CategoryCache(ttl) if ttl > 0 else None
+    
+    @staticmethod
+    def _backend_name(database: object) -> str:
+        """Metrics label for a backend instance: sqlite, postgres or redis."""
+        name = type(getattr(database, "database", database)).__name__
+        for label, prefix in (("postgres", "Postgres"), ("redis", "KV"), ("sqlite", "SQLite")):
+            if prefix in name:
+                return label
+        return name
+    
+    @staticmethod
+    def _create_sqlite() -> "SQLiteDatabase":
+        from .sqlite_db import SQLiteDatabase
+        
+        # SQLite is the default for local and volume-backed deployments.
+        db_path = os.environ.get('SQLITE_DB_PATH') or os.environ.get('DATABASE_PATH', 'dinner_planner.db')
+        # WAL + single writer thread; on by default in production
+        default_mode = "true" if os.environ.get("APP_ENV", "").lower() == "production" else "false"
+        production = os.environ.get("SQLITE_PRODUCTION_MODE", default_mode).lower() == "true"
+        print(f"Using SQLite database at {db_path}" + (" (WAL, single writer)" if production else ""))
+        return SQLiteDatabase(db_path, production=production)
     
     @classmethod
-    def get_database(cls) -> DatabaseInterface:
+    def _create_async_sqlite(cls) -> "AsyncDatabaseAdapter":
+        """SQLite behind the thread-offload adapter, with SQLITE_THREADS threads."""
+        from .async_adapter import AsyncDatabaseAdapter
+        
+        return AsyncDatabaseAdapter(
+            cls._create_sqlite(),
+            max_workers=int(os.environ.get("SQLITE_THREADS", "8")),
+        )
+    
+    @classmethod
+    def create_from_url(cls, url: str) -> DatabaseInterface:
+        """
+        Create a bare, uninitialized backend from a URL, e.g. to copy data
+        between two backends in one process.
+
+        Args:
+            url: sqlite:///relative.db, sqlite:////absolute.db (or just a
+                path), postgresql://... or redis://...
+
+        Returns:
+            The backend, without the category cache or data versioning and
+            not shared with get_database()
+        """
+        scheme = url.split("://", 1)[0].lower() if "://" in url else "sqlite"
+        if scheme in ("postgres", "postgresql"):
+            from .postgres_db import PostgresDatabase
+            return PostgresDatabase(**{**cls._postgres_settings(), "database_url": url, "read_urls": ()})
+        if scheme in ("redis", "rediss"):
+            from .kv_db import KVDatabase
+            return KVDatabase(url)
+        if scheme == "sqlite":
+            from .sqlite_db import SQLiteDatabase
+            return SQLiteDatabase(url[len("sqlite:///"):] if "://" in url else url)
+        raise ValueError(f"Unsupported database URL scheme: {scheme}")
+
+    @classmethod
+    def get_database(cls, call_recorders: Sequence[CallRecorder] = ()) -> DatabaseInterface:
         """
         Get the appropriate database implementation based on the environment.
         
+        Args:
+            call_recorders: If any, every call that reaches the backend is
+                timed and reported to each as
+                recorder(backend, method, seconds, failed, params)
+        
         Returns:
             An instance of a class implementing DatabaseInterface
         """
@@ -35,32 +113,87 @@ class DatabaseFactory:
         
         backend = os.environ.get("DB_BACKEND", "sqlite").lower()
         has_redis_url = "REDIS_URL" in os.environ
-        database_url = os.environ.get("DATABASE_URL", "")
 
         if backend == "postgres":
-            if not POSTGRES_AVAILABLE:
+            try:
+                from .postgres_db import PostgresDatabase
+            except ImportError:
                 raise RuntimeError("PostgreSQL backend requested but psycopg is not installed")
-            cls._instance = PostgresDatabase(database_url)
-            print("Using PostgreSQL database")
-            cls._instance.initialize()
-            return cls._instance
-
+            cls._instance = PostgresDatabase(**cls._postgres_settings())
+            print(f"Using PostgreSQL database ({len(get_read_urls())} read replicas)")
         # Optional Redis backend if explicitly enabled.
-        if backend == 'redis' and has_redis_url and REDIS_AVAILABLE:
+        elif backend == 'redis' and has_redis_url:
             try:
+                from .kv_db import KVDatabase
                 cls._instance = KVDatabase()
                 print("Using Redis database")
             except Exception as e:
                 print(f"Failed to initialize Redis database: {e}")
                 print("Falling back to SQLite database")
-                cls._instance = SQLiteDatabase()
+                cls._instance = cls._create_sqlite()
         else:
-            # SQLite is the default for local and volume-backed deployments.
-            db_path = os.environ.get('SQLITE_DB_PATH') or os.environ.get('DATABASE_PATH', 'dinner_planner.db')
-            cls._instance = SQLiteDatabase(db_path)
-            print(f"Using SQLite database at {db_path}")
+            cls._instance = cls._create_sqlite()
+        
+        # Under the cache, so category cache hits are not counted as DB calls
+        if call_recorders:
+            cls._instance = TimedDatabase(cls._instance, cls._backend_name(cls._instance), call_recorders)
+        
+        cache = cls._category_cache()
+        if cache is not None:
+            cls._instance = CachedDatabase(cls._instance, cache)
         
         # Initialize the database
         cls._instance.initialize()
         
-        return cls._instance 
+        return cls._instance
+    
+    @classmethod
+    def get_async_database(cls, call_recorders: Sequence[CallRecorder] = ()) -> AsyncDatabaseInterface:
+        """
+        Get the async database implementation for the configured backend.
+        
+        Postgres and Redis use native async drivers; SQLite is wrapped in a
+        thread-offload adapter. Unlike get_database(), the instance is not
+        initialized here: await its initialize() from inside the event loop.
+        
+        Args:
+            call_recorders: As for get_database()
+        
+        Returns:
+            An instance of a class implementing AsyncDatabaseInterface
+        """
+        if cls._async_instance is not None:
+            return cls._async_instance
+        
+        backend = os.environ.get("DB_BACKEND", "sqlite").lower()
+        has_redis_url = "REDIS_URL" in os.environ
+
+        if backend == "postgres":
+            try:
+                from .async_postgres_db import AsyncPostgresDatabase
+            except ImportError:
+                raise RuntimeError("PostgreSQL backend requested but psycopg is not installed")
+            cls._async_instance = AsyncPostgresDatabase(**cls._postgres_settings())
+            print(f"Using PostgreSQL database (async, {len(get_read_urls())} read replicas)")
+        elif backend == 'redis' and has_redis_url:
+            try:
+                from .async_kv_db import AsyncKVDatabase
+                cls._async_instance = AsyncKVDatabase()
+                print("Using Redis database (async)")
+            except Exception as e:
+                print(f"Failed to initialize Redis database: {e}")
+                print("Falling back to SQLite database")
+                cls._async_instance = cls._create_async_sqlite()
+        else:
+            cls._async_instance = cls._create_async_sqlite()
+        
+        if call_recorders:
+            cls._async_instance = AsyncTimedDatabase(
+                cls._async_instance, cls._backend_name(cls._async_instance), call_recorders
+            )
+        
+        cache = cls._category_cache()
+        if cache is not None:
+            cls._async_instance = AsyncCachedDatabase(cls._async_instance, cache)
+        
+        return cls._async_instance
@@ -1,7 +1,131 @@
+import os
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
+# Number of events per page on the events list
+EVENTS_PAGE_SIZE = 20
+
+# Rows per round trip for bulk imports and exports
+BULK_BATCH_SIZE = 1000
+
+# Columns written by bulk_add_events / bulk_add_dishes, besides the optional ID
+EVENT_BULK_COLUMNS = ('title', 'date', 'location', 'description')
+DISH_BULK_COLUMNS = ('event_id', 'name', 'category_id', 'person_name', 'description', 'serves', 'created_at')
+
+def should_seed_sample_data() -> bool:
+    """Whether initialize() adds sample events to an empty database (SEED_SAMPLE_DATA)."""
+    return os.environ.get("SEED_SAMPLE_DATA", "true").lower() == "true"
+
+def count_dishes_by(dishes: List[Dict[str, Any]], field: str) -> Dict[Any, int]:
+    """
+    Count dishes per value of a field, e.g. 'category_id' or 'category_name'.
+    
+    Args:
+        dishes: Dish dictionaries
+        field: Key to group the dishes by
+        
+    Returns:
+        Mapping of field value to number of dishes
+    """
+    counts: Dict[Any, int] = {}
+    for dish in dishes:
+        counts[dish[field]] = counts.get(dish[field], 0) + 1
+    return counts
+
+def date_score(date: str) -> int:
+    """
+    Sortable integer form of an event date.
+    
+    'YYYY-MM-DD HH:MM' becomes YYYYMMDDHHMM, which orders like the timestamp
+    it represents without depending on the server's time zone.
+    """
+    return int(datetime.strptime(date[:16], '%Y-%m-%d %H:%M').strftime('%Y%m%d%H%M'))
+
+
+def score_to_date(score: int) -> str:
+    """Inverse of date_score()."""
+    return datetime.strptime(str(score), '%Y%m%d%H%M').strftime('%Y-%m-%d %H:%M')
+
+
+def encode_event_cursor(event: Dict[str, Any]) -> str:
+    """Opaque keyset cursor pointing at an event: '<date_score>-<id>'."""
+    return f"{date_score(event['date'])}-{event['id']}"
+
+
+def decode_event_cursor(cursor: str) -> Tuple[int, int]:
+    """
+    Decode a cursor from encode_event_cursor().
+    
+    Returns:
+        Tuple of (date score, event ID)
+        
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    score, _, event_id = cursor.partition('-')
+    score_to_date(int(score))
+    return int(score), int(event_id)
+
+
+def build_events_page(events: List[Dict[str, Any]], limit: int,
+                      after: Optional[str], before: Optional[str]) -> Dict[str, Any]:
+    """
+    Turn up to limit + 1 keyset query results into a page.
+    
+    Args:
+        events: Rows in the direction of travel, i.e. list order when paging
+            forward and reverse list order when paging back with `before`
+        limit: Page size
+        after: Cursor the query started after, if any
+        before: Cursor the query ended before, if any
+        
+    Returns:
+        Dictionary with 'events' in list order, plus 'next_cursor' and
+        'prev_cursor' (None when there is no such page)
+    """
+    has_more = len(events) > limit
+    events = events[:limit]
+    if before is not None:
+        events.reverse()
+        return {
+            'events': events,
+            'next_cursor': encode_event_cursor(events[-1]) if events else before,
+            'prev_cursor': encode_event_cursor(events[0]) if has_more else None,
+        }
+    
+    return {
+        'events': events,
+        'next_cursor': encode_event_cursor(events[-1]) if has_more else None,
+        'prev_cursor': (encode_event_cursor(events[0]) if events else after) if after else None,
+    }
+
+
+def bulk_rows(records: List[Dict[str, Any]], columns: Tuple[str, ...],
+              defaults: Dict[str, Any]) -> Tuple[List[tuple], List[tuple]]:
+    """
+    Split bulk-add records into value tuples for executemany, COPY or pipelines.
+    
+    Args:
+        records: Dictionaries passed to bulk_add_events / bulk_add_dishes
+        columns: Column order of the tuples
+        defaults: Values for optional columns missing from a record
+        
+    Returns:
+        Tuple of (rows of records with an 'id', each starting with that ID;
+        rows of records without one)
+    """
+    with_ids, without_ids = [], []
+    for record in records:
+        row = tuple(record[column] if record.get(column) is not None else defaults[column]
+                    for column in columns)
+        if record.get('id') is not None:
+            with_ids.append((record['id'],) + row)
+        else:
+            without_ids.append(row)
+    return with_ids, without_ids
+
+
 class DatabaseInterface(ABC):
     """
     Abstract base class defining the interface for database operations.
@@ -13,6 +137,10 @@ class DatabaseInterface(ABC):
         """Initialize the database, creating tables or structures as needed."""
         pass
     
+    def close(self) -> None:
+        """Release connections and other resources held by the backend."""
+        pass
+    
     @abstractmethod
     def get_events(self) -> List[Dict[str, Any]]:
         """
@@ -36,6 +164,41 @@ class DatabaseInterface(ABC):
         """
         pass
     
+    @abstractmethod
+    def get_events_page(self, upcoming: bool, limit: int = EVENTS_PAGE_SIZE,
+                        after: Optional[str] = None,
+                        before: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get one page of upcoming or past events using keyset pagination.
+        
+        Upcoming events are ordered soonest first, past events newest first.
+        Pass a page's 'next_cursor' as `after` to get the following page, or
+        its 'prev_cursor' as `before` to get the preceding one.
+        
+        Args:
+            upcoming: True for upcoming events, False for past events
+            limit: Maximum number of events on the page
+            after: Cursor of the event the page starts after
+            before: Cursor of the event the page ends before
+            
+        Returns:
+            Page dictionary as built by build_events_page()
+            
+        Raises:
+            ValueError: If a cursor is malformed
+        """
+        pass
+    
+    @abstractmethod
+    def count_events(self) -> Dict[str, int]:
+        """
+        Count upcoming and past events.
+        
+        Returns:
+            Dictionary with 'upcoming' and 'past' counts
+        """
+        pass
+    
     @abstractmethod
     def get_event_by_id(self, event_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -95,6 +258,36 @@ class DatabaseInterface(ABC):
         """
         pass
     
+    @abstractmethod
+    def get_events_with_dishes(self, event_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Get several events together with their dishes in one round trip.
+        
+        Args:
+            event_ids: IDs of the events to load; unknown IDs are skipped
+            
+        Returns:
+            Event dictionaries in the order of event_ids, each with a 'dishes'
+            list (as returned by get_dishes_for_event) and 'category_counts'
+            mapping category name to number of dishes
+        """
+        pass
+    
+    @abstractmethod
+    def get_event_bundle(self, event_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Get everything the event detail page needs in one round trip.
+        
+        Args:
+            event_id: The ID of the event
+            
+        Returns:
+            Dictionary with 'event', 'dishes', 'categories' and
+            'category_counts' (category ID to number of dishes), or None if
+            the event is not found
+        """
+        pass
+    
     # Methods for dish sign-ups - Phase 5
     
     @abstractmethod
@@ -185,3 +378,99 @@ class DatabaseInterface(ABC):
             True if the dish was deleted, False otherwise
         """
         pass
+    
+    @abstractmethod
+    def get_events_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """
+        Get the next batch of events in ID order, for streaming exports.
+        
+        Args:
+            after_id: Only return events with a greater ID (0 to start)
+            limit: Maximum number of events to return
+            
+        Returns:
+            Event dictionaries ordered by ID; an empty list once past the last one
+        """
+        pass
+    
+    @abstractmethod
+    def get_dishes_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """
+        Get the next batch of dishes in ID order, for streaming exports.
+        
+        Args:
+            after_id: Only return dishes with a greater ID (0 to start)
+            limit: Maximum number of dishes to return
+            
+        Returns:
+            Dish dictionaries (without 'category_name') ordered by ID; an
+            empty list once past the last one
+        """
+        pass
+    
+    @abstractmethod
+    def bulk_add_events(self, events: List[Dict[str, Any]]) -> int:
+        """
+        Add a batch of events in a single round trip or transaction.
+        
+        Args:
+            events: Dictionaries with 'title', 'date', 'location' and
+                'description', and optionally the 'id' to store the event
+                under (which must not be in use yet)
+            
+        Returns:
+            The number of events added
+        """
+        pass
+    
+    @abstractmethod
+    def bulk_add_dishes(self, dishes: List[Dict[str, Any]]) -> int:
+        """
+        Add a batch of dishes in a single round trip or transaction.
+        
+        Args:
+            dishes: Dictionaries with 'event_id', 'name', 'category_id',
+                'person_name', 'description' and 'serves', and optionally
+                'id' and 'created_at' to keep those of an exported dish
+            
+        Returns:
+            The number of dishes added
+            
+        Raises:
+            ValueError: If a referenced event or category does not exist;
+                nothing from the batch is added
+        """
+        pass
+    
+    @abstractmethod
+    def save_categories(self, categories: List[Dict[str, Any]]) -> int:
+        """
+        Make the dish categories exactly these, under their given IDs, for
+        copying them from another database.
+        
+        Args:
+            categories: Dictionaries with 'id' and 'name'; a category whose ID
+                already exists is renamed, and categories not listed (such as
+                the defaults initialize() adds) are deleted
+            
+        Returns:
+            The number of categories saved
+            
+        Raises:
+            ValueError: If a category to delete still has dishes (SQL backends)
+        """
+        pass
+    
+    @abstractmethod
+    def get_data_version(self) -> int:
+        """
+        Get the data version: a counter kept in the database, so every
+        process using it sees the same value. Each write that changes an
+        event, dish or category raises it atomically with the change (by
+        trigger in SQL, in the write's script or MULTI in Redis).
+        
+        Anything derived from reads (rendered pages, ETags, ...) can be
+        tagged with the version it was built from and discarded once the
+        version moves on.
+        """
+        pass
@@ -0,0 +1,193 @@
+from typing import List, Dict, Any, Optional
+from .async_db_interface import AsyncDatabaseInterface
+from .db_interface import BULK_BATCH_SIZE, EVENTS_PAGE_SIZE, DatabaseInterface
+
+class DatabaseProxy(DatabaseInterface):
+    """
+    DatabaseInterface implementation that forwards every call to another one.
+
+    Base class for decorators (caching, instrumentation, ...) that only need
+    to override a few methods. Attributes that are not part of the interface,
+    such as pool_stats(), are forwarded as well.
+    """
+
+    def __init__(self, database: DatabaseInterface):
+        """
+        Wrap a database implementation.
+
+        Args:
+            database: The implementation every call is forwarded to
+        """
+        self.database = database
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.database, name)
+
+    def initialize(self) -> None:
+        self.database.initialize()
+
+    def close(self) -> None:
+        self.database.close()
+
+    def get_events(self) -> List[Dict[str, Any]]:
+        return self.database.get_events()
+
+    def get_upcoming_events(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self.database.get_upcoming_events(limit=limit)
+
+    def get_events_page(self, upcoming: bool, limit: int = EVENTS_PAGE_SIZE,
+                        after: Optional[str] = None,
+                        before: Optional[str] = None) -> Dict[str, Any]:
+        return self.database.get_events_page(upcoming, limit, after, before)
+
+    def count_events(self) -> Dict[str, int]:
+        return self.database.count_events()
+
+    def get_event_by_id(self, event_id: int) -> Optional[Dict[str, Any]]:
+        return self.database.get_event_by_id(event_id)
+
+    def add_event(self, title: str, date: str, location: str, description: str) -> Dict[str, Any]:
+        return self.database.add_event(title, date, location, description)
+
+    def update_event(self, event_id: int, title: str, date: str, location: str, description: str) -> Optional[Dict[str, Any]]:
+        return self.database.update_event(event_id, title, date, location, description)
+
+    def delete_event(self, event_id: int) -> bool:
+        return self.database.delete_event(event_id)
+
+    def get_events_with_dishes(self, event_ids: List[int]) -> List[Dict[str, Any]]:
+        return self.database.get_events_with_dishes(event_ids)
+
+    def get_event_bundle(self, event_id: int) -> Optional[Dict[str, Any]]:
+        return self.database.get_event_bundle(event_id)
+
+    def get_dish_categories(self) -> List[Dict[str, Any]]:
+        return self.database.get_dish_categories()
+
+    def get_dishes_for_event(self, event_id: int) -> List[Dict[str, Any]]:
+        return self.database.get_dishes_for_event(event_id)
+
+    def get_dish_by_id(self, dish_id: int) -> Optional[Dict[str, Any]]:
+        return self.database.get_dish_by_id(dish_id)
+
+    def add_dish(self, event_id: int, name: str, category_id: int,
+                 person_name: str, description: str = "",
+                 serves: int = 0) -> Dict[str, Any]:
+        return self.database.add_dish(event_id, name, category_id, person_name, description, serves)
+
+    def update_dish(self, dish_id: int, name: str, category_id: int,
+                    person_name: str, description: str = "",
+                    serves: int = 0) -> Optional[Dict[str, Any]]:
+        return self.database.update_dish(dish_id, name, category_id, person_name, description, serves)
+
+    def delete_dish(self, dish_id: int) -> bool:
+        return self.database.delete_dish(dish_id)
+
+    def get_events_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        return self.database.get_events_after(after_id, limit)
+
+    def get_dishes_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        return self.database.get_dishes_after(after_id, limit)
+
+    def bulk_add_events(self, events: List[Dict[str, Any]]) -> int:
+        return self.database.bulk_add_events(events)
+
+    def bulk_add_dishes(self, dishes: List[Dict[str, Any]]) -> int:
+        return self.database.bulk_add_dishes(dishes)
+
+    def save_categories(self, categories: List[Dict[str, Any]]) -> int:
+        return self.database.save_categories(categories)
+
+    def get_data_version(self) -> int:
+        return self.database.get_data_version()
+
+
+class AsyncDatabaseProxy(AsyncDatabaseInterface):
+    """AsyncDatabaseInterface implementation that forwards every call to another one."""
+
+    def __init__(self, database: AsyncDatabaseInterface):
+        """
+        Wrap an async database implementation.
+
+        Args:
+            database: The implementation every call is forwarded to
+        """
+        self.database = database
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.database, name)
+
+    async def initialize(self) -> None:
+        await self.database.initialize()
+
+    async def close(self) -> None:
+        await self.database.close()
+
+    async def get_events(self) -> List[Dict[str, Any]]:
+        return await self.database.get_events()
+
+    async def get_upcoming_events(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return await self.database.get_upcoming_events(limit=limit)
+
+    async def get_events_page(self, upcoming: bool, limit: int = EVENTS_PAGE_SIZE,
+                              after: Optional[str] = None,
+                              before: Optional[str] = None) -> Dict[str, Any]:
+        return await self.database.get_events_page(upcoming, limit, after, before)
+
+    async def count_events(self) -> Dict[str, int]:
+        return await self.database.count_events()
+
+    async def get_event_by_id(self, event_id: int) -> Optional[Dict[str, Any]]:
+        return await self.database.get_event_by_id(event_id)
+
+    async def add_event(self, title: str, date: str, location: str, description: str) -> Dict[str, Any]:
+        return await self.database.add_event(title, date, location, description)
+
+    async def update_event(self, event_id: int, title: str, date: str, location: str, description: str) -> Optional[Dict[str, Any]]:
+        return await self.database.update_event(event_id, title, date, location, description)
+
+    async def delete_event(self, event_id: int) -> bool:
+        return await self.database.delete_event(event_id)
+
+    async def get_events_with_dishes(self, event_ids: List[int]) -> List[Dict[str, Any]]:
+        return await self.database.get_events_with_dishes(event_ids)
+
+    async def get_event_bundle(self, event_id: int) -> Optional[Dict[str, Any]]:
+        return await self.database.get_event_bundle(event_id)
+
+    async def get_dish_categories(self) -> List[Dict[str, Any]]:
+        return await self.database.get_dish_categories()
+
+    async def get_dishes_for_event(self, event_id: int) -> List[Dict[str, Any]]:
+        return await self.database.get_dishes_for_event(event_id)
+
+    async def get_dish_by_id(self, dish_id: int) -> Optional[Dict[str, Any]]:
+        return await self.database.get_dish_by_id(dish_id)
+
+    async def add_dish(self, event_id: int, name: str, category_id: int,
+                       person_name: str, description: str = "",
+                       serves: int = 0) -> Dict[str, Any]:
+        return await self.database.add_dish(event_id, name, category_id, person_name, description, serves)
+
+    async def update_dish(self, dish_id: int, name: str, category_id: int,
+                          person_name: str, description: str = "",
+                          serves: int = 0) -> Optional[Dict[str, Any]]:
+        return await self.database.update_dish(dish_id, name, category_id, person_name, description, serves)
+
+    async def delete_dish(self, dish_id: int) -> bool:
+        return await self.database.delete_dish(dish_id)
+
+    async def get_events_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        return await self.database.get_events_after(after_id, limit)
+
+    async def get_dishes_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        return await self.database.get_dishes_after(after_id, limit)
+
+    async def bulk_add_events(self, events: List[Dict[str, Any]]) -> int:
+        return await self.database.bulk_add_events(events)
+
+    async def bulk_add_dishes(self, dishes: List[Dict[str, Any]]) -> int:
+        return await self.database.bulk_add_dishes(dishes)
+
+    async def get_data_version(self) -> int:
+        return await self.database.get_data_version()
@@ -1,146 +1,782 @@
 import os
 import json
+import time
 import redis
 from typing import List, Dict, Any, Optional
 from datetime import datetime
-from .db_interface import DatabaseInterface
+from .changes import DISH_CHANGES_CHANNEL, ChangeSource, DishChange
+from .db_interface import (
+    BULK_BATCH_SIZE, DISH_BULK_COLUMNS, EVENT_BULK_COLUMNS, EVENTS_PAGE_SIZE,
+    DatabaseInterface, build_events_page, bulk_rows, count_dishes_by,
+    date_score, decode_event_cursor, should_seed_sample_data
+)
 
-class KVDatabase(DatabaseInterface):
+DEFAULT_CATEGORIES = [
+    "Appetizer",
+    "Main Dish",
+    "Side Dish",
+    "Salad",
+    "Dessert",
+    "Bread",
+    "Beverage"
+]
+
+SAMPLE_EVENTS = [
+    {
+        'title': 'Easter Dinner',
+        'date': '2024-03-31 17:00',
+        'location': 'Mom\'s House',
+        'description': 'Annual family Easter dinner. Everyone is welcome to bring a dish!'
+    },
+    {
+        'title': 'Summer BBQ',
+        'date': '2024-07-04 16:00',
+        'location': 'Backyard',
+        'description': 'Independence Day celebration with grilling and fireworks.'
+    },
+    {
+        'title': 'Thanksgiving Dinner',
+        'date': '2024-11-28 16:00',
+        'location': 'Grandma\'s House',
+        'description': 'Traditional Thanksgiving dinner with the whole family.'
+    }
+]
+
+
+def get_redis_url() -> str:
+    """Return REDIS_URL, raising if it is not configured."""
+    redis_url = os.environ.get('REDIS_URL')
+    if not redis_url:
+        raise EnvironmentError("REDIS_URL environment variable is not set")
+    return redis_url
+
+
+class KVKeyspace:
+    """
+    Key layout and pipeline helpers shared by the sync and async Redis backends.
+    
+    The _queue_* methods add commands to a pipeline and the _parse_* methods
+    turn the pipeline results into interface dictionaries, so both backends
+    only differ in how they execute the pipeline. Every interface method costs
+    one or two round trips regardless of how many events or dishes exist.
+    """
+    
+    # Key prefixes for different data types
+    EVENT_PREFIX = "event:"
+    EVENT_IDS_KEY = "event_ids"
+    EVENT_DATES_KEY = "event_dates"  # ZSET of event IDs scored by date_score()
+    # Members with equal scores sort by their bytes, so the date index holds
+    # IDs zero-padded to a fixed width; then ties sort numerically, as the
+    # SQL backends' ORDER BY date, id does. The scripts pad with the same
+    # format.
+    EVENT_MEMBER_FORMAT = "%020d"
+    COUNTER_KEY = "counter"
+    DISH_PREFIX = "dish:"
+    DISH_IDS_KEY = "dish_ids"
+    DISH_EVENT_PREFIX = "dish_event:"
+    CATEGORY_PREFIX = "category:"
+    CATEGORY_IDS_KEY = "category_ids"
+    DATA_VERSION_KEY = "data_version"  # see get_data_version()
+    
+    # Bumped whenever initialize() gains a step existing keyspaces need:
+    # 1 seeded categories and sample events, 2 built the event_dates index,
+    # 3 rebuilt it with zero-padded members
+    SCHEMA_VERSION = 3
+    SCHEMA_VERSION_KEY = "schema_version"
+    SCHEMA_LOCK_KEY = "schema_lock"
+    SCHEMA_LOCK_TIMEOUT = 60  # seconds, in case the holder dies mid-bootstrap
+    # Delete the lock only if we still hold it
+    RELEASE_LOCK_SCRIPT = """
+        if redis.call('GET', KEYS[1]) == ARGV[1] then
+            return redis.call('DEL', KEYS[1])
+        end
+        return 0
+    """
+    
+    # Write scripts: each mutation checks, writes and answers in one atomic
+    # round trip, so nothing can change between the check and the write.
+    # Documents are passed without the fields the script fills in. The last
+    # key is always the data version, which a script INCRs only when it
+    # changed something.
+    
+    # KEYS: counter, event_ids, event_dates, data version; ARGV: event prefix,
+    # event JSON, date score
+    ADD_EVENT_SCRIPT = """
+        local id = redis.call('INCR', KEYS[1])
+        local event = cjson.decode(ARGV[2])
+        event['id'] = id
+        redis.call('SET', ARGV[1] .. id, cjson.encode(event))
+        redis.call('SADD', KEYS[2], id)
+        redis.call('ZADD', KEYS[3], ARGV[3], string.format('%020d', id))
+        redis.call('INCR', KEYS[4])
+        return id
+    """
+    # KEYS: event, event_dates, data version; ARGV: event JSON, date score,
+    # date index member. Returns 1, or 0 without the event.
+    UPDATE_EVENT_SCRIPT = """
+        if not redis.call('SET', KEYS[1], ARGV[1], 'XX') then
+            return 0
+        end
+        redis.call('ZADD', KEYS[2], ARGV[2], ARGV[3])
+        redis.call('INCR', KEYS[3])
+        return 1
+    """
+    # KEYS: event, its dish_event set, event_ids, event_dates, dish_ids, data
+    # version; ARGV: dish prefix, event ID, date index member
+    DELETE_EVENT_SCRIPT = """
+        if redis.call('DEL', KEYS[1]) == 0 then
+            return 0
+        end
+        for _, dish_id in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+            redis.call('DEL', ARGV[1] .. dish_id)
+            redis.call('SREM', KEYS[5], dish_id)
+        end
+        redis.call('DEL', KEYS[2])
+        redis.call('SREM', KEYS[3], ARGV[2])
+        redis.call('ZREM', KEYS[4], ARGV[3])
+        redis.call('INCR', KEYS[6])
+        return 1
+    """
+    # Dish writes also PUBLISH a DishChange on the channel in their last ARGV.
+    
+    # KEYS: event, category, counter, dish_ids, the event's dish_event set,
+    # data version; ARGV: dish prefix, dish JSON, channel. Returns {dish ID, category JSON},
+    # or {0, name of the missing document}.
+    ADD_DISH_SCRIPT = """
+        if redis.call('EXISTS', KEYS[1]) == 0 then
+            return {0, 'event'}
+        end
+        local category = redis.call('GET', KEYS[2])
+        if not category then
+            return {0, 'category'}
+        end
+        local id = redis.call('INCR', KEYS[3])
+        local dish = cjson.decode(ARGV[2])
+        dish['id'] = id
+        redis.call('SET', ARGV[1] .. id, cjson.encode(dish))
+        redis.call('SADD', KEYS[4], id)
+        redis.call('SADD', KEYS[5], id)
+        redis.call('INCR', KEYS[6])
+        redis.call('PUBLISH', ARGV[3], cjson.encode({op = 'add', event_id = dish['event_id'], dish_id = id}))
+        return {id, category}
+    """
+    # KEYS: dish, category, data version; ARGV: JSON of the fields to change, channel. Returns
+    # {1, dish JSON, category JSON}, or {0} without the dish, {-1} without
+    # the category.
+    UPDATE_DISH_SCRIPT = """
+        local existing = redis.call('GET', KEYS[1])
+        if not existing then
+            return {0}
+        end
+        local category = redis.call('GET', KEYS[2])
+        if not category then
+            return {-1}
+        end
+        local dish = cjson.decode(existing)
+        for field, value in pairs(cjson.decode(ARGV[1])) do
+            dish[field] = value
+        end
+        local encoded = cjson.encode(dish)
+        redis.call('SET', KEYS[1], encoded)
+        redis.call('INCR', KEYS[3])
+        redis.call('PUBLISH', ARGV[2], cjson.encode({op = 'update', event_id = dish['event_id'], dish_id = dish['id']}))
+        return {1, encoded, category}
+    """
+    # KEYS: dish, dish_ids, data version; ARGV: dish_event prefix, dish ID, channel
+    DELETE_DISH_SCRIPT = """
+        local existing = redis.call('GET', KEYS[1])
+        if not existing then
+            return 0
+        end
+        local event_id = cjson.decode(existing)['event_id']
+        redis.call('DEL', KEYS[1])
+        redis.call('SREM', KEYS[2], ARGV[2])
+        redis.call('SREM', ARGV[1] .. event_id, ARGV[2])
+        redis.call('INCR', KEYS[3])
+        redis.call('PUBLISH', ARGV[3], cjson.encode({op = 'delete', event_id = event_id, dish_id = tonumber(ARGV[2])}))
+        return 1
+    """
+    
+    # Bulk scripts take two JSON lists of documents: those keeping their ID,
+    # then those without one. Every check runs before the first write, so a
+    # batch is stored whole or not at all; a kept ID is refused if it is
+    # stored already or repeated in the batch, as a primary key would. The
+    # counter is raised past the kept IDs before new ones are drawn from it.
+    # Returns {1, rows added}, or {0, what was wrong}.
+    
+    # KEYS: counter, event_ids, event_dates, data version; ARGV: event prefix, kept
+    # [event, date score] pairs, new pairs
+    BULK_ADD_EVENTS_SCRIPT = """
+        local kept = cjson.decode(ARGV[2])
+        local new = cjson.decode(ARGV[3])
+        local last_kept = 0
+        local seen = {}
+        for _, pair in ipairs(kept) do
+            if seen[pair[1]['id']] or redis.call('EXISTS', ARGV[1] .. pair[1]['id']) == 1 then
+                return {0, 'taken'}
+            end
+            seen[pair[1]['id']] = true
+            last_kept = math.max(last_kept, pair[1]['id'])
+        end
+        if tonumber(redis.call('GET', KEYS[1]) or '0') < last_kept then
+            redis.call('SET', KEYS[1], last_kept)
+        end
+        local id = redis.call('INCRBY', KEYS[1], #new) - #new
+        for _, pair in ipairs(new) do
+            id = id + 1
+            pair[1]['id'] = id
+            table.insert(kept, pair)
+        end
+        for _, pair in ipairs(kept) do
+            redis.call('SET', ARGV[1] .. pair[1]['id'], cjson.encode(pair[1]))
+            redis.call('SADD', KEYS[2], pair[1]['id'])
+            redis.call('ZADD', KEYS[3], pair[2], string.format('%020d', pair[1]['id']))
+        end
+        if #kept > 0 then
+            redis.call('INCR', KEYS[4])
+        end
+        return {1, #kept}
+    """
+    # KEYS: counter, dish_ids, data version; ARGV: event prefix, category prefix, dish
+    # prefix, dish_event prefix, kept dishes, new dishes, channel. Each event
+    # given dishes gets one "reload" DishChange, not one per dish.
+    BULK_ADD_DISHES_SCRIPT = """
+        local kept = cjson.decode(ARGV[5])
+        local new = cjson.decode(ARGV[6])
+        local checked = {}
+        local function exists(key)
+            if checked[key] == nil then
+                checked[key] = redis.call('EXISTS', key) == 1
+            end
+            return checked[key]
+        end
+        local last_kept = 0
+        for _, dishes in ipairs({kept, new}) do
+            for _, dish in ipairs(dishes) do
+                if not exists(ARGV[1] .. dish['event_id']) then
+                    return {0, 'event'}
+                end
+                if not exists(ARGV[2] .. dish['category_id']) then
+                    return {0, 'category'}
+                end
+            end
+        end
+        local seen = {}
+        for _, dish in ipairs(kept) do
+            if seen[dish['id']] or redis.call('EXISTS', ARGV[3] .. dish['id']) == 1 then
+                return {0, 'taken'}
+            end
+            seen[dish['id']] = true
+            last_kept = math.max(last_kept, dish['id'])
+        end
+        if tonumber(redis.call('GET', KEYS[1]) or '0') < last_kept then
+            redis.call('SET', KEYS[1], last_kept)
+        end
+        local id = redis.call('INCRBY', KEYS[1], #new) - #new
+        for _, dish in ipairs(new) do
+            id = id + 1
+            dish['id'] = id
+            table.insert(kept, dish)
+        end
+        local events = {}
+        for _, dish in ipairs(kept) do
+            redis.call('SET', ARGV[3] .. dish['id'], cjson.encode(dish))
+            redis.call('SADD', KEYS[2], dish['id'])
+            redis.call('SADD', ARGV[4] .. dish['event_id'], dish['id'])
+            events[dish['event_id']] = true
+        end
+        if #kept > 0 then
+            redis.call('INCR', KEYS[3])
+        end
+        for event_id in pairs(events) do
+            redis.call('PUBLISH', ARGV[7], cjson.encode({op = 'reload', event_id = event_id}))
+        end
+        return {1, #kept}
+    """
+    
+    def _register_write_scripts(self) -> None:
+        """Wrap the write scripts for self.redis; they run by EVALSHA, loaded on first use."""
+        self._add_event_script = self.redis.register_script(self.ADD_EVENT_SCRIPT)
+        self._update_event_script = self.redis.register_script(self.UPDATE_EVENT_SCRIPT)
+        self._delete_event_script = self.redis.register_script(self.DELETE_EVENT_SCRIPT)
+        self._add_dish_script = self.redis.register_script(self.ADD_DISH_SCRIPT)
+        self._update_dish_script = self.redis.register_script(self.UPDATE_DISH_SCRIPT)
+        self._delete_dish_script = self.redis.register_script(self.DELETE_DISH_SCRIPT)
+        self._bulk_add_events_script = self.redis.register_script(self.BULK_ADD_EVENTS_SCRIPT)
+        self._bulk_add_dishes_script = self.redis.register_script(self.BULK_ADD_DISHES_SCRIPT)
+    
+    def _schema_is_current(self, version: Optional[bytes]) -> bool:
+        return version is not None and int(version) >= self.SCHEMA_VERSION
+    
+    def _event_member(self, event_id: int) -> str:
+        """An event's member in the date index."""
+        return self.EVENT_MEMBER_FORMAT % event_id
+    
+    def _event_key(self, event_id: int) -> str:
+        return f"{self.EVENT_PREFIX}{event_id}"
+    
+    def _dish_key(self, dish_id: int) -> str:
+        return f"{self.DISH_PREFIX}{dish_id}"
+    
+    def _dish_event_key(self, event_id: int) -> str:
+        return f"{self.DISH_EVENT_PREFIX}{event_id}"
+    
+    def _category_key(self, category_id: int) -> str:
+        return f"{self.CATEGORY_PREFIX}{category_id}"
+    
+    # Reads
+    
+    def _queue_events(self, pipe) -> None:
+        """Queue a fetch of every event document (SORT ... GET, one command)."""
+        pipe.sort(self.EVENT_IDS_KEY, by='nosort', get=f"{self.EVENT_PREFIX}*")
+    
+    def _queue_categories(self, pipe) -> None:
+        """Queue a fetch of every category document (SORT ... GET, one command)."""
+        pipe.sort(self.CATEGORY_IDS_KEY, by='nosort', get=f"{self.CATEGORY_PREFIX}*")
+    
+    def _queue_dishes(self, pipe, event_id: int) -> None:
+        """Queue a fetch of every dish document of an event."""
+        pipe.sort(self._dish_event_key(event_id), by='nosort', get=f"{self.DISH_PREFIX}*")
+    
+    def _queue_event_with_dishes(self, pipe, event_id: int) -> None:
+        """Queue a fetch of an event document and all of its dish documents."""
+        pipe.get(self._event_key(event_id))
+        self._queue_dishes(pipe, event_id)
+    
+    @staticmethod
+    def _load_documents(values) -> List[Dict[str, Any]]:
+        """Decode JSON documents, skipping keys that no longer exist."""
+        return [json.loads(value) for value in values if value]
+    
+    @staticmethod
+    def _sort_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        events.sort(key=lambda x: x['date'])
+        return events
+    
+    @staticmethod
+    def _sort_categories(categories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        categories.sort(key=lambda x: x['name'])
+        return categories
+    
+    @staticmethod
+    def _attach_category_names(dishes: List[Dict[str, Any]],
+                               categories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Add 'category_name' to each dish and sort like get_dishes_for_event."""
+        names = {category['id']: category['name'] for category in categories}
+        for dish in dishes:
+            dish['category_name'] = names.get(dish['category_id'], "Unknown")
+        dishes.sort(key=lambda x: (x['category_name'], x['name']))
+        return dishes
+    
+    @staticmethod
+    def _with_category_name(dish: Dict[str, Any], category_json: Optional[bytes]) -> Dict[str, Any]:
+        """Add 'category_name' to a single dish from its category document."""
+        dish['category_name'] = json.loads(category_json)['name'] if category_json else "Unknown"
+        return dish
+    
+    def _queue_event_ids_by_date(self, pipe, min_score, max_score,
+                                 limit: Optional[int] = None, offset: int = 0,
+                                 newest_first: bool = False) -> None:
+        """Queue a date-ordered range query on the date index."""
+        paging = {'start': offset, 'num': limit} if limit and limit > 0 else {}
+        if newest_first:
+            pipe.zrevrangebyscore(self.EVENT_DATES_KEY, max_score, min_score, **paging)
+        else:
+            pipe.zrangebyscore(self.EVENT_DATES_KEY, min_score, max_score, **paging)
+    
+    def _queue_upcoming_event_ids(self, pipe, limit: Optional[int]) -> None:
+        """Queue the IDs of the next `limit` upcoming events, soonest first."""
+        now = datetime.now().strftime('%Y-%m-%d %H:%M')
+        self._queue_event_ids_by_date(pipe, date_score(now), '+inf', limit)
+    
+    def _queue_events_page_ids(self, pipe, upcoming: bool, limit: int,
+                               after: Optional[str], before: Optional[str]) -> None:
+        """
+        Queue the keyset range queries behind get_events_page().
+        
+        With a cursor, two commands are queued: the members sharing the
+        cursor's score (filtered by _page_event_ids) and the range strictly
+        beyond it. Scores are whole minutes, so exclusive bounds are +/- 1.
+        """
+        now = date_score(datetime.now().strftime('%Y-%m-%d %H:%M'))
+        ascending = upcoming != (before is not None)
+        low, high = (now, None) if upcoming else (None, now - 1)
+        
+        cursor_value = before if before is not None else after
+        if cursor_value is not None:
+            score, _ = decode_event_cursor(cursor_value)
+            # Clamped to the section, so a cursor from the other side of
+            # "now" contributes no ties
+            self._queue_event_ids_by_date(
+                pipe, score if low is None else max(low, score),
+                score if high is None else min(high, score), newest_first=not ascending
+            )
+            if ascending:
+                low = score + 1 if low is None else max(low, score + 1)
+            else:
+                high = score - 1 if high is None else min(high, score - 1)
+        
+        self._queue_event_ids_by_date(
+            pipe, '-inf' if low is None else low, '+inf' if high is None else high,
+            limit + 1, newest_first=not ascending
+        )
+    
+    def _page_event_ids(self, results: List[Any], upcoming: bool, limit: int,
+                        after: Optional[str], before: Optional[str]) -> List[bytes]:
+        """Combine _queue_events_page_ids results into at most limit + 1 IDs."""
+        event_ids = list(results[-1])
+        if len(results) == 2 and results[0]:
+            # Padded members with equal scores are in ID order in the ZSET
+            _, cursor_id = decode_event_cursor(before if before is not None else after)
+            cursor_member = self._event_member(cursor_id).encode('utf-8')
+            if upcoming != (before is not None):
+                ties = [member for member in results[0] if member > cursor_member]
+            else:
+                ties = [member for member in results[0] if member < cursor_member]
+            event_ids = ties + event_ids
+        return event_ids[:limit + 1]
+    
+    def _queue_count_events(self, pipe) -> None:
+        """Queue counts of upcoming and past events from the date index."""
+        now = date_score(datetime.now().strftime('%Y-%m-%d %H:%M'))
+        pipe.zcount(self.EVENT_DATES_KEY, now, '+inf')
+        pipe.zcount(self.EVENT_DATES_KEY, '-inf', now - 1)
+    
+    def _event_keys(self, event_ids) -> List[str]:
+        return [f"{self.EVENT_PREFIX}{int(event_id)}" for event_id in event_ids]
+    
+    def _parse_events_with_dishes(self, results: List[Any]) -> List[Dict[str, Any]]:
+        """Parse _queue_categories + _queue_event_with_dishes (per event) results."""
+        categories = self._load_documents(results[0])
+        events = []
+        for event_json, dish_values in zip(results[1::2], results[2::2]):
+            if not event_json:
+                continue
+            event = json.loads(event_json)
+            event['dishes'] = self._attach_category_names(self._load_documents(dish_values), categories)
+            event['category_counts'] = count_dishes_by(event['dishes'], 'category_name')
+            events.append(event)
+        return events
+    
+    def _parse_event_bundle(self, results: List[Any]) -> Optional[Dict[str, Any]]:
+        """Parse _queue_categories + _queue_event_with_dishes results into a bundle."""
+        category_values, event_json, dish_values = results
+        if not event_json:
+            return None
+        categories = self._load_documents(category_values)
+        dishes = self._attach_category_names(self._load_documents(dish_values), categories)
+        return {
+            'event': json.loads(event_json),
+            'dishes': dishes,
+            'categories': self._sort_categories(categories),
+            'category_counts': count_dishes_by(dishes, 'category_id'),
+        }
+    
+    # Writes
+    
+    def _queue_seed_check(self, pipe) -> None:
+        """Queue counter creation plus the checks deciding what to seed or migrate."""
+        pipe.set(self.COUNTER_KEY, "0", nx=True)
+        pipe.exists(self.CATEGORY_IDS_KEY)
+        pipe.scard(self.EVENT_IDS_KEY)
+    
+    def _queue_date_index_rebuild(self, pipe, values: List[Any], batch_size: int = 1000) -> None:
+        """Queue replacing the date index with every event from _queue_events results."""
+        pipe.delete(self.EVENT_DATES_KEY)
+        scores = {}
+        for event in self._load_documents(values):
+            scores[self._event_member(event['id'])] = date_score(event['date'])
+            if len(scores) >= batch_size:
+                pipe.zadd(self.EVENT_DATES_KEY, scores)
+                scores = {}
+        if scores:
+            pipe.zadd(self.EVENT_DATES_KEY, scores)
+    
+    def _queue_seed_categories(self, pipe) -> None:
+        for i, category in enumerate(DEFAULT_CATEGORIES, 1):
+            pipe.set(self._category_key(i), json.dumps({"id": i, "name": category}))
+        pipe.sadd(self.CATEGORY_IDS_KEY, *[str(i) for i in range(1, len(DEFAULT_CATEGORIES) + 1)])
+    
+    @staticmethod
+    def _build_event(event_id: Optional[int], title: str, date: str, location: str, description: str) -> Dict[str, Any]:
+        return {
+            'id': event_id,
+            'title': title,
+            'date': date,
+            'location': location,
+            'description': description
+        }
+    
+    def _queue_store_event(self, pipe, event: Dict[str, Any]) -> None:
+        """Queue writing an event document and registering its ID and date."""
+        pipe.set(self._event_key(event['id']), json.dumps(event))
+        pipe.sadd(self.EVENT_IDS_KEY, str(event['id']))
+        pipe.zadd(self.EVENT_DATES_KEY, {self._event_member(event['id']): date_score(event['date'])})
+    
+    def _add_event_call(self, event: Dict[str, Any]) -> Dict[str, list]:
+        """ADD_EVENT_SCRIPT keys and args for an event built without an ID."""
+        document = {field: value for field, value in event.items() if field != 'id'}
+        return {
+            'keys': [self.COUNTER_KEY, self.EVENT_IDS_KEY, self.EVENT_DATES_KEY, self.DATA_VERSION_KEY],
+            'args': [self.EVENT_PREFIX, json.dumps(document), date_score(event['date'])],
+        }
+    
+    def _update_event_call(self, event: Dict[str, Any]) -> Dict[str, list]:
+        return {
+            'keys': [self._event_key(event['id']), self.EVENT_DATES_KEY, self.DATA_VERSION_KEY],
+            'args': [json.dumps(event), date_score(event['date']), self._event_member(event['id'])],
+        }
+    
+    def _delete_event_call(self, event_id: int) -> Dict[str, list]:
+        return {
+            'keys': [self._event_key(event_id), self._dish_event_key(event_id),
+                     self.EVENT_IDS_KEY, self.EVENT_DATES_KEY, self.DISH_IDS_KEY, self.DATA_VERSION_KEY],
+            'args': [self.DISH_PREFIX, event_id, self._event_member(event_id)],
+        }
+    
+    @staticmethod
+    def _build_dish(dish_id: Optional[int], event_id: int, name: str, category_id: int,
+                    person_name: str, description: str, serves: int,
+                    created_at: str) -> Dict[str, Any]:
+        return {
+            'id': dish_id,
+            'event_id': event_id,
+            'name': name,
+            'category_id': category_id,
+            'person_name': person_name,
+            'description': description,
+            'serves': serves,
+            'created_at': created_at
+        }
+    
+    def _add_dish_call(self, dish: Dict[str, Any]) -> Dict[str, list]:
+        """ADD_DISH_SCRIPT keys and args for a dish built without an ID."""
+        document = {field: value for field, value in dish.items() if field != 'id'}
+        return {
+            'keys': [self._event_key(dish['event_id']), self._category_key(dish['category_id']),
+                     self.COUNTER_KEY, self.DISH_IDS_KEY, self._dish_event_key(dish['event_id']),
+                     self.DATA_VERSION_KEY],
+            'args': [self.DISH_PREFIX, json.dumps(document), DISH_CHANGES_CHANNEL],
+        }
+    
+    def _parse_added_dish(self, result, dish: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn an ADD_DISH_SCRIPT result into the stored dish, or raise ValueError."""
+        dish_id, detail = result
+        if not dish_id:
+            if detail == b'event':
+                raise ValueError(f"Event with ID {dish['event_id']} does not exist")
+            raise ValueError(f"Category with ID {dish['category_id']} does not exist")
+        dish['id'] = int(dish_id)
+        return self._with_category_name(dish, detail)
+    
+    def _update_dish_call(self, dish_id: int, name: str, category_id: int, person_name: str,
+                          description: str, serves: int) -> Dict[str, list]:
+        changes = {
+            'name': name,
+            'category_id': category_id,
+            'person_name': person_name,
+            'description': description,
+            'serves': serves,
+        }
+        return {
+            'keys': [self._dish_key(dish_id), self._category_key(category_id), self.DATA_VERSION_KEY],
+            'args': [json.dumps(changes), DISH_CHANGES_CHANNEL],
+        }
+    
+    def _parse_updated_dish(self, result, category_id: int) -> Optional[Dict[str, Any]]:
+        """Turn an UPDATE_DISH_SCRIPT result into the updated dish, None, or ValueError."""
+        if result[0] == 0:
+            return None
+        if result[0] < 0:
+            raise ValueError(f"Category with ID {category_id} does not exist")
+        _, dish_json, category_json = result
+        return self._with_category_name(json.loads(dish_json), category_json)
+    
+    def _delete_dish_call(self, dish_id: int) -> Dict[str, list]:
+        return {
+            'keys': [self._dish_key(dish_id), self.DISH_IDS_KEY, self.DATA_VERSION_KEY],
+            'args': [self.DISH_EVENT_PREFIX, dish_id, DISH_CHANGES_CHANNEL],
+        }
+    
+    # Bulk moves
+    
+    def _document_windows(self, prefix: str, after_id: int, limit: int, last_id: int):
+        """
+        Keys to MGET, window by window, for the documents under prefix with
+        IDs above after_id; last_id is the shared counter.
+        
+        ID sets are unordered, so the ID range is walked in windows of
+        `limit` IDs until the caller has enough documents or the counter is
+        passed. Gaps left by other kinds of documents or by deletions only
+        cost extra windows.
+        """
+        start = after_id + 1
+        while start <= last_id:
+            ids = range(start, min(start + limit, last_id + 1))
+            yield [f"{prefix}{i}" for i in ids]
+            start = ids.stop
+    
+    def _bulk_add_events_call(self, events: List[Dict[str, Any]]) -> Dict[str, list]:
+        """BULK_ADD_EVENTS_SCRIPT keys and args for a batch of events."""
+        with_ids, without_ids = bulk_rows(events, EVENT_BULK_COLUMNS, {'description': ''})
+        kept = [self._build_event(*row) for row in with_ids]
+        new = [{field: value for field, value in self._build_event(None, *row).items() if field != 'id'}
+               for row in without_ids]
+        return {
+            'keys': [self.COUNTER_KEY, self.EVENT_IDS_KEY, self.EVENT_DATES_KEY, self.DATA_VERSION_KEY],
+            'args': [self.EVENT_PREFIX,
+                     json.dumps([[event, date_score(event['date'])] for event in kept]),
+                     json.dumps([[event, date_score(event['date'])] for event in new])],
+        }
+    
+    def _bulk_add_dishes_call(self, dishes: List[Dict[str, Any]]) -> Dict[str, list]:
+        """BULK_ADD_DISHES_SCRIPT keys and args for a batch of dishes."""
+        defaults = {
+            'description': '',
+            'serves': 0,
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        with_ids, without_ids = bulk_rows(dishes, DISH_BULK_COLUMNS, defaults)
+        kept = [self._build_dish(*row) for row in with_ids]
+        new = [{field: value for field, value in self._build_dish(None, *row).items() if field != 'id'}
+               for row in without_ids]
+        return {
+            'keys': [self.COUNTER_KEY, self.DISH_IDS_KEY, self.DATA_VERSION_KEY],
+            'args': [self.EVENT_PREFIX, self.CATEGORY_PREFIX, self.DISH_PREFIX, self.DISH_EVENT_PREFIX,
+                     json.dumps(kept), json.dumps(new), DISH_CHANGES_CHANNEL],
+        }
+    
+    @staticmethod
+    def _parse_bulk_added(result, kind: str) -> int:
+        """Turn a bulk script result into the number of rows added, or raise ValueError."""
+        added, detail = result
+        if added:
+            return int(detail)
+        if detail == b'taken':
+            raise ValueError(f"Could not add {kind}: {'event' if kind == 'events' else 'dish'} IDs already in use")
+        raise ValueError(f"Could not add {kind}: unknown {detail.decode()} ID")
+
+
+class KVDatabase(KVKeyspace, DatabaseInterface):
     """Redis implementation of the database interface."""
     
-    def __init__(self):
+    def __init__(self, redis_url: Optional[str] = None):
         """Initialize the Redis database connection."""
-        # Get Redis connection URL from environment variable
-        redis_url = os.environ.get('REDIS_URL')
-        
-        if not redis_url:
-            raise EnvironmentError("REDIS_URL environment variable is not set")
-        
-        # Initialize Redis client
-        self.redis = redis.Redis.from_url(redis_url)
-        
-        # Key prefixes for different data types
-        self.EVENT_PREFIX = "event:"
-        self.EVENT_IDS_KEY = "event_ids"
-        self.COUNTER_KEY = "counter"
-        self.DISH_PREFIX = "dish:"
-        self.DISH_IDS_KEY = "dish_ids"
-        self.DISH_EVENT_PREFIX = "dish_event:"
-        self.CATEGORY_PREFIX = "category:"
-        self.CATEGORY_IDS_KEY = "category_ids"
+        # Initialize Redis client from redis_url, else the REDIS_URL environment variable
+        self.redis = redis.Redis.from_url(redis_url or get_redis_url())
+        self._register_write_scripts()
+    
+    def close(self) -> None:
+        """Close the Redis connection pool."""
+        self.redis.close()
     
     def initialize(self) -> None:
-        """Initialize the database, creating necessary keys if they don't exist."""
-        # Check if we need to initialize the counter
-        if not self.redis.exists(self.COUNTER_KEY):
-            self.redis.set(self.COUNTER_KEY, "0")
-        
-        # Check if we need to initialize the event IDs set
-        if not self.redis.exists(self.EVENT_IDS_KEY):
-            # Redis sets can't be empty, so we don't need to initialize it
-            pass
-        
-        # Check if we need to initialize dish categories
-        if not self.redis.exists(self.CATEGORY_IDS_KEY):
-            categories = [
-                "Appetizer",
-                "Main Dish",
-                "Side Dish",
-                "Salad",
-                "Dessert",
-                "Bread",
-                "Beverage"
-            ]
-            
-            for i, category in enumerate(categories, 1):
-                category_key = f"{self.CATEGORY_PREFIX}{i}"
-                self.redis.set(category_key, json.dumps({"id": i, "name": category}))
-                self.redis.sadd(self.CATEGORY_IDS_KEY, str(i))
-        
-        # Check if we need to add sample data
-        event_ids = self.redis.smembers(self.EVENT_IDS_KEY)
-        if not event_ids:
-            sample_events = [
-                {
-                    'title': 'Easter Dinner',
-                    'date': '2024-03-31 17:00',
-                    'location': 'Mom\'s House',
-                    'description': 'Annual family Easter dinner. Everyone is welcome to bring a dish!'
-                },
-                {
-                    'title': 'Summer BBQ',
-                    'date': '2024-07-04 16:00',
-                    'location': 'Backyard',
-                    'description': 'Independence Day celebration with grilling and fireworks.'
-                },
-                {
-                    'title': 'Thanksgiving Dinner',
-                    'date': '2024-11-28 16:00',
-                    'location': 'Grandma\'s House',
-                    'description': 'Traditional Thanksgiving dinner with the whole family.'
-                }
-            ]
-            
-            for event in sample_events:
-                self.add_event(
+        """
+        Initialize the database, creating necessary keys if they don't exist.
+        
+        Once the keyspace is at SCHEMA_VERSION this is a single GET. Otherwise
+        one worker takes the schema lock (SET NX) and bootstraps, while any
+        others poll until the new version appears.
+        """
+        if self._schema_is_current(self.redis.get(self.SCHEMA_VERSION_KEY)):
+            return
+        
+        token = os.urandom(16).hex()
+        while not self.redis.set(self.SCHEMA_LOCK_KEY, token, nx=True, ex=self.SCHEMA_LOCK_TIMEOUT):
+            time.sleep(0.1)
+            if self._schema_is_current(self.redis.get(self.SCHEMA_VERSION_KEY)):
+                return
+        try:
+            self._bootstrap()
+            self.redis.set(self.SCHEMA_VERSION_KEY, self.SCHEMA_VERSION)
+        finally:
+            self.redis.eval(self.RELEASE_LOCK_SCRIPT, 1, self.SCHEMA_LOCK_KEY, token)
+    
+    def _bootstrap(self) -> None:
+        """Seed and index the keyspace; safe to repeat."""
+        # Create the counter and check what needs seeding in one round trip
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_seed_check(pipe)
+        _, has_categories, event_count = pipe.execute()
+        
+        # Older keyspaces have no date index, or one with unpadded members
+        if event_count:
+            self.rebuild_date_index()
+        
+        seed_events = not event_count and should_seed_sample_data()
+        if has_categories and not seed_events:
+            return
+        
+        pipe = self.redis.pipeline(transaction=True)
+        if not has_categories:
+            self._queue_seed_categories(pipe)
+        if seed_events:
+            # Reserve one ID per sample event up front
+            last_id = self.redis.incrby(self.COUNTER_KEY, len(SAMPLE_EVENTS))
+            first_id = last_id - len(SAMPLE_EVENTS) + 1
+            for event_id, event in enumerate(SAMPLE_EVENTS, first_id):
+                self._queue_store_event(pipe, self._build_event(
+                    event_id,
                     event['title'],
                     event['date'],
                     event['location'],
                     event['description']
-                )
-    
-    def _get_next_id(self) -> int:
-        """Get the next available ID and increment the counter."""
-        # Increment the counter and return the new value
-        return int(self.redis.incr(self.COUNTER_KEY))
+                ))
+        pipe.execute()
     
     def get_events(self) -> List[Dict[str, Any]]:
         """Get all events from the database."""
-        event_ids = self.redis.smembers(self.EVENT_IDS_KEY)
-        if not event_ids:
-            return []
-        
-        # Convert bytes IDs to integers
-        event_ids = [int(id.decode('utf-8')) for id in event_ids]
-        
-        # Get all events
-        events = []
-        for event_id in event_ids:
-            event_key = f"{self.EVENT_PREFIX}{event_id}"
-            event_json = self.redis.get(event_key)
-            if event_json:
-                event = json.loads(event_json)
-                events.append(event)
-        
-        # Sort events by date
-        events.sort(key=lambda x: x['date'])
-        return events
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_events(pipe)
+        values, = pipe.execute()
+        return self._sort_events(self._load_documents(values))
+    
+    def rebuild_date_index(self) -> None:
+        """Rebuild the date index from the stored events (migration for older keyspaces)."""
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_events(pipe)
+        values, = pipe.execute()
+        
+        # MULTI, so readers never see the index emptied
+        pipe = self.redis.pipeline(transaction=True)
+        self._queue_date_index_rebuild(pipe, values)
+        pipe.execute()
     
     def get_upcoming_events(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get upcoming events (events with dates in the future)."""
-        now = datetime.now()
-        all_events = self.get_events()
-        
-        # Filter for upcoming events
-        upcoming_events = []
-        for event in all_events:
-            event_date = datetime.strptime(event['date'], '%Y-%m-%d %H:%M')
-            if event_date >= now:
-                upcoming_events.append(event)
+        # Range query on the date index, then fetch just those documents
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_upcoming_event_ids(pipe, limit)
+        event_ids, = pipe.execute()
+        if not event_ids:
+            return []
         
-        # Sort by date
-        upcoming_events.sort(key=lambda x: x['date'])
+        return self._load_documents(self.redis.mget(self._event_keys(event_ids)))
+    
+    def get_events_page(self, upcoming: bool, limit: int = EVENTS_PAGE_SIZE,
+                        after: Optional[str] = None,
+                        before: Optional[str] = None) -> Dict[str, Any]:
+        """Get one page of upcoming or past events using keyset pagination."""
+        # Range queries on the date index, then fetch just that page's documents
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_events_page_ids(pipe, upcoming, limit, after, before)
+        event_ids = self._page_event_ids(pipe.execute(), upcoming, limit, after, before)
+        if not event_ids:
+            return build_events_page([], limit, after, before)
         
-        # Apply limit if specified
-        if limit and limit > 0:
-            upcoming_events = upcoming_events[:limit]
-            
-        return upcoming_events
+        events = self._load_documents(self.redis.mget(self._event_keys(event_ids)))
+        return build_events_page(events, limit, after, before)
+    
+    def count_events(self) -> Dict[str, int]:
+        """Count upcoming and past events."""
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_count_events(pipe)
+        upcoming, past = pipe.execute()
+        return {'upcoming': upcoming, 'past': past}
     
     def get_event_by_id(self, event_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific event by ID."""
-        event_key = f"{self.EVENT_PREFIX}{event_id}"
-        event_json = self.redis.get(event_key)
+        event_json = self.redis.get(self._event_key(event_id))
         
         if event_json:
             return json.loads(event_json)
@@ -148,274 +784,157 @@ class KVDatabase(DatabaseInterface):
     
     def add_event(self, title: str, date: str, location: str, description: str) -> Dict[str, Any]:
         """Add a new event to the database."""
-        # Get a new ID
-        event_id = self._get_next_id()
-        
-        # Create the event
-        event = {
-            'id': event_id,
-            'title': title,
-            'date': date,
-            'location': location,
-            'description': description
-        }
-        
-        # Store the event
-        event_key = f"{self.EVENT_PREFIX}{event_id}"
-        self.redis.set(event_key, json.dumps(event))
-        
-        # Add the event ID to the set of all event IDs
-        self.redis.sadd(self.EVENT_IDS_KEY, str(event_id))
+        event = self._build_event(None, title, date, location, description)
         
+        # Reserve the ID, store the event and index it in one atomic script
+        event['id'] = int(self._add_event_script(**self._add_event_call(event)))
         return event
     
     def update_event(self, event_id: int, title: str, date: str, location: str, description: str) -> Optional[Dict[str, Any]]:
         """Update an existing event."""
-        event_key = f"{self.EVENT_PREFIX}{event_id}"
+        event = self._build_event(event_id, title, date, location, description)
         
-        # Check if the event exists
-        if not self.redis.exists(event_key):
+        # SET ... XX only writes if the event exists, so no separate check
+        if not self._update_event_script(**self._update_event_call(event)):
             return None
-        
-        # Update the event
-        event = {
-            'id': event_id,
-            'title': title,
-            'date': date,
-            'location': location,
-            'description': description
-        }
-        
-        self.redis.set(event_key, json.dumps(event))
         return event
     
     def delete_event(self, event_id: int) -> bool:
         """Delete an event from the database."""
-        event_key = f"{self.EVENT_PREFIX}{event_id}"
-        
-        # Check if the event exists
-        if not self.redis.exists(event_key):
-            return False
-        
-        # Get all dishes for this event
-        dish_event_key = f"{self.DISH_EVENT_PREFIX}{event_id}"
-        dish_ids = self.redis.smembers(dish_event_key)
-        
-        # Delete all dishes for this event
-        for dish_id in dish_ids:
-            dish_id = int(dish_id.decode('utf-8'))
-            dish_key = f"{self.DISH_PREFIX}{dish_id}"
-            self.redis.delete(dish_key)
-            self.redis.srem(self.DISH_IDS_KEY, str(dish_id))
-        
-        # Delete the dish-event mapping
-        self.redis.delete(dish_event_key)
-        
-        # Delete the event
-        self.redis.delete(event_key)
-        
-        # Remove the event ID from the set of all event IDs
-        self.redis.srem(self.EVENT_IDS_KEY, str(event_id))
+        # Delete the event with all of its dishes, including any added meanwhile
+        return bool(self._delete_event_script(**self._delete_event_call(event_id)))
+    
+    def get_events_with_dishes(self, event_ids: List[int]) -> List[Dict[str, Any]]:
+        """Get several events together with their dishes in one pipeline."""
+        if not event_ids:
+            return []
         
-        return True
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_categories(pipe)
+        for event_id in event_ids:
+            self._queue_event_with_dishes(pipe, event_id)
+        return self._parse_events_with_dishes(pipe.execute())
+    
+    def get_event_bundle(self, event_id: int) -> Optional[Dict[str, Any]]:
+        """Get an event with its dishes, all categories and counts in one pipeline."""
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_categories(pipe)
+        self._queue_event_with_dishes(pipe, event_id)
+        return self._parse_event_bundle(pipe.execute())
     
     # Methods for dish sign-ups - Phase 5
     
     def get_dish_categories(self) -> List[Dict[str, Any]]:
         """Get all dish categories."""
-        category_ids = self.redis.smembers(self.CATEGORY_IDS_KEY)
-        if not category_ids:
-            return []
-        
-        # Convert bytes IDs to integers
-        category_ids = [int(id.decode('utf-8')) for id in category_ids]
-        
-        # Get all categories
-        categories = []
-        for category_id in category_ids:
-            category_key = f"{self.CATEGORY_PREFIX}{category_id}"
-            category_json = self.redis.get(category_key)
-            if category_json:
-                category = json.loads(category_json)
-                categories.append(category)
-        
-        # Sort categories by name
-        categories.sort(key=lambda x: x['name'])
-        return categories
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_categories(pipe)
+        values, = pipe.execute()
+        return self._sort_categories(self._load_documents(values))
     
     def get_dishes_for_event(self, event_id: int) -> List[Dict[str, Any]]:
         """Get all dishes signed up for a specific event."""
-        dish_event_key = f"{self.DISH_EVENT_PREFIX}{event_id}"
-        dish_ids = self.redis.smembers(dish_event_key)
-        if not dish_ids:
-            return []
-        
-        # Convert bytes IDs to integers
-        dish_ids = [int(id.decode('utf-8')) for id in dish_ids]
-        
-        # Get all dishes
-        dishes = []
-        for dish_id in dish_ids:
-            dish_key = f"{self.DISH_PREFIX}{dish_id}"
-            dish_json = self.redis.get(dish_key)
-            if dish_json:
-                dish = json.loads(dish_json)
-                
-                # Get category name
-                category_id = dish['category_id']
-                category_key = f"{self.CATEGORY_PREFIX}{category_id}"
-                category_json = self.redis.get(category_key)
-                if category_json:
-                    category = json.loads(category_json)
-                    dish['category_name'] = category['name']
-                else:
-                    dish['category_name'] = "Unknown"
-                
-                dishes.append(dish)
-        
-        # Sort dishes by category name, then dish name
-        dishes.sort(key=lambda x: (x['category_name'], x['name']))
-        return dishes
+        pipe = self.redis.pipeline(transaction=False)
+        self._queue_categories(pipe)
+        self._queue_dishes(pipe, event_id)
+        category_values, dish_values = pipe.execute()
+        return self._attach_category_names(
+            self._load_documents(dish_values),
+            self._load_documents(category_values)
+        )
     
     def get_dish_by_id(self, dish_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific dish by ID."""
-        dish_key = f"{self.DISH_PREFIX}{dish_id}"
-        dish_json = self.redis.get(dish_key)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.get(self._dish_key(dish_id))
+        self._queue_categories(pipe)
+        dish_json, category_values = pipe.execute()
         
         if not dish_json:
             return None
         
-        dish = json.loads(dish_json)
-        
-        # Get category name
-        category_id = dish['category_id']
-        category_key = f"{self.CATEGORY_PREFIX}{category_id}"
-        category_json = self.redis.get(category_key)
-        if category_json:
-            category = json.loads(category_json)
-            dish['category_name'] = category['name']
-        else:
-            dish['category_name'] = "Unknown"
-        
-        return dish
+        return self._attach_category_names(
+            [json.loads(dish_json)],
+            self._load_documents(category_values)
+        )[0]
     
     def add_dish(self, event_id: int, name: str, category_id: int, 
                 person_name: str, description: str = "", 
                 serves: int = 0) -> Dict[str, Any]:
         """Add a new dish to an event."""
-        # Check if the event exists
-        event_key = f"{self.EVENT_PREFIX}{event_id}"
-        if not self.redis.exists(event_key):
-            raise ValueError(f"Event with ID {event_id} does not exist")
-        
-        # Check if the category exists
-        category_key = f"{self.CATEGORY_PREFIX}{category_id}"
-        if not self.redis.exists(category_key):
-            raise ValueError(f"Category with ID {category_id} does not exist")
-        
-        # Get a new ID
-        dish_id = self._get_next_id()
-        
-        # Get current timestamp
         created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        dish = self._build_dish(None, event_id, name, category_id,
+                                person_name, description, serves, created_at)
         
-        # Create the dish
-        dish = {
-            'id': dish_id,
-            'event_id': event_id,
-            'name': name,
-            'category_id': category_id,
-            'person_name': person_name,
-            'description': description,
-            'serves': serves,
-            'created_at': created_at
-        }
-        
-        # Store the dish
-        dish_key = f"{self.DISH_PREFIX}{dish_id}"
-        self.redis.set(dish_key, json.dumps(dish))
-        
-        # Add the dish ID to the set of all dish IDs
-        self.redis.sadd(self.DISH_IDS_KEY, str(dish_id))
-        
-        # Add the dish ID to the set of dishes for this event
-        dish_event_key = f"{self.DISH_EVENT_PREFIX}{event_id}"
-        self.redis.sadd(dish_event_key, str(dish_id))
-        
-        # Get category name for the response
-        category_json = self.redis.get(category_key)
-        if category_json:
-            category = json.loads(category_json)
-            dish['category_name'] = category['name']
-        else:
-            dish['category_name'] = "Unknown"
-        
-        return dish
+        # Check the event and category, reserve an ID and store the dish atomically
+        result = self._add_dish_script(**self._add_dish_call(dish))
+        return self._parse_added_dish(result, dish)
     
     def update_dish(self, dish_id: int, name: str, category_id: int, 
                    person_name: str, description: str = "", 
                    serves: int = 0) -> Optional[Dict[str, Any]]:
         """Update an existing dish."""
-        dish_key = f"{self.DISH_PREFIX}{dish_id}"
-        
-        # Check if the dish exists
-        if not self.redis.exists(dish_key):
-            return None
-        
-        # Check if the category exists
-        category_key = f"{self.CATEGORY_PREFIX}{category_id}"
-        if not self.redis.exists(category_key):
-            raise ValueError(f"Category with ID {category_id} does not exist")
-        
-        # Get the existing dish to preserve event_id and created_at
-        existing_dish_json = self.redis.get(dish_key)
-        existing_dish = json.loads(existing_dish_json)
-        
-        # Update the dish
-        dish = {
-            'id': dish_id,
-            'event_id': existing_dish['event_id'],
-            'name': name,
-            'category_id': category_id,
-            'person_name': person_name,
-            'description': description,
-            'serves': serves,
-            'created_at': existing_dish['created_at']
-        }
-        
-        self.redis.set(dish_key, json.dumps(dish))
-        
-        # Get category name for the response
-        category_json = self.redis.get(category_key)
-        if category_json:
-            category = json.loads(category_json)
-            dish['category_name'] = category['name']
-        else:
-            dish['category_name'] = "Unknown"
-        
-        return dish
+        # Check the dish and category and rewrite the dish atomically, keeping
+        # its event_id and created_at
+        result = self._update_dish_script(**self._update_dish_call(
+            dish_id, name, category_id, person_name, description, serves
+        ))
+        return self._parse_updated_dish(result, category_id)
     
     def delete_dish(self, dish_id: int) -> bool:
         """Delete a dish from the database."""
-        dish_key = f"{self.DISH_PREFIX}{dish_id}"
-        
-        # Check if the dish exists
-        if not self.redis.exists(dish_key):
-            return False
-        
-        # Get the dish to find its event_id
-        dish_json = self.redis.get(dish_key)
-        dish = json.loads(dish_json)
-        event_id = dish['event_id']
-        
-        # Remove the dish ID from the set of dishes for this event
-        dish_event_key = f"{self.DISH_EVENT_PREFIX}{event_id}"
-        self.redis.srem(dish_event_key, str(dish_id))
-        
-        # Delete the dish
-        self.redis.delete(dish_key)
-        
-        # Remove the dish ID from the set of all dish IDs
-        self.redis.srem(self.DISH_IDS_KEY, str(dish_id))
-        
-        return True 
+        # The script finds the dish's event itself, so this is one round trip
+        return bool(self._delete_dish_script(**self._delete_dish_call(dish_id)))
+    
+    def get_events_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """Get the next batch of events in ID order."""
+        return self._documents_after(self.EVENT_PREFIX, after_id, limit)
+    
+    def get_dishes_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """Get the next batch of dishes in ID order."""
+        return self._documents_after(self.DISH_PREFIX, after_id, limit)
+    
+    def _documents_after(self, prefix: str, after_id: int, limit: int) -> List[Dict[str, Any]]:
+        """Fetch the documents under prefix with IDs above after_id, in ID order."""
+        last_id = int(self.redis.get(self.COUNTER_KEY) or 0)
+        documents = []
+        for keys in self._document_windows(prefix, after_id, limit, last_id):
+            documents.extend(self._load_documents(self.redis.mget(keys)))
+            if len(documents) >= limit:
+                break
+        return documents[:limit]
+    
+    def bulk_add_events(self, events: List[Dict[str, Any]]) -> int:
+        """Add a batch of events with one script call."""
+        if not events:
+            return 0
+        return self._parse_bulk_added(self._bulk_add_events_script(**self._bulk_add_events_call(events)), 'events')
+    
+    def bulk_add_dishes(self, dishes: List[Dict[str, Any]]) -> int:
+        """Add a batch of dishes with one script call, checking their events and categories in it."""
+        if not dishes:
+            return 0
+        return self._parse_bulk_added(self._bulk_add_dishes_script(**self._bulk_add_dishes_call(dishes)), 'dishes')
+    
+    def get_data_version(self) -> int:
+        """Get the data version from its key."""
+        return int(self.redis.get(self.DATA_VERSION_KEY) or 0)
+    
+    def save_categories(self, categories: List[Dict[str, Any]]) -> int:
+        """Replace the dish categories by ID in one MULTI/EXEC pipeline."""
+        saved_ids = {int(category['id']) for category in categories}
+        stale_ids = [int(member) for member in self.redis.smembers(self.CATEGORY_IDS_KEY)
+                     if int(member) not in saved_ids]
+        # Nothing links dishes to their category here, so unlike the SQL
+        # backends this does not refuse to delete categories still in use
+        pipe = self.redis.pipeline(transaction=True)
+        if stale_ids:
+            pipe.delete(*[self._category_key(category_id) for category_id in stale_ids])
+            pipe.srem(self.CATEGORY_IDS_KEY, *[str(category_id) for category_id in stale_ids])
+        for category in categories:
+            pipe.set(self._category_key(category['id']),
+                     json.dumps({"id": category['id'], "name": category['name']}))
+        if categories:
+            pipe.sadd(self.CATEGORY_IDS_KEY, *[str(category['id']) for category in categories])
+        pipe.incr(self.DATA_VERSION_KEY)
+        pipe.execute()
+        return len(categories)
@@ -1,119 +1,636 @@
 import os
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-from psycopg import connect
+import psycopg
 from psycopg.rows import dict_row
+from psycopg_pool import ConnectionPool
 
-from .db_interface import DatabaseInterface
+from .db_interface import (
+    BULK_BATCH_SIZE,
+    DISH_BULK_COLUMNS,
+    EVENT_BULK_COLUMNS,
+    EVENTS_PAGE_SIZE,
+    DatabaseInterface,
+    build_events_page,
+    bulk_rows,
+    count_dishes_by,
+    decode_event_cursor,
+    score_to_date,
+    should_seed_sample_data,
+)
+from .changes import DISH_CHANGES_CHANNEL
+from .read_routing import ReplicaRouter
+
+# Schema, seed data and queries shared with AsyncPostgresDatabase
+SCHEMA_STATEMENTS = (
+    """
+    CREATE TABLE IF NOT EXISTS events (
+        id BIGSERIAL PRIMARY KEY,
+        title TEXT NOT NULL,
+        date TEXT NOT NULL,
+        location TEXT NOT NULL,
+        description TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dish_categories (
+        id BIGSERIAL PRIMARY KEY,
+        name TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS dishes (
+        id BIGSERIAL PRIMARY KEY,
+        event_id BIGINT NOT NULL REFERENCES events(id) ON DELETE CASCADE,
+        name TEXT NOT NULL,
+        category_id BIGINT NOT NULL REFERENCES dish_categories(id),
+        person_name TEXT NOT NULL,
+        description TEXT,
+        serves INTEGER DEFAULT 0,
+        created_at TEXT NOT NULL
+    )
+    """,
+)
+
+# Versioned schema migrations, applied in order by initialize(). The version
+# reached is recorded in schema_meta; append new steps, never edit old ones.
+# Tables whose changes raise the data version (see get_data_version)
+VERSIONED_TABLES = ("events", "dishes", "dish_categories")
+
+
+def data_version_triggers(table: str) -> Tuple[str, ...]:
+    """Statements (re)creating the statement-level triggers that bump the data version on table."""
+    statements = []
+    for op, transition in (("INSERT", "NEW TABLE AS new_rows"), ("UPDATE", "NEW TABLE AS new_rows"),
+                           ("DELETE", "OLD TABLE AS old_rows")):
+        name = f"{table}_bump_data_version_{op.lower()}"
+        statements += [
+            f"DROP TRIGGER IF EXISTS {name} ON {table}",
+            f"CREATE TRIGGER {name} AFTER {op} ON {table} REFERENCING {transition} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version()",
+        ]
+    return tuple(statements)
+
+
+MIGRATIONS = (
+    (1, SCHEMA_STATEMENTS),
+    (
+        2,
+        (
+            # Existing TEXT values are read in the session time zone (see local_timezone())
+            "ALTER TABLE events ALTER COLUMN date TYPE timestamptz USING date::timestamptz",
+            "ALTER TABLE dishes ALTER COLUMN created_at TYPE timestamptz USING created_at::timestamptz",
+            "ALTER TABLE dishes ALTER COLUMN created_at SET DEFAULT now()",
+            "CREATE INDEX IF NOT EXISTS events_date_id_idx ON events (date, id)",
+            "CREATE INDEX IF NOT EXISTS dishes_event_id_idx ON dishes (event_id)",
+            "CREATE INDEX IF NOT EXISTS dishes_category_id_idx ON dishes (category_id)",
+        ),
+    ),
+    (
+        3,
+        (
+            # Every dish change, by any client, is sent to listeners on commit
+            """
+            CREATE OR REPLACE FUNCTION notify_dish_change() RETURNS trigger AS $$
+            DECLARE
+                dish dishes;
+            BEGIN
+                IF TG_OP = 'DELETE' THEN
+                    dish := OLD;
+                ELSE
+                    dish := NEW;
+                END IF;
+                PERFORM pg_notify('""" + DISH_CHANGES_CHANNEL + """', json_build_object(
+                    'op', CASE TG_OP WHEN 'INSERT' THEN 'add' WHEN 'UPDATE' THEN 'update' ELSE 'delete' END,
+                    'event_id', dish.event_id,
+                    'dish_id', dish.id
+                )::text);
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            """,
+            "DROP TRIGGER IF EXISTS dishes_notify_change ON dishes",
+            """
+            CREATE TRIGGER dishes_notify_change AFTER INSERT OR UPDATE OR DELETE ON dishes
+            FOR EACH ROW EXECUTE FUNCTION notify_dish_change()
+            """,
+        ),
+    ),
+    (
+        4,
+        (
+            # The data version (see get_data_version), shared by every process
+            """
+            CREATE TABLE IF NOT EXISTS data_version (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                value BIGINT NOT NULL
+            )
+            """,
+            "INSERT INTO data_version (id, value) VALUES (1, 0) ON CONFLICT (id) DO NOTHING",
+        ),
+    ),
+    (
+        5,
+        (
+            # Notify once per statement and event instead of once per row, so
+            # a COPY of thousands of dishes sends one "reload" per event rather
+            # than flooding listeners. A statement touching a single dish of an
+            # event still names it, as the per-row trigger did.
+            "DROP TRIGGER IF EXISTS dishes_notify_change ON dishes",
+            "DROP FUNCTION IF EXISTS notify_dish_change()",
+            """
+            CREATE OR REPLACE FUNCTION notify_event_dishes(op text, event_id bigint, dishes bigint, dish_id bigint)
+            RETURNS void AS $$
+                SELECT pg_notify('""" + DISH_CHANGES_CHANNEL + """', CASE
+                    WHEN dishes = 1 THEN json_build_object('op', op, 'event_id', event_id, 'dish_id', dish_id)
+                    ELSE json_build_object('op', 'reload', 'event_id', event_id)
+                END::text)
+            $$ LANGUAGE sql
+            """,
+            """
+            CREATE OR REPLACE FUNCTION notify_dish_changes() RETURNS trigger AS $$
+            DECLARE
+                change record;
+            BEGIN
+                -- Each trigger only has the transition table of its own operation
+                IF TG_OP = 'DELETE' THEN
+                    FOR change IN
+                        SELECT event_id, count(*) AS dishes, min(id) AS dish_id FROM old_dishes GROUP BY event_id
+                    LOOP
+                        PERFORM notify_event_dishes('delete', change.event_id, change.dishes, change.dish_id);
+                    END LOOP;
+                ELSE
+                    FOR change IN
+                        SELECT event_id, count(*) AS dishes, min(id) AS dish_id FROM new_dishes GROUP BY event_id
+                    LOOP
+                        PERFORM notify_event_dishes(
+                            CASE TG_OP WHEN 'INSERT' THEN 'add' ELSE 'update' END,
+                            change.event_id, change.dishes, change.dish_id
+                        );
+                    END LOOP;
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            """,
+            "DROP TRIGGER IF EXISTS dishes_notify_insert ON dishes",
+            """
+            CREATE TRIGGER dishes_notify_insert AFTER INSERT ON dishes
+            REFERENCING NEW TABLE AS new_dishes
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_dish_changes()
+            """,
+            "DROP TRIGGER IF EXISTS dishes_notify_update ON dishes",
+            """
+            CREATE TRIGGER dishes_notify_update AFTER UPDATE ON dishes
+            REFERENCING NEW TABLE AS new_dishes
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_dish_changes()
+            """,
+            "DROP TRIGGER IF EXISTS dishes_notify_delete ON dishes",
+            """
+            CREATE TRIGGER dishes_notify_delete AFTER DELETE ON dishes
+            REFERENCING OLD TABLE AS old_dishes
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_dish_changes()
+            """,
+        ),
+    ),
+    (
+        6,
+        (
+            # The data version moves in the writing transaction itself, so no
+            # reader sees a write under the old version. Statement triggers
+            # also fire for statements that matched no row, hence the checks.
+            """
+            CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+            BEGIN
+                -- Each trigger only has the transition table of its own operation
+                IF TG_OP = 'DELETE' THEN
+                    IF NOT EXISTS (SELECT 1 FROM old_rows) THEN
+                        RETURN NULL;
+                    END IF;
+                ELSIF NOT EXISTS (SELECT 1 FROM new_rows) THEN
+                    RETURN NULL;
+                END IF;
+                UPDATE data_version SET value = value + 1 WHERE id = 1;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            """,
+        ) + tuple(statement for table in VERSIONED_TABLES for statement in data_version_triggers(table)),
+    ),
+)
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+SCHEMA_META_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_meta (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )
+"""
+
+SCHEMA_VERSION_SELECT = "SELECT version FROM schema_meta WHERE id = 1"
+
+# Key for pg_advisory_xact_lock, held by whichever process is bootstrapping
+SCHEMA_LOCK_ID = 0x64696E6E6572
+
+SET_SCHEMA_VERSION = """
+    INSERT INTO schema_meta (id, version) VALUES (1, %s)
+    ON CONFLICT (id) DO UPDATE SET version = EXCLUDED.version
+"""
+
+# Timestamps leave the database formatted the way the rest of the app stores
+# them: event dates to the minute, everything else to the second.
+TIMESTAMP_FORMATS = {"date": "%Y-%m-%d %H:%M"}
+DEFAULT_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Start of the current minute, matching the minute resolution of event dates
+NOW = "date_trunc('minute', now())"
+
+DEFAULT_CATEGORIES = [
+    ("Appetizer",),
+    ("Main Dish",),
+    ("Side Dish",),
+    ("Salad",),
+    ("Dessert",),
+    ("Bread",),
+    ("Beverage",),
+]
+
+SAMPLE_EVENTS = [
+    (
+        "Easter Dinner",
+        "2024-03-31 17:00",
+        "Mom's House",
+        "Annual family Easter dinner. Everyone is welcome to bring a dish!",
+    ),
+    (
+        "Summer BBQ",
+        "2024-07-04 16:00",
+        "Backyard",
+        "Independence Day celebration with grilling and fireworks.",
+    ),
+    (
+        "Thanksgiving Dinner",
+        "2024-11-28 16:00",
+        "Grandma's House",
+        "Traditional Thanksgiving dinner with the whole family.",
+    ),
+]
+
+DISH_SELECT = """
+    SELECT d.*, c.name AS category_name
+    FROM dishes d
+    JOIN dish_categories c ON d.category_id = c.id
+"""
+
+# An event's dishes (shaped like DISH_SELECT rows) aggregated into one column
+DISHES_JSON = """
+    COALESCE(
+        (
+            SELECT jsonb_agg(
+                to_jsonb(d) || jsonb_build_object(
+                    'category_name', c.name,
+                    'created_at', to_char(d.created_at, 'YYYY-MM-DD HH24:MI:SS')
+                )
+                ORDER BY c.name, d.name
+            )
+            FROM dishes d
+            JOIN dish_categories c ON d.category_id = c.id
+            WHERE d.event_id = e.id
+        ),
+        '[]'::jsonb
+    )
+"""
+
+EVENTS_WITH_DISHES_SELECT = f"SELECT e.*, {DISHES_JSON} AS dishes FROM events e WHERE e.id = ANY(%s)"
+
+EVENT_BUNDLE_SELECT = f"""
+    SELECT e.*,
+           {DISHES_JSON} AS dishes,
+           (SELECT jsonb_agg(to_jsonb(c) ORDER BY c.name) FROM dish_categories c) AS categories
+    FROM events e
+    WHERE e.id = %s
+"""
+
+
+COUNT_EVENTS_SELECT = f"""
+    SELECT COUNT(*) FILTER (WHERE date >= {NOW}) AS upcoming,
+           COUNT(*) FILTER (WHERE date < {NOW}) AS past
+    FROM events
+"""
+
+UPCOMING_EVENTS_SELECT = f"SELECT * FROM events WHERE date >= {NOW} ORDER BY date, id"
+
+DISHES_FOR_EVENT_SELECT = DISH_SELECT + " WHERE d.event_id = %s ORDER BY c.name, d.name"
+
+# Dish writes as one statement each: the reference checks, the write and the
+# DISH_SELECT-shaped result. No row back means a check failed.
+INSERT_DISH = """
+    WITH d AS (
+        INSERT INTO dishes (event_id, name, category_id, person_name, description, serves)
+        SELECT %(event_id)s, %(name)s, %(category_id)s, %(person_name)s, %(description)s, %(serves)s
+        WHERE EXISTS (SELECT 1 FROM events WHERE id = %(event_id)s)
+          AND EXISTS (SELECT 1 FROM dish_categories WHERE id = %(category_id)s)
+        RETURNING *
+    )
+    SELECT d.*, c.name AS category_name
+    FROM d
+    JOIN dish_categories c ON d.category_id = c.id
+"""
+
+UPDATE_DISH = """
+    WITH d AS (
+        UPDATE dishes
+        SET name = %(name)s, category_id = %(category_id)s, person_name = %(person_name)s,
+            description = %(description)s, serves = %(serves)s
+        WHERE id = %(dish_id)s AND EXISTS (SELECT 1 FROM dish_categories WHERE id = %(category_id)s)
+        RETURNING *
+    )
+    SELECT d.*, c.name AS category_name
+    FROM d
+    JOIN dish_categories c ON d.category_id = c.id
+"""
+
+# Why INSERT_DISH wrote nothing
+DISH_REFERENCES_SELECT = """
+    SELECT EXISTS (SELECT 1 FROM events WHERE id = %s) AS event_exists,
+           EXISTS (SELECT 1 FROM dish_categories WHERE id = %s) AS category_exists
+"""
+
+BULK_COLUMNS = {"events": EVENT_BULK_COLUMNS, "dishes": DISH_BULK_COLUMNS}
+
+# Run after COPYing rows with explicit IDs, so nextval() skips past them
+SYNC_ID_SEQUENCE = {
+    table: f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"
+    for table in (*BULK_COLUMNS, "dish_categories")
+}
+
+DATA_VERSION_SELECT = "SELECT value FROM data_version WHERE id = 1"
+
+DELETE_OTHER_CATEGORIES = "DELETE FROM dish_categories WHERE id <> ALL(%s)"
+SAVE_CATEGORY = (
+    "INSERT INTO dish_categories (id, name) VALUES (%s, %s) "
+    "ON CONFLICT (id) DO UPDATE SET name = EXCLUDED.name"
+)
+
+
+def events_page_query(
+    upcoming: bool, limit: int, after: Optional[str], before: Optional[str]
+) -> Tuple[str, List[Any]]:
+    """Build the keyset query for get_events_page(), fetching limit + 1 rows."""
+    cursor_value = before if before is not None else after
+    ascending = upcoming != (before is not None)
+
+    conditions = [f"date >= {NOW}" if upcoming else f"date < {NOW}"]
+    params: List[Any] = []
+    if cursor_value is not None:
+        score, event_id = decode_event_cursor(cursor_value)
+        conditions.append("(date, id) > (%s, %s)" if ascending else "(date, id) < (%s, %s)")
+        params.extend([score_to_date(score), event_id])
+
+    order = "ASC" if ascending else "DESC"
+    query = (
+        f"SELECT * FROM events WHERE {' AND '.join(conditions)} "
+        f"ORDER BY date {order}, id {order} LIMIT %s"
+    )
+    params.append(limit + 1)
+    return query, params
+
+
+def events_with_dishes_from_rows(rows: List[Dict[str, Any]], event_ids: List[int]) -> List[Dict[str, Any]]:
+    """Order EVENTS_WITH_DISHES_SELECT rows like event_ids and add category counts."""
+    events = {row["id"]: row for row in rows}
+    result = []
+    for event_id in event_ids:
+        event = events.get(event_id)
+        if event is not None:
+            event["category_counts"] = count_dishes_by(event["dishes"], "category_name")
+            result.append(event)
+    return result
+
+
+def event_bundle_from_row(row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Split an EVENT_BUNDLE_SELECT row into the event bundle dictionary."""
+    if row is None:
+        return None
+    dishes = row.pop("dishes")
+    categories = row.pop("categories") or []
+    return {
+        "event": row,
+        "dishes": dishes,
+        "categories": categories,
+        "category_counts": count_dishes_by(dishes, "category_id"),
+    }
+
+
+def local_timezone() -> str:
+    """
+    Time zone event dates are entered in: TZ, else the system zone, else UTC.
+
+    Used as the session TimeZone so naive 'YYYY-MM-DD HH:MM' input and the
+    timestamptz values read back mean the same wall-clock time as before.
+    """
+    configured = os.environ.get("TZ", "").lstrip(":")
+    if configured:
+        return configured
+    localtime = os.path.realpath("/etc/localtime")
+    if "/zoneinfo/" in localtime:
+        return localtime.split("/zoneinfo/", 1)[1]
+    return "UTC"
+
+
+def connection_kwargs() -> Dict[str, Any]:
+    """Connection settings shared by the sync and async pools."""
+    return {"row_factory": app_row, "options": f"-c TimeZone={local_timezone()}"}
+
+
+def app_row(cursor):
+    """dict_row that formats timestamptz columns as the app's date strings."""
+    make_row = dict_row(cursor)
+
+    def load(values):
+        row = make_row(values)
+        for key, value in row.items():
+            if isinstance(value, datetime):
+                row[key] = value.strftime(TIMESTAMP_FORMATS.get(key, DEFAULT_TIMESTAMP_FORMAT))
+        return row
+
+    return load
+
+
+def bulk_copy_plan(table: str, records: List[Dict[str, Any]]) -> Tuple[List[Tuple[str, List[tuple]]], bool]:
+    """
+    COPY statements, each with its rows, that add bulk records to a table.
+
+    Returns:
+        Tuple of ([(statement, rows), ...], whether any record keeps its ID
+        and SYNC_ID_SEQUENCE[table] must run afterwards)
+    """
+    columns = BULK_COLUMNS[table]
+    defaults = {"description": "", "serves": 0, "created_at": datetime.now().strftime(DEFAULT_TIMESTAMP_FORMAT)}
+    with_ids, without_ids = bulk_rows(records, columns, defaults)
+    copies = []
+    if with_ids:
+        copies.append((f"COPY {table} (id, {', '.join(columns)}) FROM STDIN", with_ids))
+    if without_ids:
+        copies.append((f"COPY {table} ({', '.join(columns)}) FROM STDIN", without_ids))
+    return copies, bool(with_ids)
+
+
+def missing_dish_reference(event_id: int, category_id: int, references: Dict[str, bool]) -> ValueError:
+    """The error for an INSERT_DISH that wrote nothing, from a DISH_REFERENCES_SELECT row."""
+    if not references["event_exists"]:
+        return ValueError(f"Event with ID {event_id} does not exist")
+    return ValueError(f"Category with ID {category_id} does not exist")
+
+
+def pool_stats(router: ReplicaRouter) -> Dict[str, Any]:
+    """get_stats() of the primary pool, plus those of any replica pools under 'replicas'."""
+    def stats_of(pool) -> Dict[str, int]:
+        stats = pool.get_stats()
+        stats["connections_checked_out"] = stats["pool_size"] - stats["pool_available"]
+        return stats
+
+    stats: Dict[str, Any] = stats_of(router.primary)
+    if router.replicas:
+        stats["replicas"] = [stats_of(pool) for pool in router.replicas]
+    return stats
+
+
+def pending_migrations(current_version: int):
+    """Migrations newer than current_version, in the order they must run."""
+    return [(version, statements) for version, statements in MIGRATIONS if version > current_version]
 
 
 class PostgresDatabase(DatabaseInterface):
     """PostgreSQL implementation of the database interface."""
 
-    def __init__(self, database_url: str):
+    def __init__(
+        self,
+        database_url: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        max_idle: float = 600.0,
+        max_lifetime: float = 3600.0,
+        read_urls: Sequence[str] = (),
+    ):
         if not database_url:
             raise ValueError("DATABASE_URL is required for Postgres backend")
         self.database_url = database_url
 
+        def open_pool(url: str, name: str) -> ConnectionPool:
+            # Long-lived connections handed out per call. Connections are checked
+            # with a cheap round trip before being handed out, so ones dropped by
+            # the server or a proxy are replaced instead of failing the request.
+            return ConnectionPool(
+                url,
+                min_size=min_size,
+                max_size=max_size,
+                timeout=timeout,
+                max_idle=max_idle,
+                max_lifetime=max_lifetime,
+                kwargs=connection_kwargs(),
+                check=ConnectionPool.check_connection,
+                name=name,
+                open=True,
+            )
+
+        self.pool = open_pool(database_url, "dinner-planner")
+        # Read-only methods use a replica, unless reads are pinned to the primary
+        self.router = ReplicaRouter(self.pool, [
+            open_pool(url, f"dinner-planner-replica-{i}") for i, url in enumerate(read_urls, 1)
+        ])
+
     def _connect(self):
-        return connect(self.database_url, row_factory=dict_row)
+        return self.pool.connection()
+
+    def _connect_read(self):
+        return self.router.for_read().connection()
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Current pool size plus cumulative counters, such as wait time and failures."""
+        return pool_stats(self.router)
+
+    def close(self) -> None:
+        for pool in self.router.replicas:
+            pool.close()
+        self.pool.close()
 
     def initialize(self) -> None:
         with self._connect() as conn, conn.cursor() as cur:
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS events (
-                    id BIGSERIAL PRIMARY KEY,
-                    title TEXT NOT NULL,
-                    date TEXT NOT NULL,
-                    location TEXT NOT NULL,
-                    description TEXT
-                )
-                """
-            )
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS dish_categories (
-                    id BIGSERIAL PRIMARY KEY,
-                    name TEXT NOT NULL
-                )
-                """
-            )
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS dishes (
-                    id BIGSERIAL PRIMARY KEY,
-                    event_id BIGINT NOT NULL REFERENCES events(id) ON DELETE CASCADE,
-                    name TEXT NOT NULL,
-                    category_id BIGINT NOT NULL REFERENCES dish_categories(id),
-                    person_name TEXT NOT NULL,
-                    description TEXT,
-                    serves INTEGER DEFAULT 0,
-                    created_at TEXT NOT NULL
-                )
-                """
-            )
+            # Fast path: once the schema is current, one read is all it takes
+            try:
+                cur.execute(SCHEMA_VERSION_SELECT)
+                row = cur.fetchone()
+            except psycopg.errors.UndefinedTable:
+                conn.rollback()
+                row = None
+            if row and row["version"] >= SCHEMA_VERSION:
+                return
+
+            # Concurrent workers queue here; whoever comes second finds the work done
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (SCHEMA_LOCK_ID,))
+            # DDL is transactional, so a failed migration leaves no trace
+            cur.execute(SCHEMA_META_TABLE)
+            cur.execute(SCHEMA_VERSION_SELECT)
+            row = cur.fetchone()
+            migrations = pending_migrations(row["version"] if row else 0)
+            if not migrations:
+                return
+            for version, statements in migrations:
+                for statement in statements:
+                    cur.execute(statement)
+                cur.execute(SET_SCHEMA_VERSION, (version,))
 
             cur.execute("SELECT COUNT(*) AS count FROM dish_categories")
             if cur.fetchone()["count"] == 0:
-                categories = [
-                    ("Appetizer",),
-                    ("Main Dish",),
-                    ("Side Dish",),
-                    ("Salad",),
-                    ("Dessert",),
-                    ("Bread",),
-                    ("Beverage",),
-                ]
-                cur.executemany("INSERT INTO dish_categories (name) VALUES (%s)", categories)
+                cur.executemany("INSERT INTO dish_categories (name) VALUES (%s)", DEFAULT_CATEGORIES)
 
             cur.execute("SELECT COUNT(*) AS count FROM events")
-            if cur.fetchone()["count"] == 0 and os.environ.get("SEED_SAMPLE_DATA", "true").lower() == "true":
-                sample_events = [
-                    (
-                        "Easter Dinner",
-                        "2024-03-31 17:00",
-                        "Mom's House",
-                        "Annual family Easter dinner. Everyone is welcome to bring a dish!",
-                    ),
-                    (
-                        "Summer BBQ",
-                        "2024-07-04 16:00",
-                        "Backyard",
-                        "Independence Day celebration with grilling and fireworks.",
-                    ),
-                    (
-                        "Thanksgiving Dinner",
-                        "2024-11-28 16:00",
-                        "Grandma's House",
-                        "Traditional Thanksgiving dinner with the whole family.",
-                    ),
-                ]
+            if cur.fetchone()["count"] == 0 and should_seed_sample_data():
                 cur.executemany(
                     "INSERT INTO events (title, date, location, description) VALUES (%s, %s, %s, %s)",
-                    sample_events,
+                    SAMPLE_EVENTS,
                 )
             conn.commit()
 
     def get_events(self) -> List[Dict[str, Any]]:
-        with self._connect() as conn, conn.cursor() as cur:
+        with self._connect_read() as conn, conn.cursor() as cur:
             cur.execute("SELECT * FROM events ORDER BY date")
             return list(cur.fetchall())
 
     def get_upcoming_events(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        now = datetime.now().strftime("%Y-%m-%d %H:%M")
-        query = "SELECT * FROM events WHERE date >= %s ORDER BY date"
-        params: List[Any] = [now]
+        query = UPCOMING_EVENTS_SELECT
+        params: List[Any] = []
         if limit is not None:
             query += " LIMIT %s"
             params.append(limit)
-        with self._connect() as conn, conn.cursor() as cur:
+        with self._connect_read() as conn, conn.cursor() as cur:
             cur.execute(query, params)
             return list(cur.fetchall())
 
+    def get_events_page(
+        self,
+        upcoming: bool,
+        limit: int = EVENTS_PAGE_SIZE,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        query, params = events_page_query(upcoming, limit, after, before)
+        with self._connect_read() as conn, conn.cursor() as cur:
+            cur.execute(query, params)
+            events = list(cur.fetchall())
+        return build_events_page(events, limit, after, before)
+
+    def count_events(self) -> Dict[str, int]:
+        with self._connect_read() as conn, conn.cursor() as cur:
+            cur.execute(COUNT_EVENTS_SELECT)
+            return cur.fetchone()
+
     def get_event_by_id(self, event_id: int) -> Optional[Dict[str, Any]]:
-        with self._connect() as conn, conn.cursor() as cur:
+        with self._connect_read() as conn, conn.cursor() as cur:
             cur.execute("SELECT * FROM events WHERE id = %s", (event_id,))
             return cur.fetchone()
 
@@ -151,36 +668,31 @@ class PostgresDatabase(DatabaseInterface):
             conn.commit()
             return deleted
 
+    def get_events_with_dishes(self, event_ids: List[int]) -> List[Dict[str, Any]]:
+        if not event_ids:
+            return []
+        with self._connect_read() as conn, conn.cursor() as cur:
+            cur.execute(EVENTS_WITH_DISHES_SELECT, (list(event_ids),))
+            return events_with_dishes_from_rows(cur.fetchall(), event_ids)
+
+    def get_event_bundle(self, event_id: int) -> Optional[Dict[str, Any]]:
+        with self._connect_read() as conn, conn.cursor() as cur:
+            cur.execute(EVENT_BUNDLE_SELECT, (event_id,))
+            return event_bundle_from_row(cur.fetchone())
+
     def get_dish_categories(self) -> List[Dict[str, Any]]:
-        with self._connect() as conn, conn.cursor() as cur:
+        with self._connect_read() as conn, conn.cursor() as cur:
             cur.execute("SELECT * FROM dish_categories ORDER BY name")
             return list(cur.fetchall())
 
     def get_dishes_for_event(self, event_id: int) -> List[Dict[str, Any]]:
-        with self._connect() as conn, conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT d.*, c.name AS category_name
-                FROM dishes d
-                JOIN dish_categories c ON d.category_id = c.id
-                WHERE d.event_id = %s
-                ORDER BY c.name, d.name
-                """,
-                (event_id,),
-            )
+        with self._connect_read() as conn, conn.cursor() as cur:
+            cur.execute(DISHES_FOR_EVENT_SELECT, (event_id,))
             return list(cur.fetchall())
 
     def get_dish_by_id(self, dish_id: int) -> Optional[Dict[str, Any]]:
-        with self._connect() as conn, conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT d.*, c.name AS category_name
-                FROM dishes d
-                JOIN dish_categories c ON d.category_id = c.id
-                WHERE d.id = %s
-                """,
-                (dish_id,),
-            )
+        with self._connect_read() as conn, conn.cursor() as cur:
+            cur.execute(DISH_SELECT + " WHERE d.id = %s", (dish_id,))
             return cur.fetchone()
 
     def add_dish(
@@ -192,35 +704,24 @@ class PostgresDatabase(DatabaseInterface):
         description: str = "",
         serves: int = 0,
     ) -> Dict[str, Any]:
+        params = {
+            "event_id": event_id,
+            "name": name,
+            "category_id": category_id,
+            "person_name": person_name,
+            "description": description,
+            "serves": serves,
+        }
         with self._connect() as conn, conn.cursor() as cur:
-            cur.execute("SELECT 1 FROM events WHERE id = %s", (event_id,))
-            if not cur.fetchone():
-                raise ValueError(f"Event with ID {event_id} does not exist")
-
-            cur.execute("SELECT 1 FROM dish_categories WHERE id = %s", (category_id,))
-            if not cur.fetchone():
-                raise ValueError(f"Category with ID {category_id} does not exist")
-
-            created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            cur.execute(
-                """
-                INSERT INTO dishes (event_id, name, category_id, person_name, description, serves, created_at)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-                """,
-                (event_id, name, category_id, person_name, description, serves, created_at),
-            )
-            dish_id = cur.fetchone()["id"]
-            cur.execute(
-                """
-                SELECT d.*, c.name AS category_name
-                FROM dishes d
-                JOIN dish_categories c ON d.category_id = c.id
-                WHERE d.id = %s
-                """,
-                (dish_id,),
-            )
+            try:
+                cur.execute(INSERT_DISH, params)
+            except psycopg.errors.ForeignKeyViolation:
+                # The event was deleted after the EXISTS check saw it
+                raise ValueError(f"Event with ID {event_id} does not exist") from None
             dish = cur.fetchone()
+            if dish is None:
+                cur.execute(DISH_REFERENCES_SELECT, (event_id, category_id))
+                raise missing_dish_reference(event_id, category_id, cur.fetchone())
             conn.commit()
             return dish
 
@@ -233,37 +734,23 @@ class PostgresDatabase(DatabaseInterface):
         description: str = "",
         serves: int = 0,
     ) -> Optional[Dict[str, Any]]:
+        params = {
+            "dish_id": dish_id,
+            "name": name,
+            "category_id": category_id,
+            "person_name": person_name,
+            "description": description,
+            "serves": serves,
+        }
         with self._connect() as conn, conn.cursor() as cur:
-            cur.execute("SELECT 1 FROM dishes WHERE id = %s", (dish_id,))
-            if not cur.fetchone():
-                return None
-
-            cur.execute("SELECT 1 FROM dish_categories WHERE id = %s", (category_id,))
-            if not cur.fetchone():
-                raise ValueError(f"Category with ID {category_id} does not exist")
-
-            cur.execute(
-                """
-                UPDATE dishes
-                SET name = %s, category_id = %s, person_name = %s, description = %s, serves = %s
-                WHERE id = %s
-                RETURNING id
-                """,
-                (name, category_id, person_name, description, serves, dish_id),
-            )
-            updated = cur.fetchone()
-            if not updated:
-                return None
-            cur.execute(
-                """
-                SELECT d.*, c.name AS category_name
-                FROM dishes d
-                JOIN dish_categories c ON d.category_id = c.id
-                WHERE d.id = %s
-                """,
-                (dish_id,),
-            )
+            cur.execute(UPDATE_DISH, params)
             dish = cur.fetchone()
+            if dish is None:
+                # A missing dish wins over a missing category
+                cur.execute("SELECT 1 FROM dishes WHERE id = %s", (dish_id,))
+                if not cur.fetchone():
+                    return None
+                raise ValueError(f"Category with ID {category_id} does not exist")
             conn.commit()
             return dish
 
@@ -273,3 +760,54 @@ class PostgresDatabase(DatabaseInterface):
             deleted = cur.rowcount > 0
             conn.commit()
             return deleted
+
+    def get_events_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        with self._connect_read() as conn, conn.cursor() as cur:
+            cur.execute("SELECT * FROM events WHERE id > %s ORDER BY id LIMIT %s", (after_id, limit))
+            return list(cur.fetchall())
+
+    def get_dishes_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        with self._connect_read() as conn, conn.cursor() as cur:
+            cur.execute("SELECT * FROM dishes WHERE id > %s ORDER BY id LIMIT %s", (after_id, limit))
+            return list(cur.fetchall())
+
+    def bulk_add_events(self, events: List[Dict[str, Any]]) -> int:
+        return self._bulk_copy("events", events)
+
+    def bulk_add_dishes(self, dishes: List[Dict[str, Any]]) -> int:
+        return self._bulk_copy("dishes", dishes)
+
+    def save_categories(self, categories: List[Dict[str, Any]]) -> int:
+        try:
+            with self._connect() as conn, conn.cursor() as cur:
+                cur.execute(DELETE_OTHER_CATEGORIES, ([category["id"] for category in categories],))
+                if categories:
+                    cur.executemany(SAVE_CATEGORY, [(category["id"], category["name"]) for category in categories])
+                    cur.execute(SYNC_ID_SEQUENCE["dish_categories"])
+                conn.commit()
+        except psycopg.IntegrityError as exc:
+            # A deleted category still has dishes
+            raise ValueError(f"Could not save categories: {exc}") from exc
+        return len(categories)
+
+    def get_data_version(self) -> int:
+        # From the primary: a replica's version may lag the writes just made
+        with self._connect() as conn, conn.cursor() as cur:
+            cur.execute(DATA_VERSION_SELECT)
+            return cur.fetchone()["value"]
+
+    def _bulk_copy(self, table: str, records: List[Dict[str, Any]]) -> int:
+        copies, keeps_ids = bulk_copy_plan(table, records)
+        try:
+            with self._connect() as conn, conn.cursor() as cur:
+                for statement, rows in copies:
+                    with cur.copy(statement) as copy:
+                        for row in rows:
+                            copy.write_row(row)
+                if keeps_ids:
+                    cur.execute(SYNC_ID_SEQUENCE[table])
+                conn.commit()
+        except psycopg.IntegrityError as exc:
+            # Foreign key or duplicate ID: the whole batch was rolled back
+            raise ValueError(f"Could not add {table}: {exc}") from exc
+        return len(records)
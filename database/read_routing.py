@@ -0,0 +1,43 @@
+import itertools
+import os
+from contextvars import ContextVar
+from typing import Generic, List, Sequence, TypeVar
+
+P = TypeVar('P')
+
+# Set for the rest of a request once its reads must see the primary's writes
+_reads_on_primary: ContextVar[bool] = ContextVar("reads_on_primary", default=False)
+
+
+def get_read_urls() -> List[str]:
+    """Replica URLs from DATABASE_READ_URLS (comma or whitespace separated)."""
+    return os.environ.get("DATABASE_READ_URLS", "").replace(",", " ").split()
+
+
+def pin_reads_to_primary() -> None:
+    """Send every further read in the current context (request) to the primary."""
+    _reads_on_primary.set(True)
+
+
+def reads_pinned_to_primary() -> bool:
+    return _reads_on_primary.get()
+
+
+class ReplicaRouter(Generic[P]):
+    """
+    Picks the connection pool for a read: the replicas in turn, or the
+    primary when there are none or reads are pinned to it.
+
+    Writes always go to the primary pool directly.
+    """
+
+    def __init__(self, primary: P, replicas: Sequence[P] = ()):
+        self.primary = primary
+        self.replicas = list(replicas)
+        # next() on itertools.count is atomic, so threads need no lock
+        self._turns = itertools.count()
+
+    def for_read(self) -> P:
+        if not self.replicas or _reads_on_primary.get():
+            return self.primary
+        return self.replicas[next(self._turns) % len(self.replicas)]
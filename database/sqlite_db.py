@@ -1,43 +1,51 @@
 import sqlite3
 import os
-from typing import List, Dict, Any, Optional
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Callable, TypeVar
 from datetime import datetime
-from .db_interface import DatabaseInterface
+from .changes import DishChange, LocalChangeSource
+from .db_interface import (
+    BULK_BATCH_SIZE, DISH_BULK_COLUMNS, EVENT_BULK_COLUMNS, EVENTS_PAGE_SIZE,
+    DatabaseInterface, build_events_page, bulk_rows, count_dishes_by,
+    decode_event_cursor, score_to_date, should_seed_sample_data
+)
 
-class SQLiteDatabase(DatabaseInterface):
-    """SQLite implementation of the database interface."""
-    
-    def __init__(self, db_path: str = 'dinner_planner.db'):
-        """
-        Initialize the SQLite database.
-        
-        Args:
-            db_path: Path to the SQLite database file
-        """
-        self.db_path = db_path
-        self.conn = None
-        self.cursor = None
-    
-    def _connect(self):
-        """Establish a connection to the database."""
-        self.conn = sqlite3.connect(self.db_path)
-        # Configure SQLite to return dictionaries for rows
-        self.conn.row_factory = sqlite3.Row
-        self.cursor = self.conn.cursor()
-    
-    def _disconnect(self):
-        """Close the database connection."""
-        if self.conn:
-            self.conn.close()
-            self.conn = None
-            self.cursor = None
-    
-    def initialize(self) -> None:
-        """Initialize the database, creating tables if they don't exist."""
-        self._connect()
-        
-        # Create events table
-        self.cursor.execute('''
+T = TypeVar('T')
+
+# Number of prepared statements each connection keeps compiled. The interface
+# only issues a couple of dozen distinct statements, so they all stay warm.
+STATEMENT_CACHE_SIZE = 256
+
+# How long a connection waits on a lock before raising "database is locked"
+BUSY_TIMEOUT_MS = 5000
+
+# Events joined with their dishes; dish columns are prefixed to avoid clashing
+# with the event columns of the same name and split apart in _group_dishes().
+EVENTS_WITH_DISHES_SELECT = """
+    SELECT e.*,
+           d.id AS dish_id, d.event_id AS dish_event_id, d.name AS dish_name,
+           d.category_id AS dish_category_id, d.person_name AS dish_person_name,
+           d.description AS dish_description, d.serves AS dish_serves,
+           d.created_at AS dish_created_at, c.name AS dish_category_name
+    FROM events e
+    LEFT JOIN dishes d ON d.event_id = e.id
+    LEFT JOIN dish_categories c ON d.category_id = c.id
+"""
+
+# RETURNING clause giving back a written dish with its category name, shaped
+# like the rows of get_dish_by_id(), so a dish write is a single statement
+DISH_RETURNING = """
+    RETURNING *, (SELECT name FROM dish_categories WHERE id = category_id) AS category_name
+"""
+
+# Versioned schema migrations, applied in order by initialize(). The version
+# reached is recorded in schema_meta; append new steps, never edit old ones.
+MIGRATIONS = (
+    (1, (
+        '''
         CREATE TABLE IF NOT EXISTS events (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             title TEXT NOT NULL,
@@ -45,18 +53,14 @@ class SQLiteDatabase(DatabaseInterface):
             location TEXT NOT NULL,
             description TEXT
         )
-        ''')
-        
-        # Create dish categories table
-        self.cursor.execute('''
+        ''',
+        '''
         CREATE TABLE IF NOT EXISTS dish_categories (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT NOT NULL
         )
-        ''')
-        
-        # Create dishes table
-        self.cursor.execute('''
+        ''',
+        '''
         CREATE TABLE IF NOT EXISTS dishes (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             event_id INTEGER NOT NULL,
@@ -69,94 +73,464 @@ class SQLiteDatabase(DatabaseInterface):
             FOREIGN KEY (event_id) REFERENCES events (id) ON DELETE CASCADE,
             FOREIGN KEY (category_id) REFERENCES dish_categories (id)
         )
-        ''')
-        
-        # Check if we need to add sample dish categories
-        self.cursor.execute("SELECT COUNT(*) FROM dish_categories")
-        count = self.cursor.fetchone()[0]
-        
-        # Add sample dish categories if the table is empty
-        if count == 0:
-            categories = [
-                "Appetizer",
-                "Main Dish",
-                "Side Dish",
-                "Salad",
-                "Dessert",
-                "Bread",
-                "Beverage"
-            ]
+        ''',
+    )),
+    # Dates stay ISO-8601 TEXT, SQLite's native timestamp representation,
+    # which sorts chronologically; what was missing were the indexes.
+    (2, (
+        "CREATE INDEX IF NOT EXISTS idx_events_date_id ON events (date, id)",
+        "CREATE INDEX IF NOT EXISTS idx_dishes_event_id ON dishes (event_id)",
+        "CREATE INDEX IF NOT EXISTS idx_dishes_category_id ON dishes (category_id)",
+    )),
+    # foreign_keys used to be off, so deleting an event left its dishes behind;
+    # the ON DELETE CASCADE only applies now that every connection enables it.
+    # _migrate() logs how many rows each DELETE removes.
+    (3, (
+        "DELETE FROM dishes WHERE event_id NOT IN (SELECT id FROM events)",
+    )),
+    # The data version (see get_data_version), shared by every process
+    (4, (
+        "CREATE TABLE IF NOT EXISTS data_version "
+        "(id INTEGER PRIMARY KEY CHECK (id = 1), value INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO data_version (id, value) VALUES (1, 0)",
+    )),
+    # ... raised by every changed row, in the writing statement's own
+    # transaction, so no reader sees a write under the old version
+    (5, tuple(
+        f"CREATE TRIGGER IF NOT EXISTS {table}_bump_data_version_{op.lower()} AFTER {op} ON {table} "
+        "BEGIN UPDATE data_version SET value = value + 1 WHERE id = 1; END"
+        for table in ("events", "dishes", "dish_categories")
+        for op in ("INSERT", "UPDATE", "DELETE")
+    )),
+    # Dishes could likewise point at a category that did not exist
+    (6, (
+        "DELETE FROM dishes WHERE category_id NOT IN (SELECT id FROM dish_categories)",
+    )),
+)
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# Extra per-connection settings applied in production mode
+PRODUCTION_PRAGMAS = {
+    'synchronous': 'NORMAL',       # durable with WAL, without an fsync per commit
+    'mmap_size': 256 * 1024 * 1024,  # serve reads straight from the page cache
+    'temp_store': 'MEMORY',
+    'cache_size': -16000,          # 16 MB page cache per connection
+}
+
+
+class SQLiteWriter:
+    """
+    Dedicated writer thread for a SQLite database.
+    
+    Every write is queued and executed on the writer's own connection. The
+    thread drains whatever is waiting in the queue and runs it inside a single
+    transaction, so concurrent sign-ups share one commit instead of fighting
+    over the write lock. Each operation runs in its own savepoint, so one
+    failing write does not take the rest of its batch down with it.
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, open_connection: Callable[[], sqlite3.Connection], max_batch_size: int = 64):
+        """
+        Start the writer thread.
+        
+        Args:
+            open_connection: Factory returning a new connection for the writer
+            max_batch_size: Maximum number of writes committed together
+        """
+        self._open_connection = open_connection
+        self.max_batch_size = max_batch_size
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='sqlite-writer', daemon=True)
+        self._thread.start()
+    
+    def submit(self, operation: Callable[[sqlite3.Cursor], T]) -> T:
+        """
+        Run a write operation on the writer thread and wait for its result.
+        
+        Args:
+            operation: Callable receiving a cursor; its return value is passed back
             
-            for category in categories:
-                self.cursor.execute(
+        Returns:
+            Whatever the operation returned, once its batch has been committed
+        """
+        future: Future = Future()
+        self._queue.put((operation, future))
+        return future.result()
+    
+    def close(self) -> None:
+        """Flush pending writes and stop the writer thread."""
+        self._queue.put(self._STOP)
+        self._thread.join()
+    
+    def _next_batch(self) -> Tuple[List[Tuple[Callable, Future]], bool]:
+        """Block for the next write, then drain up to max_batch_size more."""
+        batch = []
+        stopping = False
+        item = self._queue.get()
+        while True:
+            if item is self._STOP:
+                stopping = True
+                break
+            batch.append(item)
+            if len(batch) >= self.max_batch_size:
+                break
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+        return batch, stopping
+    
+    def _run(self) -> None:
+        conn = self._open_connection()
+        cursor = conn.cursor()
+        try:
+            while True:
+                batch, stopping = self._next_batch()
+                if batch:
+                    self._execute_batch(conn, cursor, batch)
+                if stopping:
+                    return
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def _execute_batch(self, conn: sqlite3.Connection, cursor: sqlite3.Cursor,
+                       batch: List[Tuple[Callable, Future]]) -> None:
+        outcomes = []
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            for operation, _ in batch:
+                cursor.execute("SAVEPOINT write_op")
+                try:
+                    outcomes.append((True, operation(cursor)))
+                    cursor.execute("RELEASE write_op")
+                except Exception as exc:
+                    cursor.execute("ROLLBACK TO write_op")
+                    cursor.execute("RELEASE write_op")
+                    outcomes.append((False, exc))
+            conn.commit()
+        except Exception as exc:
+            if conn.in_transaction:
+                conn.rollback()
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        
+        for (_, future), (ok, value) in zip(batch, outcomes):
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+class SQLiteDatabase(DatabaseInterface):
+    """SQLite implementation of the database interface."""
+    
+    def __init__(self, db_path: str = 'dinner_planner.db', production: bool = False):
+        """
+        Initialize the SQLite database.
+        
+        Args:
+            db_path: Path to the SQLite database file
+            production: Enable WAL, memory-mapped reads and the single writer thread
+        """
+        if sqlite3.sqlite_version_info < (3, 35, 0):
+            # Writes are single statements with RETURNING
+            raise RuntimeError(f"SQLite 3.35 or newer is required, found {sqlite3.sqlite_version}")
+        self.db_path = db_path
+        self.production = production
+        self._writer: Optional[SQLiteWriter] = None
+        self._writer_lock = threading.Lock()
+        # One long-lived connection per thread. FastAPI runs sync handlers on a
+        # threadpool, so every worker thread gets its own connection and
+        # cursor instead of sharing (and overwriting) a single one.
+        self._local = threading.local()
+        self._connections: List[Tuple[threading.Thread, sqlite3.Connection]] = []
+        self._connections_lock = threading.Lock()
+        # SQLite cannot notify other processes, so only our own writes are seen
+        self._changes = LocalChangeSource()
+    
+    def change_source(self) -> LocalChangeSource:
+        """Dish changes committed through this object."""
+        return self._changes
+    
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a new connection to the database file."""
+        # check_same_thread is disabled only so close() can shut down
+        # connections owned by other threads; each connection is otherwise
+        # used exclusively by the thread that opened it.
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        # Configure SQLite to return dictionaries for rows
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA foreign_keys = ON")
+        if self.production:
+            for pragma, value in PRODUCTION_PRAGMAS.items():
+                conn.execute(f"PRAGMA {pragma} = {value}")
+        return conn
+    
+    def _get_connection(self) -> sqlite3.Connection:
+        """Return the calling thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+        
+        conn = self._open_connection()
+        self._local.conn = conn
+        with self._connections_lock:
+            # Close connections left behind by threads that have exited
+            alive = []
+            for thread, thread_conn in self._connections:
+                if thread.is_alive():
+                    alive.append((thread, thread_conn))
+                else:
+                    thread_conn.close()
+            alive.append((threading.current_thread(), conn))
+            self._connections = alive
+        return conn
+    
+    @contextmanager
+    def _cursor(self) -> Iterator[sqlite3.Cursor]:
+        """
+        Yield a cursor on the calling thread's connection.
+        
+        Any open transaction is committed when the block exits normally and
+        rolled back if it raises.
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            yield cursor
+            if conn.in_transaction:
+                conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    
+    def _write(self, operation: Callable[[sqlite3.Cursor], T]) -> T:
+        """
+        Run a write operation.
+        
+        In production mode the operation is handed to the single writer thread
+        and batched with other pending writes; otherwise it runs directly on
+        the calling thread's connection.
+        """
+        if not self.production:
+            with self._cursor() as cursor:
+                return operation(cursor)
+        
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = SQLiteWriter(self._open_connection)
+        return self._writer.submit(operation)
+    
+    def close(self) -> None:
+        """Stop the writer thread and close every pooled connection."""
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        with self._connections_lock:
+            for _, conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+    
+    def initialize(self) -> None:
+        """
+        Initialize the database, creating tables if they don't exist.
+        
+        Once the schema is current this is a single read of schema_meta.
+        Otherwise the write lock is taken before migrating and seeding, so
+        concurrently starting processes bootstrap one at a time and the
+        later ones find nothing left to do.
+        """
+        if self.production:
+            # WAL is persistent in the database file, so it only needs setting
+            # once; readers then never block on the writer and vice versa.
+            self._get_connection().execute("PRAGMA journal_mode = WAL")
+        
+        if self._schema_version() >= SCHEMA_VERSION:
+            return
+        
+        with self._cursor() as cursor:
+            cursor.execute("BEGIN IMMEDIATE")
+            if self._migrate(cursor) == 0:
+                # Another process finished bootstrapping while we waited
+                return
+            
+            # Check if we need to add sample dish categories
+            cursor.execute("SELECT COUNT(*) FROM dish_categories")
+            count = cursor.fetchone()[0]
+            
+            # Add sample dish categories if the table is empty
+            if count == 0:
+                categories = [
+                    "Appetizer",
+                    "Main Dish",
+                    "Side Dish",
+                    "Salad",
+                    "Dessert",
+                    "Bread",
+                    "Beverage"
+                ]
+                
+                cursor.executemany(
                     "INSERT INTO dish_categories (name) VALUES (?)",
-                    (category,)
+                    [(category,) for category in categories]
                 )
-        
-        # Check if we need to add sample data for events
-        self.cursor.execute("SELECT COUNT(*) FROM events")
-        count = self.cursor.fetchone()[0]
-        
-        # Add sample data if the table is empty
-        if count == 0:
-            sample_events = [
-                {
-                    'title': 'Easter Dinner',
-                    'date': '2024-03-31 17:00',
-                    'location': 'Mom\'s House',
-                    'description': 'Annual family Easter dinner. Everyone is welcome to bring a dish!'
-                },
-                {
-                    'title': 'Summer BBQ',
-                    'date': '2024-07-04 16:00',
-                    'location': 'Backyard',
-                    'description': 'Independence Day celebration with grilling and fireworks.'
-                },
-                {
-                    'title': 'Thanksgiving Dinner',
-                    'date': '2024-11-28 16:00',
-                    'location': 'Grandma\'s House',
-                    'description': 'Traditional Thanksgiving dinner with the whole family.'
-                }
-            ]
             
-            for event in sample_events:
-                self.cursor.execute(
+            # Check if we need to add sample data for events
+            cursor.execute("SELECT COUNT(*) FROM events")
+            count = cursor.fetchone()[0]
+            
+            # Add sample data if the table is empty
+            if count == 0 and should_seed_sample_data():
+                sample_events = [
+                    {
+                        'title': 'Easter Dinner',
+                        'date': '2024-03-31 17:00',
+                        'location': 'Mom\'s House',
+                        'description': 'Annual family Easter dinner. Everyone is welcome to bring a dish!'
+                    },
+                    {
+                        'title': 'Summer BBQ',
+                        'date': '2024-07-04 16:00',
+                        'location': 'Backyard',
+                        'description': 'Independence Day celebration with grilling and fireworks.'
+                    },
+                    {
+                        'title': 'Thanksgiving Dinner',
+                        'date': '2024-11-28 16:00',
+                        'location': 'Grandma\'s House',
+                        'description': 'Traditional Thanksgiving dinner with the whole family.'
+                    }
+                ]
+                
+                cursor.executemany(
                     "INSERT INTO events (title, date, location, description) VALUES (?, ?, ?, ?)",
-                    (event['title'], event['date'], event['location'], event['description'])
+                    [
+                        (event['title'], event['date'], event['location'], event['description'])
+                        for event in sample_events
+                    ]
                 )
+    
+    def _schema_version(self) -> int:
+        """Schema version recorded in schema_meta, 0 for a new database."""
+        try:
+            row = self._get_connection().execute("SELECT version FROM schema_meta WHERE id = 1").fetchone()
+        except sqlite3.OperationalError:
+            # No schema_meta table yet
+            return 0
+        return row[0] if row else 0
+    
+    @staticmethod
+    def _migrate(cursor: sqlite3.Cursor) -> int:
+        """
+        Apply the migrations newer than the version recorded in schema_meta.
         
-        self.conn.commit()
-        self._disconnect()
+        Returns:
+            The number of migrations applied
+        """
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS schema_meta "
+            "(id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)"
+        )
+        cursor.execute("SELECT version FROM schema_meta WHERE id = 1")
+        row = cursor.fetchone()
+        current = row[0] if row else 0
+        
+        applied = 0
+        for version, statements in MIGRATIONS:
+            if version <= current:
+                continue
+            for statement in statements:
+                cursor.execute(statement)
+                if statement.startswith("DELETE") and cursor.rowcount > 0:
+                    print(f"Schema version {version}: deleted {cursor.rowcount} rows ({statement})")
+            cursor.execute(
+                "INSERT INTO schema_meta (id, version) VALUES (1, ?) "
+                "ON CONFLICT (id) DO UPDATE SET version = excluded.version",
+                (version,)
+            )
+            applied += 1
+        return applied
     
     def get_events(self) -> List[Dict[str, Any]]:
         """Get all events from the database."""
-        self._connect()
-        self.cursor.execute("SELECT * FROM events ORDER BY date")
-        events = [dict(row) for row in self.cursor.fetchall()]
-        self._disconnect()
-        return events
+        with self._cursor() as cursor:
+            cursor.execute("SELECT * FROM events ORDER BY date")
+            return [dict(row) for row in cursor.fetchall()]
     
     def get_upcoming_events(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """Get upcoming events (events with dates in the future)."""
-        self._connect()
         now = datetime.now().strftime('%Y-%m-%d %H:%M')
         
-        query = "SELECT * FROM events WHERE date >= ? ORDER BY date"
-        if limit:
-            query += f" LIMIT {limit}"
+        # Keep the LIMIT parameterised so the statement text stays constant
+        # and hits the prepared statement cache; -1 means "no limit".
+        query = "SELECT * FROM events WHERE date >= ? ORDER BY date LIMIT ?"
         
-        self.cursor.execute(query, (now,))
-        events = [dict(row) for row in self.cursor.fetchall()]
-        self._disconnect()
-        return events
+        with self._cursor() as cursor:
+            cursor.execute(query, (now, limit if limit else -1))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_events_page(self, upcoming: bool, limit: int = EVENTS_PAGE_SIZE,
+                        after: Optional[str] = None,
+                        before: Optional[str] = None) -> Dict[str, Any]:
+        """Get one page of upcoming or past events using keyset pagination."""
+        now = datetime.now().strftime('%Y-%m-%d %H:%M')
+        cursor_value = before if before is not None else after
+        # Upcoming pages read forward in ascending order, past pages in
+        # descending order; paging back with `before` flips the direction.
+        ascending = upcoming != (before is not None)
+        
+        conditions = ["date >= ?" if upcoming else "date < ?"]
+        params: List[Any] = [now]
+        if cursor_value is not None:
+            score, event_id = decode_event_cursor(cursor_value)
+            conditions.append("(date, id) > (?, ?)" if ascending else "(date, id) < (?, ?)")
+            params.extend([score_to_date(score), event_id])
+        
+        order = "ASC" if ascending else "DESC"
+        query = (f"SELECT * FROM events WHERE {' AND '.join(conditions)} "
+                 f"ORDER BY date {order}, id {order} LIMIT ?")
+        params.append(limit + 1)
+        
+        with self._cursor() as cursor:
+            cursor.execute(query, params)
+            events = [dict(row) for row in cursor.fetchall()]
+        return build_events_page(events, limit, after, before)
+    
+    def count_events(self) -> Dict[str, int]:
+        """Count upcoming and past events."""
+        now = datetime.now().strftime('%Y-%m-%d %H:%M')
+        
+        with self._cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT COALESCE(SUM(date >= ?), 0) AS upcoming,
+                       COALESCE(SUM(date < ?), 0) AS past
+                FROM events
+                """,
+                (now, now)
+            )
+            return dict(cursor.fetchone())
     
     def get_event_by_id(self, event_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific event by ID."""
-        self._connect()
-        self.cursor.execute("SELECT * FROM events WHERE id = ?", (event_id,))
-        event = self.cursor.fetchone()
-        self._disconnect()
+        with self._cursor() as cursor:
+            cursor.execute("SELECT * FROM events WHERE id = ?", (event_id,))
+            event = cursor.fetchone()
         
         if event:
             return dict(event)
@@ -164,96 +538,125 @@ class SQLiteDatabase(DatabaseInterface):
     
     def add_event(self, title: str, date: str, location: str, description: str) -> Dict[str, Any]:
         """Add a new event to the database."""
-        self._connect()
-        self.cursor.execute(
-            "INSERT INTO events (title, date, location, description) VALUES (?, ?, ?, ?)",
-            (title, date, location, description)
-        )
-        event_id = self.cursor.lastrowid
-        self.conn.commit()
-        
-        # Fetch the newly created event
-        self.cursor.execute("SELECT * FROM events WHERE id = ?", (event_id,))
-        event = dict(self.cursor.fetchone())
-        
-        self._disconnect()
-        return event
+        def operation(cursor: sqlite3.Cursor):
+            cursor.execute(
+                "INSERT INTO events (title, date, location, description) VALUES (?, ?, ?, ?) RETURNING *",
+                (title, date, location, description)
+            )
+            return dict(cursor.fetchall()[0])
+        
+        return self._write(operation)
     
     def update_event(self, event_id: int, title: str, date: str, location: str, description: str) -> Optional[Dict[str, Any]]:
         """Update an existing event."""
-        self._connect()
-        
-        # Check if the event exists
-        self.cursor.execute("SELECT * FROM events WHERE id = ?", (event_id,))
-        if not self.cursor.fetchone():
-            self._disconnect()
-            return None
-        
-        # Update the event
-        self.cursor.execute(
-            "UPDATE events SET title = ?, date = ?, location = ?, description = ? WHERE id = ?",
-            (title, date, location, description, event_id)
-        )
-        self.conn.commit()
-        
-        # Fetch the updated event
-        self.cursor.execute("SELECT * FROM events WHERE id = ?", (event_id,))
-        event = dict(self.cursor.fetchone())
-        
-        self._disconnect()
-        return event
+        def operation(cursor: sqlite3.Cursor):
+            # No row comes back if the event does not exist
+            cursor.execute(
+                "UPDATE events SET title = ?, date = ?, location = ?, description = ? WHERE id = ? RETURNING *",
+                (title, date, location, description, event_id)
+            )
+            rows = cursor.fetchall()
+            return dict(rows[0]) if rows else None
+        
+        return self._write(operation)
     
     def delete_event(self, event_id: int) -> bool:
         """Delete an event from the database."""
-        self._connect()
+        def operation(cursor: sqlite3.Cursor):
+            cursor.execute("DELETE FROM events WHERE id = ?", (event_id,))
+            return cursor.rowcount > 0
         
-        # Check if the event exists
-        self.cursor.execute("SELECT * FROM events WHERE id = ?", (event_id,))
-        if not self.cursor.fetchone():
-            self._disconnect()
-            return False
-        
-        # Delete the event
-        self.cursor.execute("DELETE FROM events WHERE id = ?", (event_id,))
-        self.conn.commit()
-        self._disconnect()
-        return True
+        return self._write(operation)
+    
+    @staticmethod
+    def _group_dishes(rows: List[sqlite3.Row]) -> List[Dict[str, Any]]:
+        """Fold EVENTS_WITH_DISHES_SELECT rows into events with a 'dishes' list."""
+        events: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            row = dict(row)
+            dish = {key[len('dish_'):]: row.pop(key) for key in list(row) if key.startswith('dish_')}
+            event = events.setdefault(row['id'], {**row, 'dishes': []})
+            if dish['id'] is not None:
+                event['dishes'].append(dish)
+        return list(events.values())
+    
+    def get_events_with_dishes(self, event_ids: List[int]) -> List[Dict[str, Any]]:
+        """Get several events together with their dishes in a single query."""
+        if not event_ids:
+            return []
+        
+        placeholders = ', '.join('?' for _ in event_ids)
+        with self._cursor() as cursor:
+            cursor.execute(
+                EVENTS_WITH_DISHES_SELECT
+                + f" WHERE e.id IN ({placeholders}) ORDER BY e.id, c.name, d.name",
+                list(event_ids)
+            )
+            events = {event['id']: event for event in self._group_dishes(cursor.fetchall())}
+        
+        result = []
+        for event_id in event_ids:
+            event = events.get(event_id)
+            if event is not None:
+                event['category_counts'] = count_dishes_by(event['dishes'], 'category_name')
+                result.append(event)
+        return result
+    
+    def get_event_bundle(self, event_id: int) -> Optional[Dict[str, Any]]:
+        """Get an event with its dishes, all categories and per-category counts."""
+        # Both statements run back to back on this thread's connection, so
+        # unlike the per-method calls there is no connection setup in between.
+        with self._cursor() as cursor:
+            cursor.execute(
+                EVENTS_WITH_DISHES_SELECT + " WHERE e.id = ? ORDER BY c.name, d.name",
+                (event_id,)
+            )
+            events = self._group_dishes(cursor.fetchall())
+            if not events:
+                return None
+            
+            cursor.execute("SELECT * FROM dish_categories ORDER BY name")
+            categories = [dict(row) for row in cursor.fetchall()]
+        
+        event = events[0]
+        dishes = event.pop('dishes')
+        return {
+            'event': event,
+            'dishes': dishes,
+            'categories': categories,
+            'category_counts': count_dishes_by(dishes, 'category_id'),
+        }
     
     # Methods for dish sign-ups - Phase 5
     
     def get_dish_categories(self) -> List[Dict[str, Any]]:
         """Get all dish categories."""
-        self._connect()
-        self.cursor.execute("SELECT * FROM dish_categories ORDER BY name")
-        categories = [dict(row) for row in self.cursor.fetchall()]
-        self._disconnect()
-        return categories
+        with self._cursor() as cursor:
+            cursor.execute("SELECT * FROM dish_categories ORDER BY name")
+            return [dict(row) for row in cursor.fetchall()]
     
     def get_dishes_for_event(self, event_id: int) -> List[Dict[str, Any]]:
         """Get all dishes signed up for a specific event."""
-        self._connect()
-        self.cursor.execute("""
-            SELECT d.*, c.name as category_name 
-            FROM dishes d
-            JOIN dish_categories c ON d.category_id = c.id
-            WHERE d.event_id = ?
-            ORDER BY c.name, d.name
-        """, (event_id,))
-        dishes = [dict(row) for row in self.cursor.fetchall()]
-        self._disconnect()
-        return dishes
+        with self._cursor() as cursor:
+            cursor.execute("""
+                SELECT d.*, c.name as category_name 
+                FROM dishes d
+                JOIN dish_categories c ON d.category_id = c.id
+                WHERE d.event_id = ?
+                ORDER BY c.name, d.name
+            """, (event_id,))
+            return [dict(row) for row in cursor.fetchall()]
     
     def get_dish_by_id(self, dish_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific dish by ID."""
-        self._connect()
-        self.cursor.execute("""
-            SELECT d.*, c.name as category_name 
-            FROM dishes d
-            JOIN dish_categories c ON d.category_id = c.id
-            WHERE d.id = ?
-        """, (dish_id,))
-        dish = self.cursor.fetchone()
-        self._disconnect()
+        with self._cursor() as cursor:
+            cursor.execute("""
+                SELECT d.*, c.name as category_name 
+                FROM dishes d
+                JOIN dish_categories c ON d.category_id = c.id
+                WHERE d.id = ?
+            """, (dish_id,))
+            dish = cursor.fetchone()
         
         if dish:
             return dict(dish)
@@ -263,100 +666,164 @@ class SQLiteDatabase(DatabaseInterface):
                 person_name: str, description: str = "", 
                 serves: int = 0) -> Dict[str, Any]:
         """Add a new dish to an event."""
-        self._connect()
-        
-        # Check if the event exists
-        self.cursor.execute("SELECT * FROM events WHERE id = ?", (event_id,))
-        if not self.cursor.fetchone():
-            self._disconnect()
-            raise ValueError(f"Event with ID {event_id} does not exist")
-        
-        # Check if the category exists
-        self.cursor.execute("SELECT * FROM dish_categories WHERE id = ?", (category_id,))
-        if not self.cursor.fetchone():
-            self._disconnect()
+        def operation(cursor: sqlite3.Cursor):
+            created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            
+            # Insert only if the event and category exist, in the same statement
+            cursor.execute(
+                """
+                INSERT INTO dishes 
+                (event_id, name, category_id, person_name, description, serves, created_at) 
+                SELECT ?, ?, ?, ?, ?, ?, ?
+                WHERE EXISTS (SELECT 1 FROM events WHERE id = ?)
+                  AND EXISTS (SELECT 1 FROM dish_categories WHERE id = ?)
+                """ + DISH_RETURNING,
+                (event_id, name, category_id, person_name, description, serves, created_at,
+                 event_id, category_id)
+            )
+            rows = cursor.fetchall()
+            if rows:
+                return dict(rows[0])
+            
+            # Nothing inserted: find out which reference was missing
+            cursor.execute("SELECT 1 FROM events WHERE id = ?", (event_id,))
+            if not cursor.fetchone():
+                raise ValueError(f"Event with ID {event_id} does not exist")
             raise ValueError(f"Category with ID {category_id} does not exist")
         
-        # Get current timestamp
-        created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        # Insert the dish
-        self.cursor.execute(
-            """
-            INSERT INTO dishes 
-            (event_id, name, category_id, person_name, description, serves, created_at) 
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (event_id, name, category_id, person_name, description, serves, created_at)
-        )
-        dish_id = self.cursor.lastrowid
-        self.conn.commit()
-        
-        # Fetch the newly created dish with category name
-        self.cursor.execute("""
-            SELECT d.*, c.name as category_name 
-            FROM dishes d
-            JOIN dish_categories c ON d.category_id = c.id
-            WHERE d.id = ?
-        """, (dish_id,))
-        dish = dict(self.cursor.fetchone())
-        
-        self._disconnect()
+        dish = self._write(operation)
+        self._changes.notify(DishChange("add", dish["event_id"], dish["id"], dict(dish)))
         return dish
     
     def update_dish(self, dish_id: int, name: str, category_id: int, 
                    person_name: str, description: str = "", 
                    serves: int = 0) -> Optional[Dict[str, Any]]:
         """Update an existing dish."""
-        self._connect()
-        
-        # Check if the dish exists
-        self.cursor.execute("SELECT * FROM dishes WHERE id = ?", (dish_id,))
-        if not self.cursor.fetchone():
-            self._disconnect()
-            return None
-        
-        # Check if the category exists
-        self.cursor.execute("SELECT * FROM dish_categories WHERE id = ?", (category_id,))
-        if not self.cursor.fetchone():
-            self._disconnect()
+        def operation(cursor: sqlite3.Cursor):
+            cursor.execute(
+                """
+                UPDATE dishes 
+                SET name = ?, category_id = ?, person_name = ?, description = ?, serves = ?
+                WHERE id = ? AND EXISTS (SELECT 1 FROM dish_categories WHERE id = ?)
+                """ + DISH_RETURNING,
+                (name, category_id, person_name, description, serves, dish_id, category_id)
+            )
+            rows = cursor.fetchall()
+            if rows:
+                return dict(rows[0])
+            
+            # Nothing updated: a missing dish wins over a missing category
+            cursor.execute("SELECT 1 FROM dishes WHERE id = ?", (dish_id,))
+            if not cursor.fetchone():
+                return None
             raise ValueError(f"Category with ID {category_id} does not exist")
         
-        # Update the dish
-        self.cursor.execute(
-            """
-            UPDATE dishes 
-            SET name = ?, category_id = ?, person_name = ?, description = ?, serves = ?
-            WHERE id = ?
-            """,
-            (name, category_id, person_name, description, serves, dish_id)
-        )
-        self.conn.commit()
-        
-        # Fetch the updated dish with category name
-        self.cursor.execute("""
-            SELECT d.*, c.name as category_name 
-            FROM dishes d
-            JOIN dish_categories c ON d.category_id = c.id
-            WHERE d.id = ?
-        """, (dish_id,))
-        dish = dict(self.cursor.fetchone())
-        
-        self._disconnect()
+        dish = self._write(operation)
+        if dish is not None:
+            self._changes.notify(DishChange("update", dish["event_id"], dish["id"], dict(dish)))
         return dish
     
     def delete_dish(self, dish_id: int) -> bool:
         """Delete a dish from the database."""
-        self._connect()
-        
-        # Check if the dish exists
-        self.cursor.execute("SELECT * FROM dishes WHERE id = ?", (dish_id,))
-        if not self.cursor.fetchone():
-            self._disconnect()
-            return False
-        
-        # Delete the dish
-        self.cursor.execute("DELETE FROM dishes WHERE id = ?", (dish_id,))
-        self.conn.commit()
-        self._disconnect()
-        return True 
+        def operation(cursor: sqlite3.Cursor):
+            cursor.execute("DELETE FROM dishes WHERE id = ? RETURNING event_id", (dish_id,))
+            return cursor.fetchall()
+        
+        deleted = self._write(operation)
+        if deleted:
+            self._changes.notify(DishChange("delete", deleted[0]["event_id"], dish_id))
+        return bool(deleted)
+    
+    def get_events_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """Get the next batch of events in ID order."""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT * FROM events WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def get_dishes_after(self, after_id: int = 0, limit: int = BULK_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """Get the next batch of dishes in ID order."""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT * FROM dishes WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit))
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def bulk_add_events(self, events: List[Dict[str, Any]]) -> int:
+        """Add a batch of events with executemany, in one transaction."""
+        with_ids, without_ids = bulk_rows(events, EVENT_BULK_COLUMNS, {'description': ''})
+        
+        def operation(cursor: sqlite3.Cursor):
+            cursor.executemany(
+                "INSERT INTO events (id, title, date, location, description) VALUES (?, ?, ?, ?, ?)",
+                with_ids
+            )
+            cursor.executemany(
+                "INSERT INTO events (title, date, location, description) VALUES (?, ?, ?, ?)",
+                without_ids
+            )
+            return len(events)
+        
+        try:
+            return self._write(operation)
+        except sqlite3.IntegrityError as exc:
+            raise ValueError(f"Could not add events: {exc}") from exc
+    
+    def bulk_add_dishes(self, dishes: List[Dict[str, Any]]) -> int:
+        """Add a batch of dishes with executemany, in one transaction."""
+        defaults = {
+            'description': '',
+            'serves': 0,
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        with_ids, without_ids = bulk_rows(dishes, DISH_BULK_COLUMNS, defaults)
+        
+        def operation(cursor: sqlite3.Cursor):
+            # foreign_keys is on, so an unknown event or category fails the batch
+            cursor.executemany(
+                """
+                INSERT INTO dishes
+                (id, event_id, name, category_id, person_name, description, serves, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                with_ids
+            )
+            cursor.executemany(
+                """
+                INSERT INTO dishes
+                (event_id, name, category_id, person_name, description, serves, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                without_ids
+            )
+            return len(dishes)
+        
+        try:
+            return self._write(operation)
+        except sqlite3.IntegrityError as exc:
+            raise ValueError(f"Could not add dishes: {exc}") from exc
+    
+    def save_categories(self, categories: List[Dict[str, Any]]) -> int:
+        """Replace the dish categories by ID, in one transaction."""
+        def operation(cursor: sqlite3.Cursor):
+            placeholders = ', '.join('?' for _ in categories)
+            cursor.execute(
+                f"DELETE FROM dish_categories WHERE id NOT IN ({placeholders})",
+                [category['id'] for category in categories]
+            )
+            cursor.executemany(
+                """
+                INSERT INTO dish_categories (id, name) VALUES (?, ?)
+                ON CONFLICT (id) DO UPDATE SET name = excluded.name
+                """,
+                [(category['id'], category['name']) for category in categories]
+            )
+            return len(categories)
+        
+        try:
+            return self._write(operation)
+        except sqlite3.IntegrityError as exc:
+            raise ValueError(f"Could not save categories: {exc}") from exc
+    
+    def get_data_version(self) -> int:
+        """Get the data version from its one-row table."""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT value FROM data_version WHERE id = 1")
+            return cursor.fetchone()[0]
@@ -0,0 +1,90 @@
+import time
+from typing import Callable, Sequence, Tuple
+from .async_db_interface import AsyncDatabaseInterface
+from .db_interface import DatabaseInterface
+from .db_proxy import AsyncDatabaseProxy, DatabaseProxy
+
+# recorder(backend, method, seconds, failed, params); params are the call's
+# positional arguments, followed by a dict of its keyword arguments if any
+CallRecorder = Callable[[str, str, float, bool, Tuple], None]
+
+
+def _failed(error: BaseException) -> bool:
+    # ValueError is how the interface rejects bad input (unknown event,
+    # malformed cursor, ...); that is the caller's mistake, not a DB error.
+    return not isinstance(error, ValueError)
+
+
+def _record(proxy, name: str, started: float, failed: bool, args: Tuple, kwargs: dict) -> None:
+    seconds = time.perf_counter() - started
+    params = args + (kwargs,) if kwargs else args
+    for recorder in proxy.recorders:
+        recorder(proxy.backend, name, seconds, failed, params)
+
+
+def _timed(name: str):
+    def call(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = getattr(self.database, name)(*args, **kwargs)
+        except BaseException as error:
+            _record(self, name, started, _failed(error), args, kwargs)
+            raise
+        _record(self, name, started, False, args, kwargs)
+        return result
+
+    call.__name__ = name
+    return call
+
+
+def _async_timed(name: str):
+    async def call(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = await getattr(self.database, name)(*args, **kwargs)
+        except BaseException as error:
+            _record(self, name, started, _failed(error), args, kwargs)
+            raise
+        _record(self, name, started, False, args, kwargs)
+        return result
+
+    call.__name__ = name
+    return call
+
+
+class TimedDatabase(DatabaseProxy):
+    """
+    Reports the duration and outcome of every interface call to recorders.
+
+    Meant to sit directly on the backend, under the category cache, so only
+    calls that actually reach the database are counted. The cost per call is
+    two perf_counter() reads plus whatever the recorders do.
+    """
+
+    def __init__(self, database: DatabaseInterface, backend: str, recorders: Sequence[CallRecorder]):
+        """
+        Wrap a database implementation.
+
+        Args:
+            database: The backend whose calls are timed
+            backend: Backend label passed to the recorders (sqlite, postgres, redis)
+            recorders: Each called as recorder(backend, method, seconds, failed, params)
+        """
+        super().__init__(database)
+        self.backend = backend
+        self.recorders = tuple(recorders)
+
+
+class AsyncTimedDatabase(AsyncDatabaseProxy):
+    """Async counterpart of TimedDatabase."""
+
+    def __init__(self, database: AsyncDatabaseInterface, backend: str, recorders: Sequence[CallRecorder]):
+        super().__init__(database)
+        self.backend = backend
+        self.recorders = tuple(recorders)
+
+
+for _name in DatabaseInterface.__abstractmethods__:
+    setattr(TimedDatabase, _name, _timed(_name))
+for _name in AsyncDatabaseInterface.__abstractmethods__:
+    setattr(AsyncTimedDatabase, _name, _async_timed(_name))
@@ -0,0 +1,304 @@
+import asyncio
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from itsdangerous import BadSignature, Signer
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+
+Flash = Dict[str, str]
+
+
+class FlashStore:
+    """
+    Server-side storage for pending flash messages, keyed by a session ID.
+
+    Flashes usually live for a single redirect, so stores keep them for at
+    most `ttl` seconds and the ID is forgotten once they have been shown.
+    """
+
+    def __init__(self, ttl: int = 3600):
+        self.ttl = ttl
+
+    async def load(self, session_id: str) -> List[Flash]:
+        raise NotImplementedError
+
+    async def save(self, session_id: str, flashes: List[Flash]) -> None:
+        raise NotImplementedError
+
+    async def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryFlashStore(FlashStore):
+    """Per-process LRU; fine for a single worker."""
+
+    def __init__(self, ttl: int = 3600, max_sessions: int = 10000):
+        super().__init__(ttl)
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def load(self, session_id: str) -> List[Flash]:
+        entry = self._sessions.get(session_id)
+        if entry is None or entry[0] < time.monotonic():
+            return []
+        return list(entry[1])
+
+    async def save(self, session_id: str, flashes: List[Flash]) -> None:
+        self._sessions[session_id] = (time.monotonic() + self.ttl, list(flashes))
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    async def delete(self, session_id: str) -> None:
+        self._sessions.pop(session_id, None)
+
+
+class SQLiteFlashStore(FlashStore):
+    """Table in a SQLite file, shared by every worker on the host."""
+
+    def __init__(self, db_path: str, ttl: int = 3600):
+        super().__init__(ttl)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA busy_timeout = 5000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS flash_sessions "
+            "(session_id TEXT PRIMARY KEY, flashes TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def _execute(self, query: str, params=()) -> Optional[tuple]:
+        with self._lock:
+            return self._conn.execute(query, params).fetchone()
+
+    async def load(self, session_id: str) -> List[Flash]:
+        row = await asyncio.to_thread(
+            self._execute,
+            "SELECT flashes FROM flash_sessions WHERE session_id = ? AND expires_at >= ?",
+            (session_id, time.time()),
+        )
+        return json.loads(row[0]) if row else []
+
+    async def save(self, session_id: str, flashes: List[Flash]) -> None:
+        def save():
+            now = time.time()
+            with self._lock:
+                self._conn.execute("DELETE FROM flash_sessions WHERE expires_at < ?", (now,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO flash_sessions (session_id, flashes, expires_at) VALUES (?, ?, ?)",
+                    (session_id, json.dumps(flashes), now + self.ttl),
+                )
+
+        await asyncio.to_thread(save)
+
+    async def delete(self, session_id: str) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM flash_sessions WHERE session_id = ?", (session_id,))
+
+    async def close(self) -> None:
+        self._conn.close()
+
+
+class RedisFlashStore(FlashStore):
+    """One expiring key per session, shared by every worker."""
+
+    KEY_PREFIX = "flash:"
+
+    def __init__(self, redis_url: str, ttl: int = 3600):
+        import redis.asyncio as redis
+
+        super().__init__(ttl)
+        self.redis = redis.Redis.from_url(redis_url)
+
+    async def load(self, session_id: str) -> List[Flash]:
+        value = await self.redis.get(self.KEY_PREFIX + session_id)
+        return json.loads(value) if value else []
+
+    async def save(self, session_id: str, flashes: List[Flash]) -> None:
+        await self.redis.set(self.KEY_PREFIX + session_id, json.dumps(flashes), ex=self.ttl)
+
+    async def delete(self, session_id: str) -> None:
+        await self.redis.delete(self.KEY_PREFIX + session_id)
+
+    async def close(self) -> None:
+        await self.redis.aclose()
+
+
+class PostgresFlashStore(FlashStore):
+    """Table in the PostgreSQL database, shared by every worker."""
+
+    def __init__(self, database_url: str, ttl: int = 3600):
+        from psycopg_pool import AsyncConnectionPool
+
+        super().__init__(ttl)
+        # Opened on first use, inside the event loop
+        self.pool = AsyncConnectionPool(database_url, min_size=1, max_size=4, open=False,
+                                        kwargs={"autocommit": True})
+        self._ready = False
+        self._opening = asyncio.Lock()
+
+    async def _open(self) -> None:
+        import psycopg
+
+        async with self._opening:
+            if self._ready:
+                return
+            await self.pool.open()
+            async with self.pool.connection() as conn:
+                try:
+                    await conn.execute(
+                        "CREATE TABLE IF NOT EXISTS flash_sessions "
+                        "(session_id TEXT PRIMARY KEY, flashes TEXT NOT NULL, expires_at DOUBLE PRECISION NOT NULL)"
+                    )
+                except psycopg.errors.UniqueViolation:
+                    pass  # Another worker created it at the same moment
+            self._ready = True
+
+    async def _execute(self, query: str, params=()) -> Optional[tuple]:
+        if not self._ready:
+            await self._open()
+        async with self.pool.connection() as conn:
+            cursor = await conn.execute(query, params)
+            return await cursor.fetchone() if cursor.description else None
+
+    async def load(self, session_id: str) -> List[Flash]:
+        row = await self._execute(
+            "SELECT flashes FROM flash_sessions WHERE session_id = %s AND expires_at >= %s",
+            (session_id, time.time()),
+        )
+        return json.loads(row[0]) if row else []
+
+    async def save(self, session_id: str, flashes: List[Flash]) -> None:
+        now = time.time()
+        await self._execute("DELETE FROM flash_sessions WHERE expires_at < %s", (now,))
+        await self._execute(
+            "INSERT INTO flash_sessions (session_id, flashes, expires_at) VALUES (%s, %s, %s) "
+            "ON CONFLICT (session_id) DO UPDATE SET flashes = EXCLUDED.flashes, expires_at = EXCLUDED.expires_at",
+            (session_id, json.dumps(flashes), now + self.ttl),
+        )
+
+    async def delete(self, session_id: str) -> None:
+        await self._execute("DELETE FROM flash_sessions WHERE session_id = %s", (session_id,))
+
+    async def close(self) -> None:
+        await self.pool.close()
+
+
+def create_flash_store() -> FlashStore:
+    """
+    Build the store selected by FLASH_STORE: memory, sqlite, postgres or redis.
+
+    It defaults to the database backend's own storage, so flashes survive
+    being redirected to another worker. `memory` must be asked for.
+    """
+    backend = os.environ.get("DB_BACKEND", "sqlite").lower()
+    if backend == "redis" and not os.environ.get("REDIS_URL"):
+        backend = "sqlite"  # As the database factory falls back
+    kind = os.environ.get("FLASH_STORE", backend).lower()
+    if kind == "memory":
+        return MemoryFlashStore()
+    if kind == "redis":
+        redis_url = os.environ.get("REDIS_URL")
+        if not redis_url:
+            raise EnvironmentError("FLASH_STORE=redis requires REDIS_URL")
+        return RedisFlashStore(redis_url)
+    if kind == "postgres":
+        database_url = os.environ.get("DATABASE_URL")
+        if not database_url:
+            raise EnvironmentError("FLASH_STORE=postgres requires DATABASE_URL")
+        return PostgresFlashStore(database_url)
+    db_path = os.environ.get("SQLITE_DB_PATH") or os.environ.get("DATABASE_PATH", "dinner_planner.db")
+    return SQLiteFlashStore(db_path)
+
+
+class FlashState:
+    """The flashes pending for one request, loaded by FlashMiddleware."""
+
+    def __init__(self, session_id: Optional[str], flashes: List[Flash]):
+        self.session_id = session_id
+        self.flashes = flashes
+        # A cookie pointing at nothing (expired or evicted) is cleared too
+        self.changed = session_id is not None and not flashes
+
+    def add(self, category: str, message: str) -> None:
+        self.flashes.append({"category": category, "message": message})
+        self.changed = True
+
+    def pop(self) -> List[Flash]:
+        flashes, self.flashes = self.flashes, []
+        if flashes:
+            self.changed = True
+        return flashes
+
+
+class FlashMiddleware:
+    """
+    Keeps flash messages in a FlashStore instead of a signed session cookie.
+
+    The cookie (a signed, random session ID) only exists while flashes are
+    pending. It is set when the first flash is added and cleared once they
+    have been shown. Every other request carries no cookie, does no store
+    lookup and gets no Set-Cookie, so its response can be cached.
+    """
+
+    def __init__(self, app, store: FlashStore, secret_key: str,
+                 cookie_name: str = "flash", https_only: bool = False):
+        self.app = app
+        self.store = store
+        self.signer = Signer(secret_key, salt="flash")
+        self.cookie_name = cookie_name
+        self.security_flags = "httponly; samesite=lax" + ("; secure" if https_only else "")
+
+    def _session_id(self, cookie: Optional[str]) -> Optional[str]:
+        if not cookie:
+            return None
+        try:
+            return self.signer.unsign(cookie).decode("utf-8")
+        except BadSignature:
+            return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cookie = HTTPConnection(scope).cookies.get(self.cookie_name)
+        session_id = self._session_id(cookie)
+        flashes = await self.store.load(session_id) if session_id else []
+        state = FlashState(session_id, flashes)
+        if cookie and session_id is None:
+            state.changed = True
+        scope["flash"] = state
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and state.changed:
+                headers = MutableHeaders(scope=message)
+                if state.flashes:
+                    if state.session_id is None:
+                        state.session_id = secrets.token_urlsafe(16)
+                        value = self.signer.sign(state.session_id).decode("utf-8")
+                        headers.append(
+                            "Set-Cookie",
+                            f"{self.cookie_name}={value}; path=/; Max-Age={self.store.ttl}; {self.security_flags}",
+                        )
+                    await self.store.save(state.session_id, state.flashes)
+                else:
+                    if state.session_id is not None:
+                        await self.store.delete(state.session_id)
+                    headers.append(
+                        "Set-Cookie",
+                        f"{self.cookie_name}=; path=/; Max-Age=0; {self.security_flags}",
+                    )
+                # The response shows or sets one visitor's messages
+                headers["Cache-Control"] = "no-store"
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,125 @@
+import asyncio
+import json
+from contextlib import contextmanager
+from typing import AsyncIterator, Dict, Iterator, List, Set
+
+from database.changes import DishChange
+from database.read_routing import pin_reads_to_primary
+
+# Tells a page it may have missed changes and should reload itself
+RELOAD = b"event: reload\ndata: {}\n\n"
+KEEP_ALIVE = b": keep-alive\n\n"
+
+
+def sse_message(event: str, data) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode("utf-8")
+
+
+class LiveUpdates:
+    """
+    Fans dish changes out to the Server-Sent Events streams of the event
+    pages watching them.
+
+    One task per worker reads the backend's change source. Each change is
+    turned into a message once, fetching the dish once if the source did
+    not carry it and anyone is watching its event. The message is then
+    queued for every stream of that event, so an idle connection costs one
+    small queue and one suspended coroutine, with no timer of its own: a
+    second task queues a keep-alive comment on every stream every
+    `keep_alive` seconds. A stream that falls `queue_size` messages behind
+    is told to reload instead.
+    """
+
+    def __init__(self, db, queue_size: int = 64, keep_alive: float = 15.0, retry_seconds: float = 1.0):
+        self.db = db
+        self.queue_size = queue_size
+        self.keep_alive = keep_alive
+        self.retry_seconds = retry_seconds
+        self._watchers: Dict[int, Set[asyncio.Queue]] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._run()), asyncio.create_task(self._keep_alive())]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _keep_alive(self) -> None:
+        while True:
+            await asyncio.sleep(self.keep_alive)
+            self._send_all(KEEP_ALIVE)
+
+    async def _run(self) -> None:
+        # The change is committed on the primary; a replica may not have it yet
+        pin_reads_to_primary()
+        while True:
+            try:
+                async for change in self.db.change_source().listen():
+                    if change is None:
+                        self._send_all(RELOAD)
+                    else:
+                        await self._deliver(change)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Live updates stopped: {e!r}; restarting")
+                await asyncio.sleep(self.retry_seconds)
+
+    async def _deliver(self, change: DishChange) -> None:
+        if not self._watchers.get(change.event_id):
+            return
+        if change.op == "reload":
+            # Too many dishes changed (a bulk import) to send one by one
+            message = RELOAD
+        elif change.op == "delete":
+            message = sse_message("dish", {"op": "delete", "dish_id": change.dish_id})
+        else:
+            dish = change.dish or await self.db.get_dish_by_id(change.dish_id)
+            if dish is None:
+                # Deleted since; its own delete notification follows
+                return
+            message = sse_message("dish", {"op": change.op, "dish": dish})
+        for queue in self._watchers.get(change.event_id, ()):
+            self._send(queue, message)
+
+    def _send_all(self, message: bytes) -> None:
+        for watchers in self._watchers.values():
+            for queue in watchers:
+                self._send(queue, message)
+
+    @staticmethod
+    def _send(queue: asyncio.Queue, message: bytes) -> None:
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Too far behind to catch up message by message
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(RELOAD)
+
+    @contextmanager
+    def _watch(self, event_id: int) -> Iterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._watchers.setdefault(event_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            watchers = self._watchers[event_id]
+            watchers.discard(queue)
+            if not watchers:
+                del self._watchers[event_id]
+
+    @property
+    def connections(self) -> int:
+        return sum(len(watchers) for watchers in self._watchers.values())
+
+    async def stream(self, event_id: int) -> AsyncIterator[bytes]:
+        """The SSE body for one event page: dish changes, with keep-alive comments between."""
+        with self._watch(event_id) as queue:
+            # Reconnect after 3 s if the connection drops
+            yield b"retry: 3000\n\n"
+            while True:
+                yield await queue.get()
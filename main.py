@@ -1,15 +1,28 @@
+import functools
 import os
 import secrets
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Optional
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, Form, Request
-from fastapi.responses import RedirectResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Form, HTTPException, Request
+from fastapi.responses import JSONResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from starlette.middleware.sessions import SessionMiddleware
 
-from database import get_db
+from assets import AssetFiles, install_template_helpers
+from bulk_io import FIELDS, MEDIA_TYPES, BulkImportError, aexport_chunks, aimport_stream
+from database import get_async_db
+from database.read_routing import get_read_urls, pin_reads_to_primary
+from flash_store import FlashMiddleware, create_flash_store
+from live_updates import LiveUpdates
+from metrics import MEDIA_TYPE as METRICS_MEDIA_TYPE, MetricsMiddleware, metrics_enabled, record_db_call, render_metrics
+from page_cache import PageCache, etag_matches
+from profiling import ProfilingMiddleware
+from query_budget import QueryBudgetMiddleware, create_query_log, query_budget
+from read_your_writes import PrimaryPinMiddleware
+from templating import create_environment, warm_up
 
 load_dotenv()
 
@@ -50,23 +63,61 @@ def get_session_secret_key() -> str:
     return generated
 
 
-app = FastAPI(title="Family Dinner Planner")
-app.add_middleware(SessionMiddleware, secret_key=get_session_secret_key())
-app.mount("/static", StaticFiles(directory="static"), name="static")
-templates = Jinja2Templates(directory="templates")
-db = get_db()
+query_log = create_query_log()
+db = get_async_db(call_recorders=[query_log.record] + ([record_db_call] if metrics_enabled() else []))
+flash_store = create_flash_store()
+live_updates = LiveUpdates(db) if os.environ.get("LIVE_UPDATES", "true").lower() == "true" else None
+
+# Milliseconds spent in each startup step, reported by benchmarks/profile_startup.py
+startup_timings: dict = {}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    await db.initialize()
+    startup_timings["database.initialize"] = (time.perf_counter() - started) * 1000
+    startup_timings["templates.warm_up"] = warm_up(templates.env)
+    print("Startup: " + ", ".join(f"{step} {ms:.1f} ms" for step, ms in startup_timings.items()))
+    if live_updates is not None:
+        live_updates.start()
+    yield
+    if live_updates is not None:
+        await live_updates.stop()
+    await flash_store.close()
+    await db.close()
+
+
+app = FastAPI(title="Family Dinner Planner", lifespan=lifespan)
+app.add_middleware(FlashMiddleware, store=flash_store, secret_key=get_session_secret_key())
+if get_read_urls():
+    app.add_middleware(PrimaryPinMiddleware, pin_seconds=float(os.environ.get("PRIMARY_PIN_SECONDS", "5")))
+app.add_middleware(QueryBudgetMiddleware, log=query_log)
+if os.environ.get("PROFILE_TOKEN"):
+    app.add_middleware(
+        ProfilingMiddleware,
+        token=os.environ["PROFILE_TOKEN"],
+        directory=os.environ.get("PROFILE_DIR", "profiles"),
+        interval=float(os.environ.get("PROFILE_INTERVAL_MS", "5")) / 1000,
+        top_allocations=int(os.environ.get("PROFILE_TOP_ALLOCATIONS", "25")),
+    )
+# Last added is outermost: times the whole request, other middleware included
+if metrics_enabled():
+    app.add_middleware(MetricsMiddleware)
+# Built by `python assets.py build DIR`; plain static/ in development
+static_files = AssetFiles(directory=os.environ.get("STATIC_BUILD_DIR") or "static")
+app.mount("/static", static_files, name="static")
+templates = Jinja2Templates(env=create_environment())
+install_template_helpers(templates.env, static_files)
+page_cache = PageCache(int(os.environ.get("PAGE_CACHE_SIZE", "256")))
 
 
 def add_flash(request: Request, category: str, message: str) -> None:
-    flashes = request.session.get("flashes", [])
-    flashes.append({"category": category, "message": message})
-    request.session["flashes"] = flashes
+    request.scope["flash"].add(category, message)
 
 
 def pop_flashes(request: Request):
-    flashes = request.session.get("flashes", [])
-    request.session["flashes"] = []
-    return flashes
+    return request.scope["flash"].pop()
 
 
 def render(request: Request, template_name: str, **context):
@@ -80,87 +131,139 @@ def render(request: Request, template_name: str, **context):
     return templates.TemplateResponse(template_name, context)
 
 
-@app.get("/")
-def home(request: Request):
-    upcoming_events = db.get_upcoming_events(limit=2)
-
-    for event in upcoming_events:
-        event_id = event["id"]
-        dishes = db.get_dishes_for_event(event_id)
-        event["dishes"] = dishes
+def cached_page(handler):
+    """Serve a GET handler's page from page_cache, answering If-None-Match with 304."""
+
+    @functools.wraps(handler)
+    async def wrapper(**kwargs):
+        request = kwargs["request"]
+        # Pending flashes make the page specific to this visitor
+        if not page_cache.enabled or request.scope["flash"].flashes or request.scope.get("profiling"):
+            return await handler(**kwargs)
+
+        # Shared by all workers and read from the primary, so a write anywhere
+        # invalidates the page here at once. Pages also depend on the clock
+        # (upcoming vs past), hence the minute.
+        key = (str(request.url), await db.get_data_version(), datetime.now().strftime("%Y%m%d%H%M"))
+        page = page_cache.get(key)
+        if page is None:
+            # A lagging replica would store old data under the new version, so
+            # pages that get cached are built from the primary
+            pin_reads_to_primary()
+            response = await handler(**kwargs)
+            if response.status_code != 200:
+                return response
+            page = page_cache.set(key, response.body, response.media_type)
+
+        headers = {"ETag": page.etag, "Cache-Control": "no-cache", "Vary": "Cookie"}
+        if etag_matches(request.headers.get("if-none-match"), page.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(page.body, media_type=page.media_type, headers=headers)
+
+    return wrapper
+
+
+def page_links(request: Request, section: str, page: dict) -> dict:
+    # Only this section's cursor changes; the other list keeps its position
+    url = request.url.remove_query_params([f"{section}_after", f"{section}_before"])
+    links = {"next": None, "prev": None}
+    if page["next_cursor"]:
+        links["next"] = str(url.include_query_params(**{f"{section}_after": page["next_cursor"]}))
+    if page["prev_cursor"]:
+        links["prev"] = str(url.include_query_params(**{f"{section}_before": page["prev_cursor"]}))
+    return links
+
+
+async def get_events_page(upcoming: bool, after: Optional[str], before: Optional[str]):
+    try:
+        return await db.get_events_page(upcoming, after=after, before=before)
+    except ValueError:
+        # Malformed cursor: start over at the first page
+        return await db.get_events_page(upcoming)
 
-        category_counts = {}
-        for dish in dishes:
-            category_name = dish["category_name"]
-            category_counts[category_name] = category_counts.get(category_name, 0) + 1
 
-        event["category_counts"] = category_counts
+@app.get("/")
+@query_budget(3)
+@cached_page
+async def home(request: Request):
+    upcoming_events = await db.get_upcoming_events(limit=2)
+    upcoming_events = await db.get_events_with_dishes([event["id"] for event in upcoming_events])
 
     return render(request, "home.html", upcoming_events=upcoming_events)
 
 
 @app.get("/events")
-def event_list(request: Request):
-    now = datetime.now()
-    all_events = db.get_events()
-
-    upcoming_events = []
-    past_events = []
-
-    for event in all_events:
-        event_date = datetime.strptime(event["date"], "%Y-%m-%d %H:%M")
-        if event_date >= now:
-            upcoming_events.append(event)
-        else:
-            past_events.append(event)
-
-    upcoming_events = sorted(upcoming_events, key=lambda x: x["date"])
-    past_events = sorted(past_events, key=lambda x: x["date"], reverse=True)
-    sorted_events = upcoming_events + past_events
+@query_budget(6, repeated=["get_events_page"])
+@cached_page
+async def event_list(
+    request: Request,
+    upcoming_after: Optional[str] = None,
+    upcoming_before: Optional[str] = None,
+    past_after: Optional[str] = None,
+    past_before: Optional[str] = None,
+):
+    counts = await db.count_events()
+    upcoming = await get_events_page(True, upcoming_after, upcoming_before)
+    past = await get_events_page(False, past_after, past_before)
 
     return render(
         request,
         "events.html",
-        events=sorted_events,
-        upcoming_count=len(upcoming_events),
-        past_count=len(past_events),
+        upcoming_events=upcoming["events"],
+        past_events=past["events"],
+        upcoming_count=counts["upcoming"],
+        past_count=counts["past"],
+        upcoming_links=page_links(request, "upcoming", upcoming),
+        past_links=page_links(request, "past", past),
     )
 
 
 @app.get("/events/id/{event_id}")
-def event_detail(request: Request, event_id: int):
-    event = db.get_event_by_id(event_id)
-    if event is None:
+@query_budget(2)
+@cached_page
+async def event_detail(request: Request, event_id: int):
+    bundle = await db.get_event_bundle(event_id)
+    if bundle is None:
         add_flash(request, "danger", "Event not found")
         return RedirectResponse(url=request.url_for("event_list"), status_code=303)
 
+    event = bundle["event"]
     event_date = datetime.strptime(event["date"], "%Y-%m-%d %H:%M")
-    dishes = db.get_dishes_for_event(event_id)
-    categories = db.get_dish_categories()
-
-    category_counts = {}
-    for dish in dishes:
-        category_id = dish["category_id"]
-        category_counts[category_id] = category_counts.get(category_id, 0) + 1
 
     return render(
         request,
         "event_detail.html",
         event=event,
         event_date=event_date,
-        dishes=dishes,
-        categories=categories,
-        category_counts=category_counts,
+        dishes=bundle["dishes"],
+        categories=bundle["categories"],
+        category_counts=bundle["category_counts"],
+        live_updates=live_updates is not None,
+    )
+
+
+@app.get("/events/id/{event_id}/live")
+@query_budget(0)
+async def event_live(event_id: int):
+    if live_updates is None:
+        raise HTTPException(status_code=404)
+    return StreamingResponse(
+        live_updates.stream(event_id),
+        media_type="text/event-stream",
+        # No caching, and no buffering by reverse proxies such as nginx
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @app.get("/events/add")
-def event_add_form(request: Request):
+@query_budget(0)
+async def event_add_form(request: Request):
     return render(request, "event_form.html")
 
 
 @app.post("/events/add")
-def event_add(
+@query_budget(1)
+async def event_add(
     request: Request,
     title: str | None = Form(default=None),
     date: str | None = Form(default=None),
@@ -172,15 +275,16 @@ def event_add(
         return render(request, "event_form.html")
 
     date = date.replace("T", " ")
-    event = db.add_event(title, date, location, description)
+    event = await db.add_event(title, date, location, description)
 
     add_flash(request, "success", "Event created successfully!")
     return RedirectResponse(url=request.url_for("event_detail", event_id=str(event["id"])), status_code=303)
 
 
 @app.get("/events/id/{event_id}/edit")
-def event_edit_form(request: Request, event_id: int):
-    event = db.get_event_by_id(event_id)
+@query_budget(1)
+async def event_edit_form(request: Request, event_id: int):
+    event = await db.get_event_by_id(event_id)
     if event is None:
         add_flash(request, "danger", "Event not found")
         return RedirectResponse(url=request.url_for("event_list"), status_code=303)
@@ -189,7 +293,8 @@ def event_edit_form(request: Request, event_id: int):
 
 
 @app.post("/events/id/{event_id}/edit")
-def event_edit(
+@query_budget(2)
+async def event_edit(
     request: Request,
     event_id: int,
     title: str | None = Form(default=None),
@@ -197,7 +302,7 @@ def event_edit(
     location: str | None = Form(default=None),
     description: str = Form(default=""),
 ):
-    event = db.get_event_by_id(event_id)
+    event = await db.get_event_by_id(event_id)
     if event is None:
         add_flash(request, "danger", "Event not found")
         return RedirectResponse(url=request.url_for("event_list"), status_code=303)
@@ -207,7 +312,7 @@ def event_edit(
         return render(request, "event_form.html", event=event)
 
     date = date.replace("T", " ")
-    updated_event = db.update_event(event_id, title, date, location, description)
+    updated_event = await db.update_event(event_id, title, date, location, description)
     if updated_event:
         add_flash(request, "success", "Event updated successfully!")
         return RedirectResponse(url=request.url_for("event_detail", event_id=str(event_id)), status_code=303)
@@ -217,8 +322,9 @@ def event_edit(
 
 
 @app.get("/events/id/{event_id}/delete")
-def event_delete_form(request: Request, event_id: int):
-    event = db.get_event_by_id(event_id)
+@query_budget(1)
+async def event_delete_form(request: Request, event_id: int):
+    event = await db.get_event_by_id(event_id)
     if event is None:
         add_flash(request, "danger", "Event not found")
         return RedirectResponse(url=request.url_for("event_list"), status_code=303)
@@ -227,13 +333,14 @@ def event_delete_form(request: Request, event_id: int):
 
 
 @app.post("/events/id/{event_id}/delete")
-def event_delete(request: Request, event_id: int):
-    event = db.get_event_by_id(event_id)
+@query_budget(2)
+async def event_delete(request: Request, event_id: int):
+    event = await db.get_event_by_id(event_id)
     if event is None:
         add_flash(request, "danger", "Event not found")
         return RedirectResponse(url=request.url_for("event_list"), status_code=303)
 
-    success = db.delete_event(event_id)
+    success = await db.delete_event(event_id)
     if success:
         add_flash(request, "success", "Event deleted successfully!")
     else:
@@ -243,18 +350,20 @@ def event_delete(request: Request, event_id: int):
 
 
 @app.get("/events/id/{event_id}/dishes/add")
-def dish_add_form(request: Request, event_id: int):
-    event = db.get_event_by_id(event_id)
+@query_budget(2)
+async def dish_add_form(request: Request, event_id: int):
+    event = await db.get_event_by_id(event_id)
     if event is None:
         add_flash(request, "danger", "Event not found")
         return RedirectResponse(url=request.url_for("event_list"), status_code=303)
 
-    categories = db.get_dish_categories()
+    categories = await db.get_dish_categories()
     return render(request, "dish_form.html", event=event, categories=categories)
 
 
 @app.post("/events/id/{event_id}/dishes/add")
-def dish_add(
+@query_budget(3)
+async def dish_add(
     request: Request,
     event_id: int,
     name: str | None = Form(default=None),
@@ -263,12 +372,12 @@ def dish_add(
     description: str = Form(default=""),
     serves: str = Form(default="0"),
 ):
-    event = db.get_event_by_id(event_id)
+    event = await db.get_event_by_id(event_id)
     if event is None:
         add_flash(request, "danger", "Event not found")
         return RedirectResponse(url=request.url_for("event_list"), status_code=303)
 
-    categories = db.get_dish_categories()
+    categories = await db.get_dish_categories()
 
     if not name or not category_id or not person_name:
         add_flash(request, "danger", "Please fill in all required fields")
@@ -282,7 +391,7 @@ def dish_add(
         return render(request, "dish_form.html", event=event, categories=categories)
 
     try:
-        db.add_dish(event_id, name, category_id_int, person_name, description, serves_int)
+        await db.add_dish(event_id, name, category_id_int, person_name, description, serves_int)
         add_flash(request, "success", "Dish added successfully!")
         return RedirectResponse(url=request.url_for("event_detail", event_id=str(event_id)), status_code=303)
     except ValueError as exc:
@@ -291,24 +400,26 @@ def dish_add(
 
 
 @app.get("/dishes/{dish_id}/edit")
-def dish_edit_form(request: Request, dish_id: int):
-    dish = db.get_dish_by_id(dish_id)
+@query_budget(3)
+async def dish_edit_form(request: Request, dish_id: int):
+    dish = await db.get_dish_by_id(dish_id)
     if dish is None:
         add_flash(request, "danger", "Dish not found")
         return RedirectResponse(url=request.url_for("event_list"), status_code=303)
 
     event_id = dish["event_id"]
-    event = db.get_event_by_id(event_id)
+    event = await db.get_event_by_id(event_id)
     if event is None:
         add_flash(request, "danger", "Event not found")
         return RedirectResponse(url=request.url_for("event_list"), status_code=303)
 
-    categories = db.get_dish_categories()
+    categories = await db.get_dish_categories()
     return render(request, "dish_form.html", event=event, dish=dish, categories=categories)
 
 
 @app.post("/dishes/{dish_id}/edit")
-def dish_edit(
+@query_budget(4)
+async def dish_edit(
     request: Request,
     dish_id: int,
     name: str | None = Form(default=None),
@@ -317,18 +428,18 @@ def dish_edit(
     description: str = Form(default=""),
     serves: str = Form(default="0"),
 ):
-    dish = db.get_dish_by_id(dish_id)
+    dish = await db.get_dish_by_id(dish_id)
     if dish is None:
         add_flash(request, "danger", "Dish not found")
         return RedirectResponse(url=request.url_for("event_list"), status_code=303)
 
     event_id = dish["event_id"]
-    event = db.get_event_by_id(event_id)
+    event = await db.get_event_by_id(event_id)
     if event is None:
         add_flash(request, "danger", "Event not found")
         return RedirectResponse(url=request.url_for("event_list"), status_code=303)
 
-    categories = db.get_dish_categories()
+    categories = await db.get_dish_categories()
 
     if not name or not category_id or not person_name:
         add_flash(request, "danger", "Please fill in all required fields")
@@ -342,7 +453,7 @@ def dish_edit(
         return render(request, "dish_form.html", event=event, dish=dish, categories=categories)
 
     try:
-        updated_dish = db.update_dish(dish_id, name, category_id_int, person_name, description, serves_int)
+        updated_dish = await db.update_dish(dish_id, name, category_id_int, person_name, description, serves_int)
         if updated_dish:
             add_flash(request, "success", "Dish updated successfully!")
             return RedirectResponse(url=request.url_for("event_detail", event_id=str(event_id)), status_code=303)
@@ -355,14 +466,15 @@ def dish_edit(
 
 
 @app.get("/dishes/{dish_id}/delete")
-def dish_delete_form(request: Request, dish_id: int):
-    dish = db.get_dish_by_id(dish_id)
+@query_budget(2)
+async def dish_delete_form(request: Request, dish_id: int):
+    dish = await db.get_dish_by_id(dish_id)
     if dish is None:
         add_flash(request, "danger", "Dish not found")
         return RedirectResponse(url=request.url_for("event_list"), status_code=303)
 
     event_id = dish["event_id"]
-    event = db.get_event_by_id(event_id)
+    event = await db.get_event_by_id(event_id)
     if event is None:
         add_flash(request, "danger", "Event not found")
         return RedirectResponse(url=request.url_for("event_list"), status_code=303)
@@ -371,19 +483,20 @@ def dish_delete_form(request: Request, dish_id: int):
 
 
 @app.post("/dishes/{dish_id}/delete")
-def dish_delete(request: Request, dish_id: int):
-    dish = db.get_dish_by_id(dish_id)
+@query_budget(3)
+async def dish_delete(request: Request, dish_id: int):
+    dish = await db.get_dish_by_id(dish_id)
     if dish is None:
         add_flash(request, "danger", "Dish not found")
         return RedirectResponse(url=request.url_for("event_list"), status_code=303)
 
     event_id = dish["event_id"]
-    event = db.get_event_by_id(event_id)
+    event = await db.get_event_by_id(event_id)
     if event is None:
         add_flash(request, "danger", "Event not found")
         return RedirectResponse(url=request.url_for("event_list"), status_code=303)
 
-    success = db.delete_dish(dish_id)
+    success = await db.delete_dish(dish_id)
     if success:
         add_flash(request, "success", "Dish deleted successfully!")
     else:
@@ -392,6 +505,90 @@ def dish_delete(request: Request, dish_id: int):
     return RedirectResponse(url=request.url_for("event_detail", event_id=str(event_id)), status_code=303)
 
 
+def bulk_format(kind: str, format: Optional[str], content_type: str = "") -> str:
+    if kind not in FIELDS:
+        raise HTTPException(status_code=404)
+    if format is None:
+        format = "csv" if content_type.startswith("text/csv") else "ndjson"
+    if format not in MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="format must be ndjson or csv")
+    return format
+
+
+# Imports keep the IDs they are given, so both routes need the admin token;
+# without one they don't exist and only `python bulk_io.py` moves data
+bulk_token = os.environ.get("BULK_TOKEN")
+import_max_bytes = int(os.environ.get("IMPORT_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+class BodyTooLarge(Exception):
+    pass
+
+
+async def limited_stream(request: Request, max_bytes: int):
+    """The request body in chunks, raising BodyTooLarge once it exceeds max_bytes."""
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise BodyTooLarge
+        yield chunk
+
+
+def check_bulk_token(request: Request) -> None:
+    offered = request.headers.get("x-bulk-token", "")
+    if not (offered and secrets.compare_digest(offered.encode(), bulk_token.encode())):
+        raise HTTPException(status_code=403)
+
+
+if bulk_token:
+    @app.get("/export/{kind}")
+    @query_budget(repeated=["get_events_after", "get_dishes_after"])
+    async def export_rows(request: Request, kind: str, format: Optional[str] = None):
+        check_bulk_token(request)
+        format = bulk_format(kind, format)
+        return StreamingResponse(
+            aexport_chunks(db, kind, format),
+            media_type=MEDIA_TYPES[format],
+            headers={"Content-Disposition": f'attachment; filename="{kind}.{format}"'},
+        )
+
+    @app.post("/import/{kind}")
+    @query_budget(repeated=["bulk_add_events", "bulk_add_dishes"])
+    async def import_rows(request: Request, kind: str, format: Optional[str] = None):
+        check_bulk_token(request)
+        format = bulk_format(kind, format, request.headers.get("content-type", ""))
+        too_large = JSONResponse({"error": f"the body exceeds {import_max_bytes} bytes"}, status_code=413)
+        if int(request.headers.get("content-length") or 0) > import_max_bytes:
+            return too_large
+        try:
+            imported = await aimport_stream(db, kind, format, limited_stream(request, import_max_bytes))
+        except BulkImportError as exc:
+            return JSONResponse({"error": str(exc), "imported": exc.imported}, status_code=400)
+        except BodyTooLarge:
+            # A chunked body without Content-Length; the batches before it are kept
+            return too_large
+        return {"imported": imported}
+
+
+@app.get("/health")
+async def health():
+    payload = {"status": "ok"}
+    pool_stats = getattr(db, "pool_stats", None)
+    if pool_stats is not None:
+        payload["pool"] = pool_stats()
+    if live_updates is not None:
+        payload["live_connections"] = live_updates.connections
+    return payload
+
+
+if metrics_enabled():
+    @app.get("/metrics")
+    async def metrics():
+        pool_stats = getattr(db, "pool_stats", None)
+        return Response(render_metrics(pool_stats() if pool_stats else None), media_type=METRICS_MEDIA_TYPE)
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,250 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Prometheus text exposition format
+MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; pages are usually a few milliseconds, so most buckets sit low
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# psycopg pool statistics that go up and down; the rest are running totals
+POOL_GAUGES = {"pool_min", "pool_max", "pool_size", "pool_available", "requests_waiting", "connections_checked_out"}
+
+Labels = Tuple[str, ...]
+
+
+def metrics_enabled() -> bool:
+    """METRICS_ENABLED (default true): time requests and DB calls, serve /metrics."""
+    return os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Labels) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    """A named family of series, one per combination of label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    def expose(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def expose(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_label_text(self.label_names, labels)} {_number(value)}" for labels, value in values
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1) -> None:
+        self.inc(labels, -amount)
+
+
+class Histogram(Metric):
+    """
+    Latency histogram with fixed buckets.
+
+    observe() only bumps one bucket, the sum and the count; the cumulative
+    bucket counts Prometheus expects are computed when scraped.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets)
+        # Per series: one count per bucket plus +Inf, then the sum
+        self._series: Dict[Labels, List[float]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def expose(self) -> List[str]:
+        with self._lock:
+            snapshot = [(labels, list(series)) for labels, series in self._series.items()]
+        lines = self.header()
+        bounds = [_number(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, series in snapshot:
+            label_text = _label_text(self.label_names, labels)
+            prefix = label_text[:-1] + "," if label_text else "{"
+            total = 0
+            for bound, count in zip(bounds, series):
+                total += count
+                lines.append(f'{self.name}_bucket{prefix}le="{bound}"}} {_number(total)}')
+            lines.append(f"{self.name}_sum{label_text} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{label_text} {_number(total)}")
+        return lines
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to handle a request, by route template.", ("method", "route"))
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "Requests handled, by route template and status code.", ("method", "route", "status"))
+HTTP_IN_PROGRESS = Gauge("http_requests_in_progress", "Requests being handled right now, streams excepted.")
+HTTP_STREAMS_OPEN = Gauge("http_streams_open", "Server-Sent Events streams open right now, by route template.", ("route",))
+DB_CALL_SECONDS = Histogram(
+    "db_call_duration_seconds", "Time spent in database calls, by backend and interface method.", ("backend", "method"))
+DB_CALL_ERRORS = Counter(
+    "db_call_errors_total", "Database calls that raised, other than rejected input.", ("backend", "method"))
+
+METRICS: List[Metric] = [
+    HTTP_REQUEST_SECONDS, HTTP_REQUESTS, HTTP_IN_PROGRESS, HTTP_STREAMS_OPEN, DB_CALL_SECONDS, DB_CALL_ERRORS,
+]
+
+
+def record_db_call(backend: str, method: str, seconds: float, failed: bool, params: Tuple = ()) -> None:
+    """Call recorder for the database factory (see database.timed_db)."""
+    DB_CALL_SECONDS.observe((backend, method), seconds)
+    if failed:
+        DB_CALL_ERRORS.inc((backend, method))
+
+
+def _pool_lines(pool_stats: Dict[str, Any]) -> List[str]:
+    """Expose connection pool statistics, as reported by pool_stats(), per pool."""
+    pools = [("primary", pool_stats)]
+    pools += [(f"replica{index}", stats) for index, stats in enumerate(pool_stats.get("replicas", []), 1)]
+
+    families: Dict[str, List[str]] = {}
+    for pool, stats in pools:
+        for key, value in stats.items():
+            if isinstance(value, (int, float)):
+                families.setdefault(key, []).append(f'{{pool="{pool}"}} {_number(value)}')
+
+    lines = []
+    for key, samples in families.items():
+        gauge = key in POOL_GAUGES
+        name = f"db_pool_{key}" if gauge else f"db_pool_{key}_total"
+        lines += [f"# HELP {name} Connection pool {key}.", f"# TYPE {name} {'gauge' if gauge else 'counter'}"]
+        lines += [name + sample for sample in samples]
+    return lines
+
+
+def render_metrics(pool_stats: Optional[Dict[str, Any]] = None) -> str:
+    """All metrics in the text exposition format, plus pool statistics if given."""
+    lines: List[str] = []
+    for metric in METRICS:
+        lines += metric.expose()
+    if pool_stats:
+        lines += _pool_lines(pool_stats)
+    return "\n".join(lines) + "\n"
+
+
+def route_template(scope, root_path: str) -> str:
+    """
+    The matched route's path template, e.g. /events/id/{event_id}, so each
+    route is one series however many IDs it is called with.
+
+    Mounted apps (static files) are labelled with their mount path;
+    anything else that matched no route is grouped under <unmatched>.
+    """
+    route = scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        return route.path
+    # The router extends root_path when it hands a request to a mount
+    mounted = scope.get("root_path", "")
+    if mounted != root_path and mounted.startswith(root_path):
+        return mounted[len(root_path):]
+    return "<unmatched>"
+
+
+def is_event_stream(message) -> bool:
+    """Whether an http.response.start message starts a Server-Sent Events stream."""
+    return any(name.lower() == b"content-type" and value.startswith(b"text/event-stream")
+               for name, value in message.get("headers", ()))
+
+
+class MetricsMiddleware:
+    """
+    Times every HTTP request and counts it by method, route template and
+    status. Requests whose handler raised are counted as 500s.
+
+    Server-Sent Events streams stay open for as long as a page is, so they
+    would swamp the latency histogram and the in-progress gauge. Once a
+    response turns out to be one, the request leaves both and is tracked in
+    http_streams_open instead; it is still counted in http_requests_total.
+
+    Add it last, so it is outermost and its timings include the other
+    middleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        root_path = scope.get("root_path", "")
+        status = 500
+        stream_route = None
+
+        async def send_wrapper(message):
+            nonlocal status, stream_route
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if is_event_stream(message):
+                    stream_route = route_template(scope, root_path)
+                    HTTP_IN_PROGRESS.dec()
+                    HTTP_STREAMS_OPEN.inc((stream_route,))
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = route_template(scope, root_path)
+            if stream_route is None:
+                HTTP_IN_PROGRESS.dec()
+                HTTP_REQUEST_SECONDS.observe((scope["method"], route), elapsed)
+            else:
+                HTTP_STREAMS_OPEN.dec((stream_route,))
+            HTTP_REQUESTS.inc((scope["method"], route, str(status)))
@@ -0,0 +1,293 @@
+"""
+Copy categories, events and dishes from one backend to another, keeping IDs.
+
+Rows are read with get_events_after() / get_dishes_after() and written with
+bulk_add_events() / bulk_add_dishes(), BULK_BATCH_SIZE rows at a time, so
+memory use stays flat however much data is moved. After every batch the last
+copied ID is saved to a checkpoint file; running the same command again
+resumes from there. A verification pass then compares row counts and
+checksums of both sides.
+
+Databases are given as URLs (see DatabaseFactory.create_from_url):
+
+    python migrate.py sqlite:///dinner_planner.db postgresql://localhost/dinner
+    python migrate.py --verify-only sqlite:///dinner_planner.db postgresql://localhost/dinner
+"""
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bulk_io import FIELDS, INTEGER_FIELDS, export_batches
+from database.db_interface import BULK_BATCH_SIZE
+
+# In the order they must be copied: dishes reference both of the others
+KINDS = ("categories", "events", "dishes")
+ROW_FIELDS = {"categories": ("id", "name"), **FIELDS}
+
+PROGRESS_INTERVAL = 2.0  # seconds between progress lines
+
+
+class MigrationError(Exception):
+    """The migration cannot start or continue as asked."""
+
+
+def load_checkpoint(path: str, source_url: str, target_url: str) -> Dict[str, Any]:
+    """
+    Read the checkpoint of an earlier run, or start a new one.
+
+    Raises:
+        MigrationError: If the checkpoint belongs to other databases
+    """
+    if not os.path.exists(path):
+        return {"source": source_url, "target": target_url, "categories": False, "events": 0, "dishes": 0}
+    with open(path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if (checkpoint["source"], checkpoint["target"]) != (source_url, target_url):
+        raise MigrationError(
+            f"{path} is a checkpoint of {checkpoint['source']} -> {checkpoint['target']}; "
+            "pass another --checkpoint or delete it"
+        )
+    return checkpoint
+
+
+def save_checkpoint(path: str, checkpoint: Dict[str, Any]) -> None:
+    """Write the checkpoint atomically, so a crash leaves the old or the new one."""
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(temporary, path)
+
+
+def last_id(db, kind: str, after_id: int, batch_size: int) -> int:
+    """The highest ID of a kind in db, scanning only past after_id."""
+    for rows in export_batches(db, kind, batch_size, after_id):
+        after_id = rows[-1]["id"]
+    return after_id
+
+
+class Progress:
+    """Prints rows copied and throughput for one kind, every PROGRESS_INTERVAL seconds."""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.rows = 0
+        self.started = time.perf_counter()
+        self._last_report = self.started
+
+    def add(self, rows: int) -> None:
+        self.rows += rows
+        now = time.perf_counter()
+        if now - self._last_report >= PROGRESS_INTERVAL:
+            self._last_report = now
+            self.report()
+
+    def report(self) -> None:
+        elapsed = time.perf_counter() - self.started
+        print(f"{self.kind}: {self.rows} rows in {elapsed:.1f} s ({self.rows / max(elapsed, 1e-9):.0f} rows/s)",
+              file=sys.stderr)
+
+
+class DishReferences:
+    """
+    The event and category IDs of a source database, to pick out orphan dishes.
+
+    SQLite databases created before foreign keys were enforced can hold
+    dishes whose event was deleted. A target enforcing foreign keys rejects
+    their whole batch, so they are left out of the copy (and out of the
+    source side of the verification) and reported instead.
+    """
+
+    def __init__(self, db, batch_size: int = BULK_BATCH_SIZE):
+        # IDs only: a set of ints stays small next to the rows themselves
+        self.event_ids = {int(row["id"]) for rows in export_batches(db, "events", batch_size) for row in rows}
+        self.category_ids = {int(category["id"]) for category in db.get_dish_categories()}
+        self.orphan_ids: List[int] = []
+
+    def keep(self, dishes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """The dishes whose event and category exist; the IDs of the others go to orphan_ids."""
+        kept = []
+        for dish in dishes:
+            if int(dish["event_id"]) in self.event_ids and int(dish["category_id"]) in self.category_ids:
+                kept.append(dish)
+            else:
+                self.orphan_ids.append(int(dish["id"]))
+        return kept
+
+    def report(self) -> None:
+        if self.orphan_ids:
+            shown = ", ".join(str(dish_id) for dish_id in self.orphan_ids[:20])
+            more = f" and {len(self.orphan_ids) - 20} more" if len(self.orphan_ids) > 20 else ""
+            print(f"dishes: skipped {len(self.orphan_ids)} orphan dishes whose event or category "
+                  f"no longer exists (IDs {shown}{more})", file=sys.stderr)
+
+
+def copy_rows(source, target, kind: str, checkpoint: Dict[str, Any], checkpoint_path: str,
+              batch_size: int, references: Optional[DishReferences] = None) -> int:
+    """
+    Copy every event or dish past the checkpoint, saving it after each batch.
+
+    The checkpoint holds the last ID copied, so orphan dishes after it (see
+    DishReferences) are looked at again, and skipped again, on a resume.
+
+    Returns:
+        The number of rows copied
+
+    Raises:
+        MigrationError: If the target lacks the last row the checkpoint says was copied
+    """
+    fetch = getattr(target, f"get_{kind}_after")
+    if checkpoint[kind] and [row["id"] for row in fetch(checkpoint[kind] - 1, 1)] != [checkpoint[kind]]:
+        raise MigrationError(f"the target does not have {kind} up to ID {checkpoint[kind]} as the checkpoint says")
+    # A batch may have been committed just before a crash, without its checkpoint
+    checkpoint[kind] = last_id(target, kind, checkpoint[kind], batch_size)
+    add_batch = getattr(target, f"bulk_add_{kind}")
+    progress = Progress(kind)
+    for rows in export_batches(source, kind, batch_size, checkpoint[kind]):
+        if references is not None:
+            rows = references.keep(rows)
+            if not rows:
+                continue
+        add_batch(rows)
+        checkpoint[kind] = rows[-1]["id"]
+        save_checkpoint(checkpoint_path, checkpoint)
+        progress.add(len(rows))
+    progress.report()
+    return progress.rows
+
+
+def migrate(source, target, checkpoint: Dict[str, Any], checkpoint_path: str,
+            batch_size: int = BULK_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Copy categories, then events, then dishes from source to target.
+
+    Returns:
+        Rows copied per kind, and the number of orphan dishes left out
+
+    Raises:
+        MigrationError: If a new migration's target already has events or dishes
+        ValueError: If the target rejects a batch (see bulk_add_events)
+    """
+    fresh = not checkpoint["categories"]
+    if fresh and (target.get_events_after(0, 1) or target.get_dishes_after(0, 1)):
+        raise MigrationError("the target already has events or dishes; migrate into an empty database")
+
+    copied = {"categories": 0}
+    if fresh:
+        copied["categories"] = target.save_categories(source.get_dish_categories())
+        checkpoint["categories"] = True
+        save_checkpoint(checkpoint_path, checkpoint)
+    copied["events"] = copy_rows(source, target, "events", checkpoint, checkpoint_path, batch_size)
+    references = DishReferences(source, batch_size)
+    copied["dishes"] = copy_rows(source, target, "dishes", checkpoint, checkpoint_path, batch_size, references)
+    references.report()
+    copied["orphan_dishes"] = len(references.orphan_ids)
+    return copied
+
+
+def canonical_row(kind: str, row: Dict[str, Any]) -> Tuple:
+    """
+    The exported fields of a row in a backend-neutral form.
+
+    Missing text is compared as "", as bulk_add_* stores it.
+    """
+    return tuple(
+        int(row.get(field) or 0) if field in INTEGER_FIELDS else str(row.get(field) or "")
+        for field in ROW_FIELDS[kind]
+    )
+
+
+def summarize(kind: str, batches: Iterable[List[Dict[str, Any]]]) -> Tuple[int, str]:
+    """Row count and SHA-256 of the canonical rows, in ID order."""
+    digest = hashlib.sha256()
+    count = 0
+    for rows in batches:
+        for row in rows:
+            digest.update(json.dumps(canonical_row(kind, row)).encode())
+            count += 1
+    return count, digest.hexdigest()
+
+
+def verify(source, target, batch_size: int = BULK_BATCH_SIZE) -> List[str]:
+    """
+    Compare row counts and checksums of every kind on both sides.
+
+    Orphan dishes of the source are left out, as migrate() does not copy them.
+
+    Returns:
+        A description of each kind that differs; empty if they all match
+    """
+    mismatches = []
+    for kind in KINDS:
+        if kind == "categories":
+            sides = [summarize(kind, [sorted(db.get_dish_categories(), key=lambda c: c["id"])])
+                     for db in (source, target)]
+        else:
+            source_batches = export_batches(source, kind, batch_size)
+            if kind == "dishes":
+                source_batches = map(DishReferences(source, batch_size).keep, source_batches)
+            sides = [summarize(kind, source_batches), summarize(kind, export_batches(target, kind, batch_size))]
+        (source_count, source_sum), (target_count, target_sum) = sides
+        status = "ok" if sides[0] == sides[1] else "MISMATCH"
+        print(f"verify {kind}: source {source_count} rows, target {target_count} rows, {status}",
+              file=sys.stderr)
+        if source_count != target_count:
+            mismatches.append(f"{kind}: {source_count} rows in the source, {target_count} in the target")
+        elif source_sum != target_sum:
+            mismatches.append(f"{kind}: checksums differ")
+    return mismatches
+
+
+def open_database(url: str):
+    from database.db_factory import DatabaseFactory
+
+    db = DatabaseFactory.create_from_url(url)
+    db.initialize()
+    return db
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Copy all data from one database backend to another.")
+    parser.add_argument("source", help="database to copy from, e.g. sqlite:///dinner_planner.db")
+    parser.add_argument("target", help="database to copy to, e.g. postgresql://localhost/dinner")
+    parser.add_argument("--checkpoint", default="migrate_checkpoint.json",
+                        help="progress file; rerun with the same one to resume (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE)
+    parser.add_argument("--verify-only", action="store_true", help="only compare the two databases")
+    parser.add_argument("--no-verify", action="store_true", help="skip the verification pass")
+    args = parser.parse_args(argv)
+
+    # The target must start empty, so don't let initialize() seed sample events
+    os.environ["SEED_SAMPLE_DATA"] = "false"
+    with contextlib.redirect_stdout(sys.stderr):
+        source = open_database(args.source)
+        target = open_database(args.target)
+    started = time.perf_counter()
+    try:
+        if not args.verify_only:
+            checkpoint = load_checkpoint(args.checkpoint, args.source, args.target)
+            copied = migrate(source, target, checkpoint, args.checkpoint, args.batch_size)
+            skipped = copied.pop("orphan_dishes")
+            total = sum(copied.values())
+            elapsed = time.perf_counter() - started
+            print(f"copied {copied['categories']} categories, {copied['events']} events and "
+                  f"{copied['dishes']} dishes in {elapsed:.1f} s ({total / max(elapsed, 1e-9):.0f} rows/s)"
+                  + (f"; skipped {skipped} orphan dishes" if skipped else ""),
+                  file=sys.stderr)
+        if not args.no_verify:
+            mismatches = verify(source, target, args.batch_size)
+            if mismatches:
+                sys.exit("Verification failed:\n  " + "\n  ".join(mismatches))
+    except (MigrationError, ValueError) as exc:
+        sys.exit(f"Migration failed: {exc}")
+    finally:
+        source.close()
+        target.close()
+
+
+if __name__ == "__main__":
+    main()
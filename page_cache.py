@@ -0,0 +1,57 @@
+import hashlib
+from collections import OrderedDict
+from typing import Hashable, NamedTuple, Optional
+
+
+class CachedPage(NamedTuple):
+    body: bytes
+    media_type: str
+    etag: str
+
+
+class PageCache:
+    """
+    In-memory LRU of rendered pages.
+
+    Keys are chosen by the caller and should include everything the page
+    depends on (URL, data version, current minute, ...), so entries never need
+    explicit invalidation: stale ones are simply never asked for again and
+    fall off the end of the LRU.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._pages: "OrderedDict[Hashable, CachedPage]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, key: Hashable) -> Optional[CachedPage]:
+        page = self._pages.get(key)
+        if page is not None:
+            self._pages.move_to_end(key)
+        return page
+
+    def set(self, key: Hashable, body: bytes, media_type: str) -> CachedPage:
+        # Strong ETag: same bytes, same tag, whichever key produced them
+        page = CachedPage(body, media_type, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        self._pages[key] = page
+        self._pages.move_to_end(key)
+        while len(self._pages) > self.max_entries:
+            self._pages.popitem(last=False)
+        return page
+
+    def clear(self) -> None:
+        self._pages.clear()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches a strong ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
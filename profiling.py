@@ -0,0 +1,163 @@
+import asyncio
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Dict, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+
+_frame_labels: Dict[object, str] = {}
+
+
+def _frame_label(code) -> str:
+    # Functions, not lines, so each function is one box in the flamegraph
+    label = _frame_labels.get(code)
+    if label is None:
+        path = "/".join(code.co_filename.replace("\\", "/").split("/")[-2:])
+        label = _frame_labels[code] = f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ",")
+    return label
+
+
+class StackSampler:
+    """
+    Sampling CPU profiler for every thread in the process.
+
+    A background thread reads each thread's stack every `interval` seconds,
+    so the profiled code runs at full speed and the cost is one stack walk
+    per thread per sample. Stacks are kept in the collapsed ("folded") form
+    flamegraph.pl, speedscope and inferno read, rooted at the thread name:
+    time on the event loop (rendering, row copies, JSON decoding) and in the
+    database threads then shows up side by side. Idle threads show as
+    waiting in queue or selector calls.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                labels.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def allocation_report(snapshot: tracemalloc.Snapshot, peak: int, top: int) -> str:
+    """The `top` source lines holding the most memory allocated during the request."""
+    stats = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ]).statistics("lineno")
+    lines = [f"Peak traced memory: {peak / 1024:.1f} KiB", f"Top {top} allocation sites still live at the end:", ""]
+    for stat in stats[:top]:
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size / 1024:10.1f} KiB {stat.count:8} blocks  {frame.filename}:{frame.lineno}")
+    return "\n".join(lines) + "\n"
+
+
+class ProfilingMiddleware:
+    """
+    Profiles single requests on demand.
+
+    A request carrying the admin token, in an X-Profile header or a
+    ?profile= query parameter, runs under a StackSampler and tracemalloc.
+    Its folded stacks and top allocation sites are written to `directory`,
+    and the response names the files in an X-Profile header. Other requests
+    pay one header lookup. One request is profiled at a time; others asking
+    meanwhile run unprofiled.
+
+    Samples cover the whole process, so profile on a quiet instance or read
+    the stacks knowing concurrent requests are in them too.
+    """
+
+    def __init__(self, app, token: str, directory: str = "profiles",
+                 interval: float = 0.005, top_allocations: int = 25):
+        self.app = app
+        self.token = token
+        self.directory = directory
+        self.interval = interval
+        self.top_allocations = top_allocations
+        self._busy = False
+
+    def _requested(self, scope) -> bool:
+        connection = HTTPConnection(scope)
+        offered = connection.headers.get("x-profile") or connection.query_params.get("profile")
+        return bool(offered) and secrets.compare_digest(offered.encode(), self.token.encode())
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self._busy or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        self._busy = True
+        # Seen by cached_page: a profile of a page cache hit shows nothing
+        scope["profiling"] = True
+        name = self._profile_name(scope)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Profile", name)
+            await send(message)
+
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        sampler = StackSampler(self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop()
+            elapsed = time.perf_counter() - started
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            if not tracing:
+                tracemalloc.stop()
+            self._busy = False
+            await asyncio.to_thread(self._save, name, sampler, snapshot, peak)
+            print(f"Profiled {scope['method']} {scope['path']} ({elapsed * 1000:.1f} ms, "
+                  f"{sampler.samples} samples) to {os.path.join(self.directory, name)}.*")
+
+    def _profile_name(self, scope) -> str:
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", scope["path"]).strip("-") or "root"
+        return f"{time.strftime('%Y%m%d-%H%M%S')}-{scope['method'].lower()}-{slug}-{secrets.token_hex(3)}"
+
+    def _save(self, name: str, sampler: StackSampler, snapshot: tracemalloc.Snapshot, peak: int) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, name)
+        with open(base + ".folded", "w", encoding="utf-8") as handle:
+            handle.write(sampler.folded())
+        with open(base + ".alloc.txt", "w", encoding="utf-8") as handle:
+            handle.write(allocation_report(snapshot, peak, self.top_allocations))
+
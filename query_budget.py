@@ -0,0 +1,156 @@
+import os
+import reprlib
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from metrics import route_template
+
+# Keeps slow-query log lines short even for bulk calls with thousands of rows
+_params_repr = reprlib.Repr()
+_params_repr.maxlist = _params_repr.maxtuple = _params_repr.maxdict = 5
+_params_repr.maxstring = _params_repr.maxother = 80
+
+# The recorder of the request being handled, if any
+_current: ContextVar[Optional["RequestQueries"]] = ContextVar("request_queries", default=None)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A request made more database calls than its route allows, or repeated one."""
+
+
+def query_budget(limit: Optional[int] = None, repeated: Sequence[str] = ()):
+    """
+    Declare what a route handler may ask of the database per request.
+
+    Args:
+        limit: Most backend calls one request may make; None for no limit
+        repeated: Methods the handler calls in a loop on purpose (batched
+            exports, say), which are therefore not reported as N+1 patterns
+    """
+
+    def decorate(handler):
+        handler.query_budget = limit
+        handler.repeated_queries = frozenset(repeated)
+        return handler
+
+    return decorate
+
+
+class RequestQueries:
+    """Every backend call one request made, with the request's ASGI scope."""
+
+    def __init__(self, scope, root_path: str):
+        self.scope = scope
+        self.root_path = root_path
+        self.calls: List[Tuple[str, float]] = []
+
+    @property
+    def route(self) -> str:
+        # Looked up late: the router has not matched a route when we start
+        return route_template(self.scope, self.root_path)
+
+    def problems(self, repeat_threshold: int) -> List[str]:
+        """What the calls so far break: the route's budget, or the N+1 rule."""
+        endpoint = self.scope.get("endpoint")
+        limit = getattr(endpoint, "query_budget", None)
+        allowed = getattr(endpoint, "repeated_queries", frozenset())
+
+        found = []
+        if limit is not None and len(self.calls) > limit:
+            found.append(f"{len(self.calls)} database calls, budget {limit}")
+        counts: Dict[str, int] = Counter(method for method, _ in self.calls)
+        for method, count in counts.items():
+            if count >= repeat_threshold and method not in allowed:
+                found.append(f"{method} called {count} times (N+1?)")
+        return found
+
+
+class QueryLog:
+    """
+    Request-scoped query recorder.
+
+    Used as a database call recorder (see database.timed_db), it logs calls
+    slower than `slow_seconds` with their parameters, tagged with the route
+    of the request that made them. Once a request has responded, its calls
+    are checked against the handler's @query_budget and for the same method
+    called `repeat_threshold` or more times, a sign of an N+1 loop.
+
+    Problems are logged; in strict mode (for tests) QueryBudgetExceeded is
+    raised too, which fails the request with a 500 if its response has not
+    started yet, and is re-raised by test clients either way.
+    """
+
+    def __init__(self, slow_seconds: float = 0.1, repeat_threshold: int = 3, strict: bool = False):
+        self.slow_seconds = slow_seconds
+        self.repeat_threshold = repeat_threshold
+        self.strict = strict
+
+    def record(self, backend: str, method: str, seconds: float, failed: bool, params: Tuple = ()) -> None:
+        """Call recorder for the database factory."""
+        queries = _current.get()
+        if queries is None:
+            return
+        queries.calls.append((method, seconds))
+        if seconds >= self.slow_seconds:
+            print(
+                f"Slow query: {queries.scope['method']} {queries.route} "
+                f"{backend}.{method}{_params_repr.repr(params)} {seconds * 1000:.1f} ms"
+            )
+
+    def check(self, queries: RequestQueries) -> List[str]:
+        """Log and return what the request's calls break."""
+        found = queries.problems(self.repeat_threshold)
+        if found:
+            print(f"Query budget: {queries.scope['method']} {queries.route}: " + "; ".join(found))
+        return found
+
+
+def create_query_log() -> QueryLog:
+    """QueryLog configured by SLOW_QUERY_MS, N_PLUS_ONE_THRESHOLD and QUERY_BUDGET_STRICT."""
+    return QueryLog(
+        slow_seconds=float(os.environ.get("SLOW_QUERY_MS", "100")) / 1000,
+        repeat_threshold=int(os.environ.get("N_PLUS_ONE_THRESHOLD", "3")),
+        strict=os.environ.get("QUERY_BUDGET_STRICT", "false").lower() == "true",
+    )
+
+
+class QueryBudgetMiddleware:
+    """
+    Gives each HTTP request its own recorder in `log` and checks it when the
+    response starts, after the handler's queries, and again at the end if a
+    streaming response made more.
+    """
+
+    def __init__(self, app, log: QueryLog):
+        self.app = app
+        self.log = log
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries(scope, scope.get("root_path", ""))
+        token = _current.set(queries)
+        checked = 0
+
+        def check() -> None:
+            nonlocal checked
+            checked = len(queries.calls)
+            found = self.log.check(queries)
+            if found and self.log.strict:
+                raise QueryBudgetExceeded(f"{scope['method']} {queries.route}: " + "; ".join(found))
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                check()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+            # Streaming responses keep querying after the response started
+            if len(queries.calls) > checked:
+                check()
+        finally:
+            _current.reset(token)
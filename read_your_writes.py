@@ -0,0 +1,44 @@
+from starlette.datastructures import MutableHeaders
+from starlette.requests import HTTPConnection
+
+from database.read_routing import pin_reads_to_primary
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class PrimaryPinMiddleware:
+    """
+    Read-your-writes for a database with read replicas.
+
+    A POST (or any other write method) reads from the primary for the rest of
+    the request, and its response sets a short-lived cookie that pins the
+    visitor's following requests to the primary too, until replicas have
+    caught up. Other visitors keep reading from the replicas, and requests
+    without the cookie get no Set-Cookie, so their responses stay cacheable.
+    """
+
+    def __init__(self, app, pin_seconds: float = 5.0, cookie_name: str = "read_primary",
+                 https_only: bool = False):
+        self.app = app
+        self.pin_seconds = pin_seconds
+        self.cookie_name = cookie_name
+        self.security_flags = "httponly; samesite=lax" + ("; secure" if https_only else "")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        writes = scope["method"] not in SAFE_METHODS
+        if writes or self.cookie_name in HTTPConnection(scope).cookies:
+            pin_reads_to_primary()
+
+        async def send_wrapper(message):
+            if writes and message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(
+                    "Set-Cookie",
+                    f"{self.cookie_name}=1; path=/; Max-Age={max(1, round(self.pin_seconds))}; {self.security_flags}",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
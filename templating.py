@@ -0,0 +1,83 @@
+"""
+Jinja2 environment setup: bytecode cache, startup warmup, precompiled templates.
+
+Templates are compiled to Python code the first time they are rendered, which
+made the first request to every page of a fresh container slow. Instead:
+
+- warm_up() compiles every template during startup;
+- a FileSystemBytecodeCache (TEMPLATE_CACHE_DIR, default /data/jinja-cache
+  when /data exists) lets later processes skip the Jinja parse/compile step;
+- with TEMPLATE_MODULES_DIR set, templates are loaded from Python modules
+  built ahead of time with `python templating.py compile DIR`.
+
+Compare with `python benchmarks/time_to_first_response.py`.
+"""
+import os
+import sys
+import time
+from typing import Optional
+
+import jinja2
+
+TEMPLATE_DIR = "templates"
+
+
+def default_cache_dir() -> Optional[str]:
+    configured = os.environ.get("TEMPLATE_CACHE_DIR")
+    if configured is not None:
+        return configured or None
+    if os.path.isdir("/data"):
+        return "/data/jinja-cache"
+    return None
+
+
+def create_environment(directory: str = TEMPLATE_DIR) -> jinja2.Environment:
+    """Build the Jinja2 environment used by the app's Jinja2Templates."""
+    modules_dir = os.environ.get("TEMPLATE_MODULES_DIR")
+    if modules_dir:
+        # Precompiled: nothing left to parse or compile at runtime
+        return jinja2.Environment(loader=jinja2.ModuleLoader(modules_dir), autoescape=True)
+
+    bytecode_cache = None
+    cache_dir = default_cache_dir()
+    if cache_dir:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            bytecode_cache = jinja2.FileSystemBytecodeCache(cache_dir)
+        except OSError as exc:
+            print(f"Template bytecode cache disabled: {exc}")
+
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(directory),
+        autoescape=True,
+        bytecode_cache=bytecode_cache,
+        # Templates only change on deploy, so skip the mtime check per render
+        auto_reload=False,
+    )
+
+
+def warm_up(env: jinja2.Environment, directory: str = TEMPLATE_DIR) -> float:
+    """
+    Compile every template into the environment's cache.
+
+    Returns:
+        Time taken, in milliseconds
+    """
+    started = time.perf_counter()
+    # ModuleLoader cannot list templates, so enumerate the source directory
+    for name in jinja2.FileSystemLoader(directory).list_templates():
+        env.get_template(name)
+    return (time.perf_counter() - started) * 1000
+
+
+def compile_templates(target: str, directory: str = TEMPLATE_DIR) -> None:
+    """Write every template as a Python module under target, for TEMPLATE_MODULES_DIR."""
+    env = jinja2.Environment(loader=jinja2.FileSystemLoader(directory), autoescape=True)
+    env.compile_templates(target, zip=None, ignore_errors=False)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != "compile":
+        sys.exit("usage: python templating.py compile TARGET_DIR")
+    compile_templates(sys.argv[2])
+    print(f"Compiled templates into {sys.argv[2]}")
@@ -0,0 +1,50 @@
+"""
+The app itself, for tests that make requests: main.py reads its settings
+when imported, so one configuration is shared by the whole session.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+BULK_TOKEN = "test-bulk-token"
+IMPORT_MAX_BYTES = 64 * 1024
+
+
+@pytest.fixture(scope="session")
+def app_main(tmp_path_factory):
+    """main.py on a scratch SQLite database, with query budgets enforced."""
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    directory = tmp_path_factory.mktemp("app")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(ROOT)  # templates/ and static/ are relative
+        for name, value in {
+            "DB_BACKEND": "sqlite",
+            "SQLITE_DB_PATH": str(directory / "app.db"),
+            "SEED_SAMPLE_DATA": "false",
+            "SECRET_KEY": "test-secret",
+            "TEMPLATE_CACHE_DIR": "",
+            "LIVE_UPDATES": "false",
+            "QUERY_BUDGET_STRICT": "true",
+            "BULK_TOKEN": BULK_TOKEN,
+            "IMPORT_MAX_BYTES": str(IMPORT_MAX_BYTES),
+        }.items():
+            monkeypatch.setenv(name, value)
+        for name in ("DATABASE_READ_URLS", "PROFILE_TOKEN", "REDIS_URL", "FLASH_STORE"):
+            monkeypatch.delenv(name, raising=False)
+        import main
+
+        yield main
+
+
+@pytest.fixture(scope="session")
+def client(app_main):
+    """A TestClient that re-raises server errors, QueryBudgetExceeded included."""
+    from fastapi.testclient import TestClient
+
+    with TestClient(app_main.app, follow_redirects=False) as client:
+        yield client
@@ -0,0 +1,167 @@
+"""
+Bulk import and export: NDJSON and CSV round trips, all-or-nothing dish
+batches, and the /export and /import routes' token and body size limits.
+
+Set TEST_REDIS_URL to a scratch Redis database to run the batch checks
+against its Lua scripts too: it is flushed by every test.
+"""
+import io
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bulk_io  # noqa: E402
+from bulk_io import BulkImportError, export_batches, format_rows, import_text  # noqa: E402
+from conftest import BULK_TOKEN, IMPORT_MAX_BYTES  # noqa: E402
+from database.sqlite_db import SQLiteDatabase  # noqa: E402
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def db(request, tmp_path, monkeypatch):
+    monkeypatch.setenv("SEED_SAMPLE_DATA", "false")
+    if request.param == "redis":
+        redis_url = os.environ.get("TEST_REDIS_URL")
+        if not redis_url:
+            pytest.skip("TEST_REDIS_URL is not set")
+        pytest.importorskip("redis")
+        from database.kv_db import KVDatabase
+
+        db = KVDatabase(redis_url)
+        db.redis.flushdb()
+    else:
+        db = SQLiteDatabase(str(tmp_path / "bulk.db"))
+    db.initialize()
+    yield db
+    db.close()
+
+
+def fill(db):
+    """Events and dishes with the text CSV and JSON have to escape."""
+    events = [
+        db.add_event("Plain", "2099-01-01 18:00", "Kitchen", ""),
+        db.add_event('Quotes "and", commas', "2099-02-01 18:00", "Hall, upstairs", "Line one\nline two"),
+        db.add_event("Ünïcödé 🍲", "2001-03-01 12:30", "Café", "ß"),
+    ]
+    db.delete_event(events[0]["id"])  # a gap in the IDs
+    for event in events[1:]:
+        db.add_dish(event["id"], "Stew, hot", 1, 'Ann "the cook"', "Serves\r\nmany", 6)
+        db.add_dish(event["id"], "Bread", 6, "Bob", "", 0)
+
+
+def export(db, kind, fmt, batch_size=2):
+    text = format_rows(kind, fmt, [], header=True) if fmt == "csv" else ""
+    return text + "".join(format_rows(kind, fmt, rows) for rows in export_batches(db, kind, batch_size))
+
+
+def all_rows(db, kind):
+    return [row for rows in export_batches(db, kind) for row in rows]
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+def test_export_then_import_round_trips(db, tmp_path, monkeypatch, fmt):
+    fill(db)
+    target = SQLiteDatabase(str(tmp_path / "target.db"))
+    target.initialize()
+    # Small reads, so records are split across chunks
+    monkeypatch.setattr(bulk_io, "CHUNK_SIZE", 7)
+    try:
+        for kind in ("events", "dishes"):
+            text = export(db, kind, fmt)
+            assert import_text(target, kind, fmt, io.StringIO(text), batch_size=2) == len(all_rows(db, kind))
+            fields = bulk_io.FIELDS[kind]
+            assert [[str(row[field]) for field in fields] for row in all_rows(target, kind)] == \
+                [[str(row[field]) for field in fields] for row in all_rows(db, kind)]
+            # Exporting the copy gives the same text back
+            assert export(target, kind, fmt) == text
+    finally:
+        target.close()
+
+
+def test_a_dish_batch_with_an_unknown_reference_adds_nothing(db):
+    event = db.add_event("Dinner", "2099-01-01 18:00", "Kitchen", "")
+    good = {"event_id": event["id"], "name": "Stew", "category_id": 1, "person_name": "Cook"}
+    before = db.get_data_version()
+
+    for bad in ({**good, "event_id": 999}, {**good, "category_id": 999}):
+        with pytest.raises(ValueError):
+            db.bulk_add_dishes([good, bad])
+    with pytest.raises(ValueError):
+        db.bulk_add_dishes([good, {**good, "id": 5}, {**good, "id": 5}])
+    assert all_rows(db, "dishes") == []
+    assert db.get_data_version() == before
+
+    assert db.bulk_add_dishes([good, good]) == 2
+
+
+def test_an_import_stops_at_the_first_bad_batch(db):
+    event = db.add_event("Dinner", "2099-01-01 18:00", "Kitchen", "")
+    lines = [{"event_id": event["id"], "name": f"Dish {i}", "category_id": 1, "person_name": "Cook"}
+             for i in range(5)]
+    lines[3]["event_id"] = 999
+    text = "".join(json.dumps(line) + "\n" for line in lines)
+
+    with pytest.raises(BulkImportError) as failure:
+        import_text(db, "dishes", "ndjson", io.StringIO(text), batch_size=2)
+    assert failure.value.imported == 2
+    assert [dish["name"] for dish in all_rows(db, "dishes")] == ["Dish 0", "Dish 1"]
+
+
+@pytest.mark.parametrize("fmt, text, error", [
+    ("ndjson", '{"title": "A", "date": "2099-01-01 18:00", "location": "B"}\n{"title": "C"', "line 2: invalid JSON"),
+    ("ndjson", '{"title": "A", "date": "soon", "location": "B"}\n', "line 1: 'date' must look like"),
+    ("csv", 'title,date,location\nA,2099-01-01 18:00,\n', "line 2: missing 'location'"),
+    ("csv", 'title,date,location\n"A,2099-01-01 18:00,B\n', "unterminated quoted field"),
+])
+def test_malformed_records_are_reported_by_line(db, fmt, text, error):
+    with pytest.raises(BulkImportError, match=error):
+        import_text(db, "events", fmt, io.StringIO(text))
+
+
+# The routes, on the app's own SQLite database (see conftest.py)
+
+AUTH = {"X-Bulk-Token": BULK_TOKEN}
+
+
+def test_the_routes_need_the_bulk_token(client):
+    for headers in ({}, {"X-Bulk-Token": "wrong"}):
+        assert client.get("/export/events", headers=headers).status_code == 403
+        assert client.post("/import/events", content=b"", headers=headers).status_code == 403
+    assert client.get("/export/events", headers=AUTH).status_code == 200
+    assert client.get("/export/nothing", headers=AUTH).status_code == 404
+    assert client.get("/export/events?format=xml", headers=AUTH).status_code == 400
+
+
+def test_import_then_export_through_the_routes(client):
+    body = "title,date,location,description\r\nRouted,2099-05-01 18:00,Yard,\"Bring, chairs\"\r\n"
+    response = client.post("/import/events", content=body.encode(), headers={**AUTH, "Content-Type": "text/csv"})
+    assert response.json() == {"imported": 1}
+
+    response = client.get("/export/events", headers=AUTH)
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert {"title": "Routed", "description": "Bring, chairs"}.items() <= events[-1].items()
+
+    response = client.post("/import/dishes", content=b'{"event_id": 999999, "name": "Lost"}\n', headers=AUTH)
+    assert response.status_code == 400
+    assert response.json()["imported"] == 0
+
+
+def test_imports_over_the_size_cap_are_refused(client):
+    line = json.dumps({"title": "Big", "date": "2099-06-01 18:00", "location": "Hall"}) + "\n"
+    body = line.encode() * (IMPORT_MAX_BYTES // len(line) + 1)
+
+    # Refused from Content-Length before anything is read
+    response = client.post("/import/events", content=body, headers=AUTH)
+    assert response.status_code == 413
+
+    # Chunked, without Content-Length: cut off once the cap is passed
+    def chunks():
+        for start in range(0, len(body), 4096):
+            yield body[start:start + 4096]
+
+    response = client.post("/import/events", content=chunks(), headers=AUTH)
+    assert response.status_code == 413
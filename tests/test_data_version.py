@@ -0,0 +1,80 @@
+"""
+The data version moves with every write that changes a row, in the same
+transaction, and stays put when a write changes nothing.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.sqlite_db import SQLiteDatabase  # noqa: E402
+
+
+@pytest.fixture(params=["sqlite", "sqlite-production", "postgres"])
+def db(request, tmp_path, monkeypatch):
+    monkeypatch.setenv("SEED_SAMPLE_DATA", "false")
+    if request.param == "postgres":
+        # A scratch database, as for test_postgres.py
+        database_url = os.environ.get("TEST_DATABASE_URL")
+        if not database_url:
+            pytest.skip("TEST_DATABASE_URL is not set")
+        psycopg = pytest.importorskip("psycopg")
+        from database.postgres_db import PostgresDatabase
+
+        with psycopg.connect(database_url, autocommit=True) as conn:
+            conn.execute("DROP SCHEMA public CASCADE")
+            conn.execute("CREATE SCHEMA public")
+        db = PostgresDatabase(database_url, max_size=2)
+    else:
+        db = SQLiteDatabase(str(tmp_path / "version.db"), production=request.param == "sqlite-production")
+    db.initialize()
+    yield db
+    db.close()
+
+
+def writes(db):
+    """Each write the app makes, as (name, call) pairs, in an order that works."""
+    category_id = db.get_dish_categories()[0]["id"]
+    state = {}
+
+    def add_event():
+        state["event"] = db.add_event("Version Dinner", "2099-01-01 18:00", "Kitchen", "")
+
+    def add_dish():
+        state["dish"] = db.add_dish(state["event"]["id"], "Stew", category_id, "Cook", "", 4)
+
+    return [
+        ("add_event", add_event),
+        ("update_event", lambda: db.update_event(state["event"]["id"], "Renamed", "2099-01-01 18:00", "Hall", "")),
+        ("add_dish", add_dish),
+        ("update_dish", lambda: db.update_dish(state["dish"]["id"], "Soup", category_id, "Cook", "", 4)),
+        ("delete_dish", lambda: db.delete_dish(state["dish"]["id"])),
+        ("bulk_add_dishes", lambda: db.bulk_add_dishes([
+            {"event_id": state["event"]["id"], "name": "Pie", "category_id": category_id, "person_name": "Baker"},
+        ])),
+        ("delete_event", lambda: db.delete_event(state["event"]["id"])),
+        ("bulk_add_events", lambda: db.bulk_add_events([{"title": "Bulk", "date": "2099-02-01 18:00",
+                                                        "location": "Park"}])),
+        ("save_categories", lambda: db.save_categories(db.get_dish_categories()[:3])),
+    ]
+
+
+def test_every_write_raises_the_version(db):
+    for name, write in writes(db):
+        before = db.get_data_version()
+        write()
+        assert db.get_data_version() > before, name
+
+
+def test_writes_that_change_nothing_keep_the_version(db):
+    before = db.get_data_version()
+    category_id = db.get_dish_categories()[0]["id"]
+    assert db.update_event(999, "Missing", "2099-01-01 18:00", "Nowhere", "") is None
+    assert db.delete_event(999) is False
+    assert db.update_dish(999, "Missing", category_id, "Nobody", "", 0) is None
+    assert db.delete_dish(999) is False
+    with pytest.raises(ValueError):
+        db.add_dish(999, "Orphan", category_id, "Nobody", "", 0)
+    assert db.get_data_version() == before
@@ -0,0 +1,123 @@
+"""
+Keyset paging of /events: walking a list forward with next cursors and
+back with prev cursors must visit every event once, in (date, id) order,
+including events that share a minute.
+
+Set TEST_REDIS_URL to a scratch Redis database to run them against Redis
+too: it is flushed by every test.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.sqlite_db import SQLiteDatabase  # noqa: E402
+
+UPCOMING = "2099-06-01 18:00"
+PAST = "2001-06-01 18:00"
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def db(request, tmp_path, monkeypatch):
+    monkeypatch.setenv("SEED_SAMPLE_DATA", "false")
+    if request.param == "redis":
+        redis_url = os.environ.get("TEST_REDIS_URL")
+        if not redis_url:
+            pytest.skip("TEST_REDIS_URL is not set")
+        pytest.importorskip("redis")
+        from database.kv_db import KVDatabase
+
+        db = KVDatabase(redis_url)
+        db.redis.flushdb()
+    else:
+        db = SQLiteDatabase(str(tmp_path / "cursors.db"))
+    db.initialize()
+    yield db
+    db.close()
+
+
+def add_events(db, date, count):
+    """count events in the same minute, returning their IDs in list order."""
+    return [db.add_event(f"Dinner {i}", date, "Kitchen", "")["id"] for i in range(count)]
+
+
+def walk(db, upcoming, limit):
+    """Every page from the first, following next cursors, as lists of IDs."""
+    pages = [db.get_events_page(upcoming, limit)]
+    while pages[-1]["next_cursor"]:
+        pages.append(db.get_events_page(upcoming, limit, after=pages[-1]["next_cursor"]))
+    return pages
+
+
+def ids(page):
+    return [event["id"] for event in page["events"]]
+
+
+@pytest.mark.parametrize("upcoming", [True, False])
+def test_next_and_prev_cursors_visit_every_event_once(db, upcoming):
+    # Twelve events in one minute, so IDs 9 and 10 share a score and the
+    # ties decide the order
+    event_ids = add_events(db, UPCOMING if upcoming else PAST, 12)
+    add_events(db, PAST if upcoming else UPCOMING, 3)  # the other list
+
+    pages = walk(db, upcoming, 5)
+    expected = event_ids if upcoming else event_ids[::-1]
+    assert [ids(page) for page in pages] == [expected[:5], expected[5:10], expected[10:]]
+
+    # First and last pages
+    assert pages[0]["prev_cursor"] is None
+    assert pages[-1]["next_cursor"] is None
+    assert all(page["prev_cursor"] for page in pages[1:])
+
+    # Back from the last page
+    back = [pages[-1]]
+    while back[-1]["prev_cursor"]:
+        back.append(db.get_events_page(upcoming, 5, before=back[-1]["prev_cursor"]))
+    assert [ids(page) for page in back] == [ids(page) for page in pages[::-1]]
+    assert back[-1]["prev_cursor"] is None
+
+
+def test_same_minute_ties_are_ordered_by_id_across_minutes(db):
+    early = add_events(db, "2099-06-01 18:00", 1)
+    same = add_events(db, "2099-06-01 19:00", 11)
+    late = add_events(db, "2099-06-01 20:00", 1)
+
+    # A page boundary between every pair, including 9 | 10
+    pages = walk(db, True, 1)
+    assert [event_id for page in pages for event_id in ids(page)] == early + same + late
+
+
+def test_an_empty_list_has_one_page_without_cursors(db):
+    page = db.get_events_page(True, 5)
+    assert page == {"events": [], "next_cursor": None, "prev_cursor": None}
+
+
+@pytest.mark.parametrize("cursor", ["", "abc", "209906011800", "209906011800-x", "209913011800-1", "-1"])
+def test_malformed_cursors_raise_value_error(db, cursor):
+    add_events(db, UPCOMING, 2)
+    with pytest.raises(ValueError):
+        db.get_events_page(True, 5, after=cursor)
+    with pytest.raises(ValueError):
+        db.get_events_page(True, 5, before=cursor)
+
+
+def test_date_index_ties_compare_numerically():
+    pytest.importorskip("redis")
+    from database.kv_db import KVKeyspace
+
+    keyspace = KVKeyspace()
+    members = [keyspace._event_member(event_id).encode("utf-8") for event_id in (9, 10, 100)]
+    assert sorted(members) == members
+
+    # Ties beyond event 10 in the cursor's minute come first, then the
+    # rest of the range; paging back or through past events reverses both
+    cursor = "209906011800-10"
+    rest = [keyspace._event_member(200).encode("utf-8")]
+    assert [int(member) for member in keyspace._page_event_ids(
+        [members, rest], True, 5, cursor, None)] == [100, 200]
+    assert [int(member) for member in keyspace._page_event_ids(
+        [members[::-1], rest], True, 5, None, cursor)] == [9, 200]
+    assert [int(member) for member in keyspace._page_event_ids(
+        [members[::-1], rest], False, 5, cursor, None)] == [9, 200]
@@ -0,0 +1,133 @@
+"""
+migrate.py between two SQLite databases: a copy interrupted part way
+resumes from its checkpoint, and the verification pass agrees with the
+result. Also the SQLite schema upgrades that purge orphan dishes.
+"""
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import migrate  # noqa: E402
+from database.sqlite_db import SCHEMA_VERSION, SQLiteDatabase  # noqa: E402
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    monkeypatch.setenv("SEED_SAMPLE_DATA", "false")
+    return {
+        "source": str(tmp_path / "source.db"),
+        "target": str(tmp_path / "target.db"),
+        "checkpoint": str(tmp_path / "checkpoint.json"),
+    }
+
+
+def open_db(path):
+    db = SQLiteDatabase(path)
+    db.initialize()
+    return db
+
+
+def fill(db, events=5, dishes_per_event=3):
+    categories = db.save_categories([{"id": 1, "name": "Soup"}, {"id": 4, "name": "Pie"}])
+    assert categories == 2
+    for i in range(events):
+        event = db.add_event(f"Dinner {i}", f"2099-01-{i + 1:02d} 18:00", "Kitchen", "")
+        for j in range(dishes_per_event):
+            db.add_dish(event["id"], f"Dish {i}.{j}", (1, 4)[j % 2], "Cook", "", j)
+    # Gaps in the IDs must be kept too
+    db.delete_event(2)
+
+
+def test_an_interrupted_migration_resumes_and_verifies(paths, monkeypatch):
+    source, target = open_db(paths["source"]), open_db(paths["target"])
+    fill(source)
+
+    # Fail the second dish batch, as a crash would
+    add_dishes = target.bulk_add_dishes
+    batches = []
+
+    def crash_on_second_batch(dishes):
+        batches.append(dishes)
+        if len(batches) == 2:
+            raise RuntimeError("connection lost")
+        return add_dishes(dishes)
+
+    monkeypatch.setattr(target, "bulk_add_dishes", crash_on_second_batch)
+    checkpoint = migrate.load_checkpoint(paths["checkpoint"], "source", "target")
+    with pytest.raises(RuntimeError):
+        migrate.migrate(source, target, checkpoint, paths["checkpoint"], batch_size=2)
+    monkeypatch.undo()
+    assert migrate.verify(source, target, batch_size=2)
+
+    checkpoint = migrate.load_checkpoint(paths["checkpoint"], "source", "target")
+    assert checkpoint["categories"] and checkpoint["events"] == 5 and checkpoint["dishes"] == 2
+    copied = migrate.migrate(source, target, checkpoint, paths["checkpoint"], batch_size=2)
+    assert copied == {"categories": 0, "events": 0, "dishes": 10, "orphan_dishes": 0}
+    assert migrate.verify(source, target, batch_size=2) == []
+    assert target.get_dishes_after(0, 100) == source.get_dishes_after(0, 100)
+
+    # Another checkpoint's databases are refused
+    with pytest.raises(migrate.MigrationError):
+        migrate.load_checkpoint(paths["checkpoint"], "source", "elsewhere")
+
+
+def test_the_command_copies_and_verifies(paths, capsys):
+    source = open_db(paths["source"])
+    fill(source)
+    source.close()
+
+    urls = [f"sqlite:///{paths['source']}", f"sqlite:///{paths['target']}", "--checkpoint", paths["checkpoint"]]
+    migrate.main(urls + ["--batch-size", "4"])
+    assert "copied 2 categories, 4 events and 12 dishes" in capsys.readouterr().err
+
+    # Resuming a finished migration copies nothing and still verifies
+    migrate.main(urls)
+    assert "copied 0 categories, 0 events and 0 dishes" in capsys.readouterr().err
+
+    # A change on one side fails the verification
+    target = open_db(paths["target"])
+    target.update_dish(1, "Changed", 1, "Cook", "", 0)
+    target.close()
+    with pytest.raises(SystemExit, match="dishes: checksums differ"):
+        migrate.main(urls + ["--verify-only"])
+
+
+def test_the_command_refuses_a_target_with_data(paths):
+    for name in ("source", "target"):
+        db = open_db(paths[name])
+        fill(db, events=1)
+        db.close()
+
+    with pytest.raises(SystemExit, match="the target already has events or dishes"):
+        migrate.main([f"sqlite:///{paths['source']}", f"sqlite:///{paths['target']}",
+                      "--checkpoint", paths["checkpoint"]])
+
+
+def test_schema_upgrades_delete_orphan_dishes(paths, capsys):
+    db = open_db(paths["source"])
+    fill(db, events=2)
+    db.close()
+
+    # Orphans as written while foreign keys were off, on a version 2 schema
+    conn = sqlite3.connect(paths["source"])
+    conn.executemany(
+        "INSERT INTO dishes (event_id, name, category_id, person_name, created_at) VALUES (?, ?, ?, 'Cook', '')",
+        [(999, "No event", 1), (998, "No event either", 4), (1, "No category", 999)],
+    )
+    conn.execute("UPDATE schema_meta SET version = 2")
+    conn.commit()
+    conn.close()
+
+    db = open_db(paths["source"])
+    try:
+        output = capsys.readouterr().out
+        assert "Schema version 3: deleted 2 rows" in output
+        assert "Schema version 6: deleted 1 rows" in output
+        assert db._schema_version() == SCHEMA_VERSION
+        assert len(db.get_dishes_after(0, 100)) == 3
+    finally:
+        db.close()
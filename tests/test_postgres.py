@@ -0,0 +1,122 @@
+"""
+PostgreSQL migrations and triggers, run against a real server.
+
+Set TEST_DATABASE_URL to a scratch database to run them: its public
+schema is dropped and recreated by every test. Without it (or without
+psycopg) they are skipped.
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+psycopg = pytest.importorskip("psycopg")
+pytest.importorskip("psycopg_pool")
+
+from database.changes import DISH_CHANGES_CHANNEL  # noqa: E402
+from database.postgres_db import (  # noqa: E402
+    MIGRATIONS, SCHEMA_META_TABLE, SCHEMA_VERSION, SET_SCHEMA_VERSION, PostgresDatabase,
+)
+
+DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="TEST_DATABASE_URL is not set")
+
+
+def reset_schema() -> None:
+    with psycopg.connect(DATABASE_URL, autocommit=True) as conn:
+        conn.execute("DROP SCHEMA public CASCADE")
+        conn.execute("CREATE SCHEMA public")
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setenv("SEED_SAMPLE_DATA", "false")
+    reset_schema()
+    db = PostgresDatabase(DATABASE_URL, max_size=2)
+    db.initialize()
+    yield db
+    db.close()
+
+
+def schema_version() -> int:
+    with psycopg.connect(DATABASE_URL) as conn:
+        return conn.execute("SELECT version FROM schema_meta WHERE id = 1").fetchone()[0]
+
+
+def test_migrations_reach_the_current_version_on_an_empty_schema(db):
+    assert schema_version() == SCHEMA_VERSION
+    # A second start finds the schema current and changes nothing
+    db.initialize()
+    assert schema_version() == SCHEMA_VERSION
+    assert len(db.get_dish_categories()) == 7
+
+
+@pytest.mark.parametrize("applied", [version for version, _ in MIGRATIONS[:-1]])
+def test_migrations_upgrade_from_every_older_version(monkeypatch, applied):
+    monkeypatch.setenv("SEED_SAMPLE_DATA", "false")
+    reset_schema()
+    with psycopg.connect(DATABASE_URL) as conn:
+        conn.execute(SCHEMA_META_TABLE)
+        for version, statements in MIGRATIONS:
+            for statement in statements if version <= applied else ():
+                conn.execute(statement)
+        conn.execute(SET_SCHEMA_VERSION, (applied,))
+
+    db = PostgresDatabase(DATABASE_URL, max_size=2)
+    try:
+        db.initialize()
+        assert schema_version() == SCHEMA_VERSION
+        event = db.add_event("Upgraded Dinner", "2099-01-01 18:00", "Kitchen", "")
+        db.add_dish(event["id"], "Stew", db.get_dish_categories()[0]["id"], "Cook", "", 4)
+        assert [dish["name"] for dish in db.get_event_bundle(event["id"])["dishes"]] == ["Stew"]
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def notifications():
+    """The dish change payloads sent so far; call it to collect them."""
+    conn = psycopg.connect(DATABASE_URL, autocommit=True)
+    received = []
+    conn.add_notify_handler(lambda notify: received.append(json.loads(notify.payload)))
+    conn.execute(f"LISTEN {DISH_CHANGES_CHANNEL}")
+
+    def collect():
+        # Notifications that arrived meanwhile are dispatched on the next query
+        conn.execute("SELECT 1")
+        collected = list(received)
+        received.clear()
+        return collected
+
+    yield collect
+    conn.close()
+
+
+def test_dish_writes_notify_through_the_trigger(db, notifications):
+    category_id = db.get_dish_categories()[0]["id"]
+    event = db.add_event("Trigger Dinner", "2099-01-01 18:00", "Kitchen", "")
+
+    dish = db.add_dish(event["id"], "Stew", category_id, "Cook", "", 4)
+    db.update_dish(dish["id"], "Soup", category_id, "Cook", "", 4)
+    assert db.delete_dish(dish["id"])
+    assert notifications() == [
+        {"op": op, "event_id": event["id"], "dish_id": dish["id"]} for op in ("add", "update", "delete")
+    ]
+
+
+def test_bulk_dish_insert_notifies_once_per_event(db, notifications):
+    category_id = db.get_dish_categories()[0]["id"]
+    events = [db.add_event(f"Dinner {i}", "2099-01-01 18:00", "Kitchen", "") for i in range(2)]
+    dishes = [
+        {"event_id": event["id"], "name": f"Dish {i}", "category_id": category_id, "person_name": "Cook"}
+        for event in events for i in range(3)
+    ]
+
+    assert db.bulk_add_dishes(dishes) == 6
+    assert sorted(notifications(), key=lambda change: change["event_id"]) == [
+        {"op": "reload", "event_id": event["id"]} for event in events
+    ]
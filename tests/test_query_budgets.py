@@ -0,0 +1,106 @@
+"""
+Every route renders within its @query_budget on SQLite, with
+QUERY_BUDGET_STRICT on so that a route going over its budget, or looping
+over one backend call, fails the request instead of only logging.
+"""
+import asyncio
+
+import pytest
+
+from database.db_interface import encode_event_cursor
+from query_budget import QueryBudgetExceeded
+
+
+@pytest.fixture
+def event(client, app_main):
+    """An upcoming event with one dish, added through the app."""
+    response = client.post("/events/add", data={
+        "title": "Budget Dinner", "date": "2099-01-01T18:00", "location": "Kitchen",
+    })
+    assert response.status_code == 303
+    event_id = int(response.headers["location"].rstrip("/").rsplit("/", 1)[1])
+    response = client.post(f"/events/id/{event_id}/dishes/add", data={
+        "name": "Stew", "category_id": "1", "person_name": "Cook", "serves": "4",
+    })
+    assert response.status_code == 303
+    # Pending flashes bypass the page cache, so show them now
+    assert client.get("/events/add").status_code == 200
+    return {"id": event_id, "date": "2099-01-01 18:00"}
+
+
+def dish_id(app_main, event_id):
+    # Outside a request, so not counted against any budget
+    bundle = asyncio.run(app_main.db.get_event_bundle(event_id))
+    return bundle["dishes"][0]["id"]
+
+
+def test_cached_pages_stay_within_budget(client, event):
+    cursor = encode_event_cursor(event)
+    for url in ("/", "/events", f"/events?upcoming_after={cursor}", f"/events?past_before={cursor}",
+                "/events?upcoming_after=garbage", f"/events/id/{event['id']}"):
+        # A miss renders the page, a hit serves it, a matching ETag answers 304
+        response = client.get(url)
+        assert response.status_code == 200, url
+        assert client.get(url).status_code == 200, url
+        assert client.get(url, headers={"If-None-Match": response.headers["etag"]}).status_code == 304, url
+
+    assert client.get("/events/id/999999").status_code == 303
+
+
+def test_forms_and_writes_stay_within_budget(client, app_main, event):
+    event_id = event["id"]
+    fields = {"title": "Renamed", "date": "2099-01-02T18:00", "location": "Hall"}
+    for url in ("/events/add", f"/events/id/{event_id}/edit", f"/events/id/{event_id}/delete",
+                f"/events/id/{event_id}/dishes/add", "/health"):
+        assert client.get(url).status_code == 200, url
+    assert client.post(f"/events/id/{event_id}/edit", data=fields).status_code == 303
+    assert client.post(f"/events/id/{event_id}/edit", data={}).status_code == 200
+
+    dish = dish_id(app_main, event_id)
+    dish_fields = {"name": "Soup", "category_id": "2", "person_name": "Cook", "serves": "2"}
+    for url in (f"/dishes/{dish}/edit", f"/dishes/{dish}/delete"):
+        assert client.get(url).status_code == 200, url
+    assert client.post(f"/dishes/{dish}/edit", data=dish_fields).status_code == 303
+    assert client.post(f"/dishes/{dish}/edit", data={**dish_fields, "serves": "x"}).status_code == 200
+    assert client.post(f"/events/id/{event_id}/dishes/add", data={}).status_code == 200
+    assert client.post(f"/events/id/{event_id}/dishes/add",
+                       data={**dish_fields, "category_id": "999"}).status_code == 200
+    assert client.post(f"/dishes/{dish}/delete").status_code == 303
+    assert client.post(f"/events/id/{event_id}/delete").status_code == 303
+
+    # Missing rows redirect within budget too
+    for url in (f"/events/id/{event_id}/edit", f"/dishes/{dish}/edit", f"/dishes/{dish}/delete"):
+        assert client.get(url).status_code == 303, url
+
+
+def test_an_n_plus_one_loop_raises(client, app_main, event):
+    async def dishes_one_by_one():
+        # The loop the budget check exists to catch: one call per row
+        for _ in range(3):
+            await app_main.db.get_event_by_id(event["id"])
+        return {}
+
+    app_main.app.add_api_route("/test/n-plus-one", dishes_one_by_one)
+    try:
+        with pytest.raises(QueryBudgetExceeded, match="get_event_by_id called 3 times"):
+            client.get("/test/n-plus-one")
+    finally:
+        app_main.app.router.routes.pop()
+
+
+def test_going_over_the_budget_raises(client, app_main, event):
+    monkeypatch = pytest.MonkeyPatch()
+    # event_detail is allowed 2 calls: the data version and one bundle
+    original = app_main.db.get_event_bundle
+
+    async def bundle_and_count(event_id):
+        await app_main.db.count_events()
+        return await original(event_id)
+
+    monkeypatch.setattr(app_main.db, "get_event_bundle", bundle_and_count)
+    try:
+        with pytest.raises(QueryBudgetExceeded, match="3 database calls, budget 2"):
+            # A new URL, so the page is rendered rather than served from the cache
+            client.get(f"/events/id/{event['id']}?over=budget")
+    finally:
+        monkeypatch.undo()
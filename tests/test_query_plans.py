@@ -0,0 +1,73 @@
+"""
+The hot SQLite read paths must keep using the indexes added in schema
+version 2, so a schema change that drops or shadows one fails here rather
+than turning page loads into table scans.
+
+benchmarks/check_query_plans.py does the broader check (every SELECT, and
+Postgres too) by hand.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_interface import encode_event_cursor  # noqa: E402
+from database.sqlite_db import SQLiteDatabase  # noqa: E402
+
+CURSOR = encode_event_cursor({"date": "2024-01-01 18:00", "id": 1})
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setenv("SEED_SAMPLE_DATA", "false")
+    db = SQLiteDatabase(str(tmp_path / "plans.db"))
+    db.initialize()
+    yield db
+    db.close()
+
+
+def query_plans(db, call):
+    """EXPLAIN QUERY PLAN of each SELECT that call(db) runs, as one string per statement."""
+    conn = db._get_connection()
+    statements = []
+    # The callback receives statements with their parameters bound
+    conn.set_trace_callback(statements.append)
+    try:
+        call(db)
+    finally:
+        conn.set_trace_callback(None)
+    return [
+        "\n".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + statement))
+        for statement in statements
+        if statement.lstrip().upper().startswith("SELECT")
+    ]
+
+
+def add_event(db):
+    category_id = db.get_dish_categories()[0]["id"]
+    event = db.add_event("Plan Dinner", "2099-01-01 18:00", "Kitchen", "")
+    db.add_dish(event["id"], "Stew", category_id, "Cook", "", 4)
+    return event["id"]
+
+
+@pytest.mark.parametrize("call", [
+    lambda db: db.get_upcoming_events(limit=2),
+    lambda db: db.get_events_page(True, limit=5),
+    lambda db: db.get_events_page(False, limit=5, after=CURSOR),
+    lambda db: db.get_events_page(False, limit=5, before=CURSOR),
+], ids=["upcoming", "page", "page-after", "page-before"])
+def test_event_lists_use_date_index(db, call):
+    plans = query_plans(db, call)
+    assert plans
+    for plan in plans:
+        assert "idx_events_date_id" in plan, plan
+
+
+@pytest.mark.parametrize("method", ["get_dishes_for_event", "get_event_bundle", "get_events_with_dishes"])
+def test_dish_lookups_use_event_index(db, method):
+    event_id = add_event(db)
+    argument = [event_id] if method == "get_events_with_dishes" else event_id
+    plans = query_plans(db, lambda db: getattr(db, method)(argument))
+    assert any("idx_dishes_event_id" in plan for plan in plans), plans